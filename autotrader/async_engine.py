@@ -0,0 +1,146 @@
+"""
+AsyncTickEngine — runs one tick's per-event work concurrently.
+
+- Each event (in-play update, archive check, strategies) is one task; at most
+  TICK_CONCURRENCY run at once on a persistent worker pool.
+- TICK_DEADLINE_SEC bounds the tick: events that have not started by then are
+  skipped and their ids returned, so the caller can poll them again on the next
+  tick (MatchPollScheduler.reschedule_now). Events already running always finish,
+  so no worker outlives the tick's DB connection.
+- Existing synchronous BaseStrategy implementations run unchanged through
+  StrategyAdapter; a strategy may instead provide `async def on_tick_async(...)`.
+
+Tick wall-clock time therefore tracks the slowest events, not the sum of all events.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from core import metrics
+from core.settings import TICK_CONCURRENCY, TICK_DEADLINE_SEC
+from autotrader.market_snapshot import MarketSnapshot
+from autotrader.strategies.base_strategy import BaseStrategy
+
+logger = logging.getLogger("AutoTrader")
+
+
+class SerializedDB:
+    """
+    Wraps a DBHelper so concurrent workers never interleave on the one connection:
+    every method call holds a shared lock, and tx() holds it for the whole block.
+    The raw connection is not exposed (its queries would bypass the lock); reads
+    such as count_current() go through DBHelper methods instead.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def tx(self):
+        with self._lock:
+            with self._db.tx():
+                yield
+
+    def __getattr__(self, name):
+        if name == "conn":
+            raise AttributeError("SerializedDB does not expose the raw connection; use a DBHelper method")
+        target = getattr(self._db, name)
+        if not callable(target):
+            return target
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return target(*args, **kwargs)
+
+        return call
+
+
+class StrategyAdapter:
+    """Lets a synchronous BaseStrategy run inside the async engine."""
+
+    def __init__(self, strategy: BaseStrategy, engine: "AsyncTickEngine"):
+        self.strategy = strategy
+        self.engine = engine
+        self.name = strategy.name
+
+    async def run(self, db, ev: Dict[str, Any], api, books: MarketSnapshot) -> None:
+        try:
+            native = getattr(self.strategy, "on_tick_async", None)
+            if native is not None:
+                await self.engine.in_pool(self._assign, db, ev)
+                with metrics.span("on_tick", strategy=self.name):
+                    await native(db, ev, api=api, books=books)
+            else:
+                await self.engine.in_pool(self._sync_tick, db, ev, api, books)
+        except Exception as e:
+            logger.error("[%s] error on %s: %s", self.name, ev.get("event_id"), e)
+
+    def _assign(self, db, ev) -> None:
+        with metrics.span("assign_if_applicable", strategy=self.name):
+            self.strategy.assign_if_applicable(db, ev)
+
+    def _sync_tick(self, db, ev, api, books) -> None:
+        self._assign(db, ev)
+        with metrics.span("on_tick", strategy=self.name):
+            self.strategy.on_tick(db, ev, api=api, books=books)
+
+
+class AsyncTickEngine:
+    def __init__(self, trader, concurrency: int = TICK_CONCURRENCY, deadline_sec: float = TICK_DEADLINE_SEC):
+        self.trader = trader
+        self.concurrency = max(1, int(concurrency))
+        self.deadline_sec = deadline_sec
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="tick")
+        self.adapters: List[StrategyAdapter] = [StrategyAdapter(s, self) for s in trader.strategies]
+        self.last_skipped: List[str] = []
+
+    async def in_pool(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def run_tick(self, db, api, rows, scores: Dict[str, Any], books: MarketSnapshot) -> List[str]:
+        """Process all rows; returns the event ids skipped because the deadline passed."""
+        t0 = time.perf_counter()
+        skipped = asyncio.run(self._run(SerializedDB(db), api, rows, scores, books))
+        self.last_skipped = skipped
+        if skipped:
+            logger.warning("TICK | deadline %.1fs hit | events=%d skipped=%d", self.deadline_sec, len(rows), len(skipped))
+        logger.debug("TICK | events=%d took=%.3fs", len(rows), time.perf_counter() - t0)
+        return skipped
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    # ---------- internals ----------
+    async def _run(self, db, api, rows, scores, books) -> List[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_sec
+        sem = asyncio.Semaphore(self.concurrency)
+        skipped: List[str] = []
+
+        async def one(row):
+            async with sem:
+                if loop.time() > deadline:
+                    skipped.append(str(row["event_id"]))
+                    return
+                await self._event(db, api, row, scores, books)
+
+        await asyncio.gather(*(one(r) for r in rows))
+        return skipped
+
+    async def _event(self, db, api, row, scores, books) -> None:
+        try:
+            ev: Optional[Dict[str, Any]] = await self.in_pool(self.trader._update_event, db, api, row, scores, books)
+        except Exception as e:
+            logger.warning("Skipping live update for %s: %s", row["event_id"], e)
+            return
+        if ev is None:
+            return
+        for adapter in self.adapters:
+            await adapter.run(db, ev, api, books)
@@ -4,8 +4,10 @@ Fetches in-play data + runs strategies.
 """
 
 from __future__ import annotations
-import time
 import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from typing import List, Type, Optional, Dict, Any
 
@@ -14,15 +16,34 @@ from core.settings import (
     TABLE_CURRENT,
     PAPER_MODE,
     BOT_VERSION,
-    CONFIG_PATH,
     SP_CAPTURE_WINDOW_SEC,
     SP_FALLBACK_INPLAY,
+    SCORES_BATCH_SIZE,
+    SCORES_PREKO_MINUTES,
+    TICK_CONCURRENCY,
+    POLL_HOUSEKEEPING_SEC,
+    STREAMING_MODE,
+    STREAM_FULL_TICK_SEC,
+    STREAM_RECORD_PATH,
+    RECORD_API,
+    DB_SINGLE_WRITER,
+    METRICS_DB_TABLE,
+    METRICS_DB_FLUSH_SEC,
     LOG_DIR
 )
 
 from core.db_helper import DBHelper
-from core.betfair_session import BetfairSession
-from core.config_loader import load_betfair_credentials
+from core.db_writer import get_db_writer
+from core import clock, match_events, metrics
+from core.betfair_session import get_session_manager
+from autotrader.market_snapshot import MarketSnapshot, MarketPrices, fetch_market_snapshot
+from autotrader.streaming import ExchangeStream
+from autotrader.async_engine import AsyncTickEngine
+from autotrader.poll_scheduler import MatchPollScheduler, FINISHED_STATUSES
+from autotrader.match_state import MatchStateStore
+from autotrader.order_sync import sync_orders
+from autotrader.order_engine import OrderCancelQueue, OrderPlacementQueue
+from autotrader.recorder import ApiRecorder
 
 # Strategy registry
 from autotrader.strategies.base_strategy import BaseStrategy
@@ -31,7 +52,8 @@ from autotrader.strategies.ltd60 import LTD60
 # Logging Setup
 from core.logging_setup import setup_bot_logging
 
-logger = setup_bot_logging(log_dir=LOG_DIR / "logs")
+# Handlers are attached when the first AutoTrader is built, not on import
+logger = logging.getLogger("AutoTrader")
 
 # logger = logging.getLogger("autotrader")
 # logger.setLevel(logging.INFO)
@@ -42,19 +64,64 @@ logger = setup_bot_logging(log_dir=LOG_DIR / "logs")
 
 
 class AutoTrader:
-    def __init__(self):
+    def __init__(self, api=None, db_path=DB_PATH, record: bool = RECORD_API):
+        """
+        api: a ready client (fake exchange, replay) used instead of the shared Betfair session.
+        record: append every API response to the day's recording (autotrader/recorder.py).
+        """
+        setup_bot_logging(log_dir=LOG_DIR / "logs")
         self.strategies: List[BaseStrategy] = []
+        self._placer = OrderPlacementQueue()  # live place instructions queued by strategies, sent per tick
+        self._canceller = OrderCancelQueue()  # live cancels queued by strategies, sent per tick
         self._install_strategies([LTD60])
+        self._engine = AsyncTickEngine(self)
+        # Writes go through the process-wide writer thread; the trader's own connection only reads
+        self.db_path = db_path
+        self._api = api
+        self._writer = get_db_writer(db_path) if DB_SINGLE_WRITER else None
+        self.state = MatchStateStore(writer=self._writer)  # authoritative current_matches during a tick
+        self._db: Optional[DBHelper] = None  # one long-lived connection, reused across ticks
+        self._stream: Optional[ExchangeStream] = None  # streaming mode's connection, replaced when it dies
         self.logged_kickoff = set()
         self.logged_finished = set()
         self.last_logged_band = {}  # event_id -> last band logged (15/30/...)
         self._last_heartbeat = 0
+        self._last_metrics_write = 0.0
+        self._stop = threading.Event()
+        self._recorder = ApiRecorder(rows_fn=lambda: [dict(r) for r in self.state.list_current()]) if record else None
+        self._unsubscribe = [
+            match_events.subscribe(match_events.KICKOFF_CHANGED, self._on_kickoff_changed),
+            match_events.subscribe(match_events.EVENTS_ADDED, self._on_events_stored),
+            match_events.subscribe(match_events.EVENTS_CHANGED, self._on_events_stored),
+            match_events.subscribe(match_events.EVENTS_REMOVED, self._on_events_removed),
+        ]
 
         logger.info("AutoTrader initialised. Paper=%s Bot=%s", PAPER_MODE, BOT_VERSION)
 
+    def _on_kickoff_changed(self, event_id: str, old_kickoff: str, new_kickoff: str) -> None:
+        """MatchFinder moved a kick-off: apply it to the in-memory row now (the poll rate follows next tick)."""
+        if self.state.refresh_fields(event_id, kickoff=new_kickoff):
+            logger.info("KICKOFF MOVED | %s | %s -> %s", event_id, old_kickoff, new_kickoff)
+
+    def _on_events_stored(self, rows: List[Dict[str, Any]]) -> None:
+        """MatchFinder wrote these current_matches rows: merge them into the store (no table scan)."""
+        if not self.state.loaded:
+            return  # the first attach loads the whole table anyway
+        added = self.state.merge_rows(rows)
+        logger.info("MATCHFINDER | rows merged=%d new=%d", len(rows), added)
+
+    def _on_events_removed(self, event_ids: List[str]) -> None:
+        """Upcoming events that left the catalogue; the stale-row rules decide when they go."""
+        known = [e for e in event_ids if self.state.fetch_current(e) is not None]
+        if known:
+            logger.info("MATCHFINDER | delisted before kick-off | %s", ", ".join(known))
+
     def _install_strategies(self, strategy_types: List[Type[BaseStrategy]]):
         for cls in strategy_types:
-            self.strategies.append(cls())
+            strat = cls()
+            strat.placer = self._placer
+            strat.canceller = self._canceller
+            self.strategies.append(strat)
     
     # ========== helpers ============
     def _band_for_time(self, t: int) -> int:
@@ -68,7 +135,7 @@ class AutoTrader:
         return 90
     
     def _cleanup_stale_matches(self, db: DBHelper) -> None:
-        now = datetime.now(timezone.utc)
+        now = clock.now()
 
         rows = db.list_current()
         
@@ -108,134 +175,393 @@ class AutoTrader:
         if to_delete:
             with db.tx():
                 for event_id in to_delete:
-                    db.conn.execute("DELETE FROM current_matches WHERE event_id=?", (event_id,))
+                    db.delete_from_current(event_id)
             logger.info("AutoTrader | PURGED stale rows | count=%d", len(to_delete))
 
 
     # ========== MAIN LOOP ==========
     def start(self):
-        """Main live loop: updates matches + runs strategies."""
+        """
+        Main live loop: updates matches + runs strategies.
+        Each match is refreshed at its own rate (MatchPollScheduler); a tick only touches the due ones.
+        """
+        if STREAMING_MODE:
+            return self.start_streaming()
+
         logger.info("AutoTrader run started. Waiting for matches...")
-        username, password, app_key = load_betfair_credentials(CONFIG_PATH)
+        session = get_session_manager() if self._api is None else None
+        scheduler = MatchPollScheduler()
+        last_housekeeping = 0.0
+        metrics.serve()
+
+        while not self._stop.is_set():
+            with metrics.span("tick"), self._tick_db() as raw_db:
+                db = self.state.attach(raw_db)
+                if clock.time() - last_housekeeping >= POLL_HOUSEKEEPING_SEC:
+                    with metrics.span("stale_cleanup"):
+                        self._cleanup_stale_matches(db)
+                    self._archive_unpolled(db)
+                    last_housekeeping = clock.time()
+
+                rows = self._load_rows(db)
+                due = scheduler.due(rows)
+
+                if due:
+                    api = self._get_api(session)
+
+                    # ===== Batched score fetch (one pass for the whole tick) =====
+                    with metrics.span("score_fetch"):
+                        scores = self._fetch_scores(api, due) if api else {}
+
+                    # ===== Shared market-book snapshot (read by price updater + strategies) =====
+                    with metrics.span("market_book_fetch"):
+                        books = self._fetch_market_books(api, due) if api else MarketSnapshot()
+
+                    # ===== Batched order sync (all open live bets, one pass) =====
+                    with metrics.span("order_sync"):
+                        self._sync_orders(db, api)
+
+                    with metrics.span("events"):
+                        skipped = self._process_rows(db, api, due, scores, books)
+                    scheduler.reschedule_now(skipped)
+                    with metrics.span("order_send"):
+                        self._place_orders(api)
+
+                self._flush_state()
 
-        while True:
-            with DBHelper(DB_PATH) as db:
-                self._cleanup_stale_matches(db)
-                rows = db.list_current(where_sql="", params=())
-                # then sort in Python if you want deterministic ordering:
-                rows = sorted(rows, key=lambda r: (r["kickoff"] or ""))
+                # ===== HEARTBEAT CHECK ============
+                self._maybe_heartbeat(db)
+                self._maybe_write_metrics()
+            # Sleep until the next match is due
+            clock.sleep(scheduler.sleep_seconds())
+
+    def start_streaming(self):
+        """
+        Streaming live loop: market/order change messages drive the ticks.
+        - Delta tick: only rows whose market changed, prices from the stream cache.
+        - Full tick (every STREAM_FULL_TICK_SEC): stale cleanup, scores, all rows, heartbeat,
+          and (re)subscription to the current market set.
+        Falls back to REST market books while the stream is down.
+        """
+        logger.info("AutoTrader streaming run started. Waiting for matches...")
+        session = get_session_manager() if self._api is None else None
+        stream: Optional[ExchangeStream] = None
+        last_full = 0.0
+        metrics.serve()
 
+        try:
+            while not self._stop.is_set():
+                if stream is not None and stream.is_alive():
+                    changed = stream.wait_for_changes(timeout=max(0.0, last_full + STREAM_FULL_TICK_SEC - clock.time()))
+                else:
+                    changed = set()
+                    if clock.time() - last_full < STREAM_FULL_TICK_SEC:
+                        clock.sleep(1)
+                        continue
 
-                if not rows:
-                    time.sleep(10)
+                full = clock.time() - last_full >= STREAM_FULL_TICK_SEC
+                if not changed and not full:
                     continue
 
-                # Prepare API session
-                needs_api = any(s.requires_api for s in self.strategies)
-                api = None
-                if needs_api:
-                    try:
-                        api = BetfairSession(username, password, app_key).connect()
-                    except Exception as e:
-                        logger.warning(f"Betfair session unavailable: {e}")
-                        api = None
+                with metrics.span("tick", mode="full" if full else "delta"), self._tick_db() as raw_db:
+                    db = self.state.attach(raw_db)
+                    if full:
+                        last_full = clock.time()
+                        with metrics.span("stale_cleanup"):
+                            self._cleanup_stale_matches(db)
+                    rows = self._load_rows(db)
+                    api = self._get_api(session)
+
+                    if full and api and rows:
+                        if stream is None or not stream.is_alive():
+                            self._stop_stream()  # a dead or silent connection still holds its socket
+                            stream = self._stream = self._open_stream(api)
+                        if stream is not None:
+                            stream.subscribe_markets(r["market_id_MATCH_ODDS"] for r in rows)
+
+                    if not rows:
+                        continue
+
+                    # Stream cache while it is up (and has its images); REST books when down or silent
+                    books = stream.snapshot() if stream is not None else None
+                    if not books:
+                        with metrics.span("market_book_fetch"):
+                            books = self._fetch_market_books(api, rows) if api else MarketSnapshot()
+
+                    if full:
+                        with metrics.span("score_fetch"):
+                            scores = self._fetch_scores(api, rows) if api else {}
+                    else:
+                        rows = [r for r in rows if str(r["market_id_MATCH_ODDS"]) in changed]
+                        scores = {}
+
+                    with metrics.span("order_sync"):
+                        self._sync_orders(db, api, stream=stream)
+                    with metrics.span("events"):
+                        self._process_rows(db, api, rows, scores, books)
+                    with metrics.span("order_send"):
+                        self._place_orders(api)
+                    self._flush_state()
+
+                    if full:
+                        self._maybe_heartbeat(db)
+                        self._maybe_write_metrics()
+        finally:
+            self._stop_stream()
+
+    @contextmanager
+    def _tick_db(self):
+        """
+        The trader's persistent DBHelper for one tick: commit on success, rollback on error.
+        Opened on first use (PRAGMAs run once); a sqlite3 error drops it so the next tick reconnects.
+        """
+        if self._db is None:
+            self._db = DBHelper(self.db_path, read_only=self._writer is not None)
+        db = self._db
+        try:
+            yield db
+            db.conn.commit()
+        except BaseException as e:
+            try:
+                db.conn.rollback()
+            except Exception:
+                pass
+            if isinstance(e, sqlite3.Error):
+                self._close_db()
+            raise
+
+    def stop(self) -> None:
+        """Ask the running loop to return after its current tick."""
+        self._stop.set()
+
+    def close(self) -> None:
+        """Stop receiving MatchFinder events and the stream, flush pending state and close the persistent connection."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+        self._stop_stream()
+        self._engine.shutdown()
+        self._placer.shutdown()
+        self._canceller.shutdown()
+        if self._recorder is not None:
+            self._recorder.close()
+        self._close_db()
+
+    def _close_db(self) -> None:
+        """Flush pending state and close the persistent connection (the next tick reopens it)."""
+        db, self._db = self._db, None
+        if db is None:
+            return
+        try:
+            self.state.flush()
+        except Exception as e:
+            logger.error("STATE | final flush failed: %s", e)
+        try:
+            db.close()
+        except Exception:
+            pass
 
-                # Update each match + run strategies
-                for row in rows:
-                    ev = dict(row)
-                    event_id = ev["event_id"]
-                    # IMPORTANT: refresh event snapshot after DB updates
-                    fresh = db.fetch_current(event_id)
-                    if fresh:
-                        ev = dict(fresh)
+    def _stop_stream(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
 
+    def _open_stream(self, api) -> Optional[ExchangeStream]:
+        try:
+            return ExchangeStream(
+                app_key=api.app_key,
+                session_token=api.session_token,
+                record_to=STREAM_RECORD_PATH,
+            ).start()
+        except Exception as e:
+            logger.warning("STREAM | unavailable, using REST market books | err=%s", e)
+            return None
 
+    def _flush_state(self, force: bool = False) -> None:
+        """Write-behind: persist the tick's dirty fields in one transaction."""
+        try:
+            with metrics.span("db_commit"):
+                self.state.flush(force=force)
+        except Exception as e:
+            logger.error("STATE | flush failed (kept for retry): %s", e)
+
+    def _archive_unpolled(self, db: DBHelper) -> None:
+        """Finished/Cancelled/Abandoned rows are no longer polled; still run the archive/delete rules for them."""
+        rows = [r for r in db.list_current() if r["inplay_status"] in FINISHED_STATUSES]
+        for row in rows:
+            try:
+                with metrics.span("archive_decision"):
+                    self.decide_to_archive(db, None, dict(row))
+            except Exception as e:
+                logger.warning("Archive check failed for %s: %s", row["event_id"], e)
+
+    def _load_rows(self, db: DBHelper) -> list:
+        rows = db.list_current(where_sql="", params=())
+        # then sort in Python if you want deterministic ordering:
+        return sorted(rows, key=lambda r: (r["kickoff"] or ""))
+
+    def _sync_orders(self, db: DBHelper, api, stream: Optional[ExchangeStream] = None) -> None:
+        """
+        Order-sync stage: one batched pass over every open live bet; strategies read the index.
+        A connected stream answers from its order cache (REST only for what it lacks).
+        """
+        index = sync_orders(db, api, db.list_current(), stream=stream)
+        for strat in self.strategies:
+            strat.orders = index
+
+    def _place_orders(self, api) -> None:
+        """
+        Send the tick's queued cancels and place instructions (grouped per market, in parallel);
+        reports update the rows. Cancel results are flushed at once, in one transaction.
+        """
+        if self._canceller.pending():
+            self._canceller.flush(api)
+            self._flush_state(force=True)
+        if self._placer.pending():
+            self._placer.flush(api)
+
+    def _get_api(self, session):
+        """
+        Shared API session (logs in once; keep-alive + re-login handled by the manager), or the
+        client given to __init__. Wrapped by the recorder when recording is on.
+        """
+        needs_api = any(s.requires_api for s in self.strategies)
+        if not needs_api:
+            return None
+        if self._api is not None:
+            api = self._api
+        else:
+            try:
+                api = session.get_client()
+            except Exception as e:
+                logger.warning(f"Betfair session unavailable: {e}")
+                return None
+        return self._recorder.wrap(api) if self._recorder is not None else api
+
+    def _process_rows(self, db: DBHelper, api, rows, scores: Dict[str, Any], books: MarketSnapshot) -> List[str]:
+        """
+        Run the tick's per-event work: concurrently via the engine, or serially if TICK_CONCURRENCY <= 1.
+        Returns the event ids the engine skipped at its deadline (never any when serial).
+        """
+        if TICK_CONCURRENCY > 1:
+            return self._engine.run_tick(db, api, rows, scores, books)
+
+        # Update each match + run strategies
+        for row in rows:
+            ev = self._update_event(db, api, row, scores, books)
+            if ev is not None:
+                self._run_strategies(db, api, ev, books)
+        return []
+
+    def _update_event(self, db: DBHelper, api, row, scores: Dict[str, Any], books: MarketSnapshot) -> Optional[Dict[str, Any]]:
+        """In-play/price update, archive check and kickoff/band logging for one event. None if it left current_matches."""
+        ev = dict(row)
+        event_id = ev["event_id"]
+        # IMPORTANT: refresh event snapshot after DB updates
+        fresh = db.fetch_current(event_id)
+        if fresh:
+            ev = dict(fresh)
 
-                    try:
-                        # ===== Fetch Betfair in-play data =====
-                        if api:
-                            self._update_inplay_info(db, api, ev)
-                        fresh_after = db.fetch_current(event_id)
-                        if not fresh_after:
-                            continue  # it was archived (or removed)
-                        ev = dict(fresh_after)
-
-                        # ===== ARCHIVE CHECK ===================
-                        self.decide_to_archive(db, api, ev)
-
-                        #===== LOGGING KICKOFF ==================
-                        ips = ev.get("inplay_status")
-                        te = ev.get("time_elapsed")
-
-                        if ev["event_id"] not in self.logged_kickoff:
-                            # consider kickoff when time_elapsed >= 0 or status indicates kickoff
-                            if (isinstance(te, (int, float)) and int(te) >= 0) or ips in ("KickOff", "InPlay", "SecondHalfKickOff"):
-                                logger.info(
-                                    "KICKOFF | %s | %s | SP(H/D/A)=%.3f/%.3f/%.3f | fav=%s | strat=%s",
-                                    ev.get("comp"),
-                                    ev.get("event_name"),
-                                    ev.get("h_SP") or -1,
-                                    ev.get("d_SP") or -1,
-                                    ev.get("a_SP") or -1,
-                                    ev.get("fav"),
-                                    ev.get("strategy"),
-                                )
-                                self.logged_kickoff.add(ev["event_id"])
-
-                        # ===== LOGGING INTERVAL =================
-                        
-                        if (isinstance(te, (int, float)) and int(te) >= 0) or ips in ("KickOff", "InPlay", "SecondHalfKickOff"):  
-                            t = int(te)
-                            band = self._band_for_time(t)
-                            last = self.last_logged_band.get(ev["event_id"])
-                            if band in (15,30,45,60,75,90) and last != band and ips not in ("Finished", "Cancelled", "Abandoned"):
-                                logger.info(
-                                    "BAND %s' | %s | %s | %s | %s-%s | RC(H/A)=%s/%s | strat=%s",
-                                    band,
-                                    ev.get("time_elapsed"),
-                                    ev.get("comp"),
-                                    ev.get("event_name"),
-                                    ev.get("h_score"),
-                                    ev.get("a_score"),
-                                    ev.get("h_red_cards"),
-                                    ev.get("a_red_cards"),
-                                    ev.get("strategy"),
-                                )
-                            self.last_logged_band[ev["event_id"]] = band
-
-                    except Exception as e:
-                        logger.warning("Skipping live update for %s: %s", event_id, e)
-
-                    # ===== Run strategy logic =====
-                    for strat in self.strategies:
-                        try:
-                            
-                            strat.assign_if_applicable(db, ev)
-                            strat.on_tick(db, ev, api=api)
-                        except Exception as e:
-                            logger.error("[%s] error on %s: %s", strat.name, ev.get("event_id"), e)
-
-                if api:
-                    try:
-                        api.logout()
-                    except Exception:
-                        pass
-                # ===== HEARTBEAT CHECK ============
-                now = time.time()
-                if now - self._last_heartbeat > 60:
-                    total = db.conn.execute("SELECT COUNT(*) FROM current_matches").fetchone()[0]
-                    inplay = db.conn.execute(
-                        "SELECT COUNT(*) FROM current_matches WHERE inplay_status IS NOT NULL AND inplay_status != ''"
-                    ).fetchone()[0]
-                    with_strat = db.conn.execute(
-                        "SELECT COUNT(*) FROM current_matches WHERE strategy IS NOT NULL AND strategy != 'None'"
-                    ).fetchone()[0]
-
-                    logger.info("HEARTBEAT | total=%s inplay=%s with_strategy=%s", total, inplay, with_strat)
-                    self._last_heartbeat = now
-            # Short cooldown between ticks
-            time.sleep(10)
+        try:
+            # ===== Fetch Betfair in-play data =====
+            if api:
+                self._update_inplay_info(
+                    db, api, ev,
+                    score=scores.get(str(event_id)),
+                    market=books.get(ev.get("market_id_MATCH_ODDS")),
+                )
+            fresh_after = db.fetch_current(event_id)
+            if not fresh_after:
+                return None  # it was archived (or removed)
+            ev = dict(fresh_after)
+
+            # ===== ARCHIVE CHECK ===================
+            with metrics.span("archive_decision"):
+                self.decide_to_archive(db, api, ev)
 
+            #===== LOGGING KICKOFF ==================
+            ips = ev.get("inplay_status")
+            te = ev.get("time_elapsed")
+
+            if ev["event_id"] not in self.logged_kickoff:
+                # consider kickoff when time_elapsed >= 0 or status indicates kickoff
+                if (isinstance(te, (int, float)) and int(te) >= 0) or ips in ("KickOff", "InPlay", "SecondHalfKickOff"):
+                    logger.info(
+                        "KICKOFF | %s | %s | SP(H/D/A)=%.3f/%.3f/%.3f | fav=%s | strat=%s",
+                        ev.get("comp"),
+                        ev.get("event_name"),
+                        ev.get("h_SP") or -1,
+                        ev.get("d_SP") or -1,
+                        ev.get("a_SP") or -1,
+                        ev.get("fav"),
+                        ev.get("strategy"),
+                    )
+                    self.logged_kickoff.add(ev["event_id"])
+
+            # ===== LOGGING INTERVAL =================
+            
+            if (isinstance(te, (int, float)) and int(te) >= 0) or ips in ("KickOff", "InPlay", "SecondHalfKickOff"):  
+                t = int(te)
+                band = self._band_for_time(t)
+                last = self.last_logged_band.get(ev["event_id"])
+                if band in (15,30,45,60,75,90) and last != band and ips not in ("Finished", "Cancelled", "Abandoned"):
+                    logger.info(
+                        "BAND %s' | %s | %s | %s | %s-%s | RC(H/A)=%s/%s | strat=%s",
+                        band,
+                        ev.get("time_elapsed"),
+                        ev.get("comp"),
+                        ev.get("event_name"),
+                        ev.get("h_score"),
+                        ev.get("a_score"),
+                        ev.get("h_red_cards"),
+                        ev.get("a_red_cards"),
+                        ev.get("strategy"),
+                    )
+                self.last_logged_band[ev["event_id"]] = band
+
+        except Exception as e:
+            logger.warning("Skipping live update for %s: %s", event_id, e)
+
+        return ev
+
+    def _run_strategies(self, db: DBHelper, api, ev: Dict[str, Any], books: MarketSnapshot) -> None:
+        # ===== Run strategy logic =====
+        for strat in self.strategies:
+            try:
+                with metrics.span("assign_if_applicable", strategy=strat.name):
+                    strat.assign_if_applicable(db, ev)
+                with metrics.span("on_tick", strategy=strat.name):
+                    strat.on_tick(db, ev, api=api, books=books)
+            except Exception as e:
+                logger.error("[%s] error on %s: %s", strat.name, ev.get("event_id"), e)
+
+    def _maybe_heartbeat(self, db: DBHelper) -> None:
+        now = clock.time()
+        if now - self._last_heartbeat > 60:
+            total = db.count_current()
+            inplay = db.count_current("inplay_status IS NOT NULL AND inplay_status != ''")
+            with_strat = db.count_current("strategy IS NOT NULL AND strategy != 'None'")
+
+            logger.info("HEARTBEAT | total=%s inplay=%s with_strategy=%s", total, inplay, with_strat)
+            self._last_heartbeat = now
+
+
+    def _maybe_write_metrics(self) -> None:
+        """METRICS_DB_TABLE: every METRICS_DB_FLUSH_SEC, queue the phase timings of the window for the DB."""
+        if not METRICS_DB_TABLE or clock.time() - self._last_metrics_write < METRICS_DB_FLUSH_SEC:
+            return
+        self._last_metrics_write = clock.time()
+        rows = metrics.take_window()
+        if not rows:
+            return
+        try:
+            if self._writer is not None:
+                self._writer.submit(metrics.persist_window, rows)  # not waited for: timings never hold up a tick
+            else:
+                with self._db.tx():
+                    metrics.persist_window(self._db, rows)
+        except Exception as e:
+            logger.warning("METRICS | window not written: %s", e)
 
     def _compute_result(self, h: Optional[int], a: Optional[int]) -> Optional[int]:
         if h is None or a is None:
@@ -243,8 +569,56 @@ class AutoTrader:
         return 1 if int(h) != int(a) else 0
 
 
-    def _update_inplay_info(self, db: DBHelper, api, ev: Dict[str, Any]):
-        """Fetches in-play scores, red cards, market prices, SP (once), fav (once), and goal timeline."""
+    # ========== SCORES ==========
+    def _wants_scores(self, row, now: datetime) -> bool:
+        """True if the event is in-play (or was) or kicks off within SCORES_PREKO_MINUTES."""
+        if row["inplay_status"]:
+            return True
+        kickoff = row["kickoff"]
+        if not kickoff:
+            return False
+        try:
+            ko = datetime.fromisoformat(kickoff.replace("Z", "+00:00"))
+        except Exception:
+            return False
+        if ko.tzinfo is None:
+            ko = ko.replace(tzinfo=timezone.utc)
+        return ko - now <= timedelta(minutes=SCORES_PREKO_MINUTES)
+
+    def _fetch_scores(self, api, rows) -> Dict[str, Any]:
+        """
+        Fetch in-play scores for every relevant event in one pass (chunked by SCORES_BATCH_SIZE).
+        Returns {event_id: score}; events without a score (not started) are simply absent.
+        """
+        now = clock.now()
+        event_ids = [str(r["event_id"]) for r in rows if self._wants_scores(r, now)]
+
+        scores: Dict[str, Any] = {}
+        for i in range(0, len(event_ids), SCORES_BATCH_SIZE):
+            chunk = event_ids[i:i + SCORES_BATCH_SIZE]
+            try:
+                resp = api.in_play_service.get_scores(event_ids=chunk)
+            except Exception as e:
+                logger.warning("SCORES | batch fetch failed | size=%d err=%s", len(chunk), e)
+                continue
+            for s in resp or []:
+                ev_id = getattr(s, "event_id", None)
+                if ev_id is not None:
+                    scores[str(ev_id)] = s
+        return scores
+
+    # ========== MARKET BOOKS ==========
+    def _fetch_market_books(self, api, rows) -> MarketSnapshot:
+        """One list_market_book pass for every tracked MATCH_ODDS market."""
+        return fetch_market_snapshot(api, [r["market_id_MATCH_ODDS"] for r in rows])
+
+    def _update_inplay_info(self, db: DBHelper, api, ev: Dict[str, Any], score=None,
+                            market: Optional[MarketPrices] = None):
+        """
+        Applies in-play scores, red cards, market prices, SP (once), fav (once), and goal timeline.
+        `score` is this event's entry from _fetch_scores (None if not in-play yet);
+        `market` is this event's MATCH_ODDS entry from the tick's MarketSnapshot.
+        """
         event_id = ev["event_id"]
         market_id = ev.get("market_id_MATCH_ODDS")
         inplay_status = None
@@ -255,14 +629,9 @@ class AutoTrader:
         a_red = None
 
 
-        # 1) In-play status & score
-        try:
-            scores = api.in_play_service.get_scores(event_ids=[event_id])
-        except Exception:
-            scores = None
-
-        if scores:
-            s = scores[0]
+        # 1) In-play status & score (pre-fetched for the whole tick)
+        if score is not None:
+            s = score
 
             inplay_status = getattr(s, "match_status", None)
             time_elapsed = getattr(s, "time_elapsed", None)
@@ -286,51 +655,33 @@ class AutoTrader:
             )
 
             # Update goal timeline columns (writes bands once; backfills on finish)
-            self._update_goal_timeline(
-                db=db,
-                event_id=event_id,
-                time_elapsed=time_elapsed,
-                inplay_status=inplay_status,
-                h_score=h_score,
-                a_score=a_score,
-                ft_score=ev.get("ft_score"),
-            )
+            with metrics.span("goal_timeline"):
+                self._update_goal_timeline(
+                    db=db,
+                    event_id=event_id,
+                    time_elapsed=time_elapsed,
+                    inplay_status=inplay_status,
+                    h_score=h_score,
+                    a_score=a_score,
+                    ft_score=ev.get("ft_score"),
+                )
 
         # 2) Market prices + market state + Starting Prices (once) + fav (once)
-        if not market_id:
+        if not market_id or market is None:
             return
 
-        market_books = api.betting.list_market_book(market_ids=[market_id], price_projection={'priceData': ['EX_ALL_OFFERS']})
-        if not market_books:
-            return
-
-        book = market_books[0]
-        runners = getattr(book, "runners", None) or []
-        market_state = getattr(book, "status", None)  # e.g. OPEN, SUSPENDED, CLOSED
+        runners = market.runners
+        market_state = market.status  # e.g. OPEN, SUSPENDED, CLOSED
 
         # Update prices (best available back)
         if len(runners) >= 3:
-            def best_back_price(r):
-                ex = getattr(r, "ex", None)
-                atb = getattr(ex, "available_to_back", None) if ex else None
-                if atb and len(atb) > 0:
-                    return atb[0].price
-                return None
-            
-            def best_lay_price(r):
-                ex = getattr(r, "ex", None)
-                atl = getattr(ex, "available_to_lay", None) if ex else None
-                if atl and len(atl) > 0:
-                    return atl[0].price
-                return None
-
-            h_back_price = best_back_price(runners[0])
-            a_back_price = best_back_price(runners[1])
-            d_back_price = best_back_price(runners[2])
+            h_back_price = runners[0].best_back
+            a_back_price = runners[1].best_back
+            d_back_price = runners[2].best_back
 
-            h_lay_price = best_lay_price(runners[0])
-            a_lay_price = best_lay_price(runners[1])
-            d_lay_price = best_lay_price(runners[2])
+            h_lay_price = runners[0].best_lay
+            a_lay_price = runners[1].best_lay
+            d_lay_price = runners[2].best_lay
 
             db.update_current(
                 event_id,
@@ -363,18 +714,11 @@ class AutoTrader:
             except Exception:
                 return None
 
-        def _best_back_price(r):
-            ex = getattr(r, "ex", None)
-            atb = getattr(ex, "available_to_back", None) if ex else None
-            if atb and len(atb) > 0:
-                return atb[0].price
-            return None
-
         # Determine whether we are allowed to capture a snapshot now
         capture_now = False
 
         ko_dt = _parse_kickoff_dt(kickoff_iso)
-        now_utc = datetime.now(timezone.utc)
+        now_utc = clock.now()
 
         # 1) Pre-kickoff window capture (preferred)
         if ko_dt is not None:
@@ -392,9 +736,9 @@ class AutoTrader:
                 capture_now = True
 
         if capture_now and len(runners) >= 3:
-            h_snap = _best_back_price(runners[0])
-            a_snap = _best_back_price(runners[1])
-            d_snap = _best_back_price(runners[2])
+            h_snap = runners[0].best_back
+            a_snap = runners[1].best_back
+            d_snap = runners[2].best_back
 
             updates = {}
 
@@ -448,6 +792,8 @@ class AutoTrader:
 
         def maybe_write(tag: str, cur_h, cur_a):
             if h_score is not None and a_score is not None:
+                if cur_h == int(h_score) and cur_a == int(a_score):
+                    return  # band already holds this score
                 db.update_current(event_id, **{f"h_goals{tag}": int(h_score), f"a_goals{tag}": int(a_score)})
 
         # Write once when we enter each band (first value wins)
@@ -547,7 +893,7 @@ class AutoTrader:
                 db.update_current(event_id, inplay_status="Finished", ft_score=ft, result=result_val, pnl=pnl)
 
                 # ===== LOGGING ARCHIVE ==========
-                remaining = db.conn.execute("SELECT COUNT(*) FROM current_matches").fetchone()[0]
+                remaining = db.count_current()
 
                 logger.info(
                     "FINISH | %s | %s | FT=%s | result=%s | pnl=%s | strat=%s | remaining_current=%s",
@@ -570,7 +916,7 @@ class AutoTrader:
         if kickoff and inplay_status not in ("Finished", "Cancelled", "Abandoned"):
             try:
                 ko_dt = datetime.fromisoformat(kickoff.replace("Z", "+00:00"))
-                if datetime.now(timezone.utc) - ko_dt > timedelta(hours=4):
+                if clock.now() - ko_dt > timedelta(hours=4):
                     # print('test 3 not finished archive', ev['event_id'])
                     # Force finish using last known score
                     ft = ev["ft_score"] or (f"{int(h_score)}-{int(a_score)}" if h_score is not None and a_score is not None else None)
@@ -584,7 +930,7 @@ class AutoTrader:
                         
                         db.update_current(event_id, inplay_status="Finished", ft_score=ft, result=result_val, pnl=pnl)
                         # ===== LOGGING ARCHIVE ==========
-                        remaining = db.conn.execute("SELECT COUNT(*) FROM current_matches").fetchone()[0]
+                        remaining = db.count_current()
 
                         logger.info(
                             "FINISH | %s | %s | FT=%s | result=%s | pnl=%s | strat=%s | remaining_current=%s",
@@ -607,12 +953,12 @@ class AutoTrader:
         # Check if 2 days after kickoff, ft_score = NULL, only partial or none of intervals recorded.
         try:
             ko_dt = datetime.fromisoformat(kickoff.replace("Z", "+00:00"))
-            if datetime.now(timezone.utc) - ko_dt > timedelta(days=1):
+            if clock.now() - ko_dt > timedelta(days=1):
                 print('TEST - DECIDE TO ARCHIVE: DELETE 1')
                 if kickoff and (inplay_status not in ("Finished", "Cancelled", "Abandoned") or inplay_status == None) and not ev['ft_score'] and ((ev['time_elapsed'] and int(ev['time_elapsed']) < 90 ) or not ev['time_elapsed']):
                     print('TEST - DECIDE TO ARCHIVE: DELETE 2')
                     # ===== LOGGING ARCHIVE ==========
-                    remaining = db.conn.execute("SELECT COUNT(*) FROM current_matches").fetchone()[0]
+                    remaining = db.count_current()
 
                     logger.info(
                         "DELETE | %s | %s | reason=NO DATA| remaining_current=%s",
@@ -0,0 +1,779 @@
+"""
+fake_exchange.py — in-process simulated Betfair exchange for offline runs and benchmarks.
+
+FakeAPIClient stands in for betfairlightweight.APIClient with the surface the
+bot uses:
+  betting.list_market_catalogue / list_market_book / place_orders /
+  cancel_orders / list_current_orders, in_play_service.get_scores,
+  login_interactive / keep_alive / logout.
+Responses are plain objects with the betfairlightweight attribute names, so
+MatchFinder, market_snapshot, order_sync and the strategies' live branches run
+unchanged against it.
+
+FakeExchange holds the state:
+- one order book per (market, selection) with price-time priority: an incoming
+  order matches the best opposite price first and, at equal price, the oldest
+  resting order; it trades at the resting order's price and the rest of it
+  rests at its limit price,
+- scripted liquidity: each match has a price path (minutes from kick-off ->
+  best back/lay per runner). At every path point the market maker's old orders
+  are pulled and new ones (PRICE_PATH_DEPTH ticks deep) are sent *as orders*,
+  so a move through a resting bet fills it, and `traded` volume on a point
+  consumes the queue at the best prices in priority order,
+- a scripted score path (goals / red cards by minute) behind get_scores, with a
+  15-minute half-time: KickOff 0'-45', FirstHalfEnd, SecondHalfKickOff from
+  +60 min, Finished at +105 min (the market closes and unmatched bets lapse).
+
+Time is the exchange's own clock (naive UTC): advance(seconds) moves it, or pass
+clock= (any callable returning a datetime) to follow an external one. Every API
+call first applies the script points that are due.
+
+Usage:
+    ex = FakeExchange(latency=0.02)
+    ex.add_match("30000001", "Rapid Wien", "Sturm Graz", kickoff=ex.now + timedelta(minutes=2),
+                 comp="Austrian Bundesliga",
+                 prices=[(-10, {"home": (2.5, 2.52), "away": (3.0, 3.05), "draw": (3.4, 3.45)}),
+                         (65, {"draw": (2.2, 2.22)}, {"draw": 500.0})],
+                 goals=[(70, "home")])
+    api = FakeAPIClient(ex)
+    ex.advance(120)
+
+    python -m autotrader.fake_exchange --matches 20 --minutes 110   # scripted demo run
+"""
+
+from __future__ import annotations
+import argparse
+import bisect
+import itertools
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.settings import DRAW_SELECTION_ID
+
+logger = logging.getLogger("fake_exchange")
+
+HALF_TIME_MIN = 15
+PRICE_PATH_DEPTH = 3          # ladder rungs the market maker quotes per side
+PRICE_PATH_SIZE = 250.0       # size on the best rung; deeper rungs get more
+MARKET_NAMES = {"MATCH_ODDS": "Match Odds", "OVER_UNDER_45": "Over/Under 4.5 Goals", "CORRECT_SCORE": "Correct Score"}
+
+# Betfair price ladder: (up to, increment)
+_LADDER_STEPS = ((2, 0.01), (3, 0.02), (4, 0.05), (6, 0.1), (10, 0.2), (20, 0.5), (30, 1), (50, 2), (100, 5), (1000, 10))
+
+
+def _build_ladder() -> List[float]:
+    prices, lower = [1.01], 1.01
+    for upper, inc in _LADDER_STEPS:
+        n = 1
+        while lower + n * inc <= upper + 1e-9:
+            prices.append(round(lower + n * inc, 2))
+            n += 1
+        lower = prices[-1]
+    return prices
+
+
+PRICE_LADDER = _build_ladder()
+
+
+def on_ladder(price: float) -> bool:
+    i = bisect.bisect_left(PRICE_LADDER, round(price, 2))
+    return i < len(PRICE_LADDER) and PRICE_LADDER[i] == round(price, 2)
+
+
+def tick_offset(price: float, ticks: int) -> float:
+    """The ladder price `ticks` rungs away from price (clamped to the ladder)."""
+    i = bisect.bisect_left(PRICE_LADDER, round(price, 2))
+    return PRICE_LADDER[max(0, min(len(PRICE_LADDER) - 1, i + ticks))]
+
+
+def _field(d: Any, camel: str, snake: str, default=None):
+    """Read an instruction field built by betfairlightweight.filters (camelCase) or by hand (snake_case)."""
+    if not isinstance(d, dict):
+        return default
+    value = d.get(camel, d.get(snake))
+    return default if value is None else value
+
+
+def _ps(price: float, size: float) -> SimpleNamespace:
+    return SimpleNamespace(price=price, size=round(size, 2))
+
+
+class APIError(Exception):
+    """Raised for malformed requests, like betfairlightweight's APIError."""
+
+
+# =========================================
+# Order book
+# =========================================
+class FakeOrder:
+    __slots__ = ("bet_id", "market_id", "selection_id", "side", "price", "size", "size_matched", "matched_value",
+                 "size_cancelled", "size_lapsed", "size_voided", "persistence_type", "seq", "placed_date", "owner")
+
+    def __init__(self, bet_id: str, market_id: str, selection_id: int, side: str, price: float, size: float,
+                 persistence_type: str, seq: int, placed_date: datetime, owner: str):
+        self.bet_id = bet_id
+        self.market_id = market_id
+        self.selection_id = selection_id
+        self.side = side
+        self.price = price
+        self.size = size
+        self.size_matched = 0.0
+        self.matched_value = 0.0   # sum(price * size) of the fills, for average_price_matched
+        self.size_cancelled = 0.0
+        self.size_lapsed = 0.0
+        self.size_voided = 0.0
+        self.persistence_type = persistence_type
+        self.seq = seq
+        self.placed_date = placed_date
+        self.owner = owner
+
+    @property
+    def size_remaining(self) -> float:
+        return round(max(0.0, self.size - self.size_matched - self.size_cancelled - self.size_lapsed - self.size_voided), 2)
+
+    @property
+    def status(self) -> str:
+        return "EXECUTABLE" if self.size_remaining > 0 else "EXECUTION_COMPLETE"
+
+    @property
+    def average_price_matched(self) -> float:
+        return round(self.matched_value / self.size_matched, 2) if self.size_matched else 0.0
+
+    def fill(self, price: float, size: float) -> None:
+        self.size_matched = round(self.size_matched + size, 2)
+        self.matched_value += price * size
+
+    def as_current_order(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            bet_id=self.bet_id, market_id=self.market_id, selection_id=self.selection_id, handicap=0.0,
+            side=self.side, order_type="LIMIT", persistence_type=self.persistence_type, status=self.status,
+            price_size=_ps(self.price, self.size), average_price_matched=self.average_price_matched,
+            size_matched=self.size_matched, size_remaining=self.size_remaining,
+            size_cancelled=self.size_cancelled, size_lapsed=self.size_lapsed, size_voided=self.size_voided,
+            placed_date=self.placed_date, matched_date=None,
+        )
+
+
+class RunnerBook:
+    """Resting orders of one runner. BACK orders are offered to layers, LAY orders to backers."""
+
+    def __init__(self):
+        self.backs: List[FakeOrder] = []   # sorted by (price asc, seq): best for an incoming LAY first
+        self.lays: List[FakeOrder] = []    # sorted by (-price, seq): best for an incoming BACK first
+        self.total_matched = 0.0
+        self.last_price_traded: Optional[float] = None
+
+    def match(self, order: FakeOrder) -> List[Tuple[FakeOrder, float, float]]:
+        """Match an incoming order against the opposite side; rest what is left. Returns the fills."""
+        book = self.lays if order.side == "BACK" else self.backs
+        crosses = (lambda r: r.price >= order.price) if order.side == "BACK" else (lambda r: r.price <= order.price)
+        fills = []
+        while book and order.size_remaining > 0 and crosses(book[0]):
+            resting = book[0]
+            size = min(order.size_remaining, resting.size_remaining)
+            resting.fill(resting.price, size)
+            order.fill(resting.price, size)
+            fills.append((resting, resting.price, size))
+            self.total_matched = round(self.total_matched + size, 2)
+            self.last_price_traded = resting.price
+            if resting.size_remaining <= 0:
+                book.pop(0)
+        if order.size_remaining > 0:
+            self.rest(order)
+        return fills
+
+    def rest(self, order: FakeOrder) -> None:
+        if order.side == "BACK":
+            keys = [(o.price, o.seq) for o in self.backs]
+            self.backs.insert(bisect.bisect(keys, (order.price, order.seq)), order)
+        else:
+            keys = [(-o.price, o.seq) for o in self.lays]
+            self.lays.insert(bisect.bisect(keys, (-order.price, order.seq)), order)
+
+    def remove(self, order: FakeOrder) -> None:
+        side = self.backs if order.side == "BACK" else self.lays
+        if order in side:
+            side.remove(order)
+
+    def queue_ahead(self, order: FakeOrder) -> float:
+        """Unmatched size that would trade before `order` at its price (its queue position)."""
+        side = self.backs if order.side == "BACK" else self.lays
+        ahead = 0.0
+        for o in side:
+            if o is order:
+                break
+            ahead += o.size_remaining
+        return round(ahead, 2)
+
+    @staticmethod
+    def _ladder(orders: Iterable[FakeOrder], depth: int) -> List[SimpleNamespace]:
+        out: List[SimpleNamespace] = []
+        for o in orders:
+            if out and out[-1].price == o.price:
+                out[-1].size = round(out[-1].size + o.size_remaining, 2)
+            elif len(out) < depth:
+                out.append(_ps(o.price, o.size_remaining))
+            else:
+                break
+        return out
+
+    def available_to_back(self, depth: int) -> List[SimpleNamespace]:
+        return self._ladder(self.lays, depth)
+
+    def available_to_lay(self, depth: int) -> List[SimpleNamespace]:
+        return self._ladder(self.backs, depth)
+
+
+# =========================================
+# Markets and scripts
+# =========================================
+class FakeMarket:
+    def __init__(self, market_id: str, market_type: str, event: "FakeEvent", runners: Sequence[Tuple[int, str]]):
+        self.market_id = market_id
+        self.market_type = market_type
+        self.event = event
+        self.runners = list(runners)  # (selection_id, runner_name)
+        self.books: Dict[int, RunnerBook] = {sel: RunnerBook() for sel, _ in self.runners}
+        self.status = "OPEN"
+        self.inplay = False
+        self.mm_orders: List[FakeOrder] = []
+
+    def book(self, selection_id: int) -> Optional[RunnerBook]:
+        return self.books.get(selection_id)
+
+
+class FakeEvent:
+    def __init__(self, event_id: str, home: str, away: str, kickoff: datetime, comp: str, comp_id: str,
+                 country_code: str, prices: List[Tuple], goals: List[Tuple[float, str]],
+                 red_cards: List[Tuple[float, str]]):
+        self.event_id = event_id
+        self.home = home
+        self.away = away
+        self.kickoff = kickoff
+        self.comp = comp
+        self.comp_id = comp_id
+        self.country_code = country_code
+        self.prices = sorted(prices, key=lambda p: p[0])
+        self.goals = sorted(goals)
+        self.red_cards = sorted(red_cards)
+        self.markets: Dict[str, FakeMarket] = {}
+        self.next_price = 0        # index of the next price path point to apply
+        self.finished = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.home} v {self.away}"
+
+    def minutes(self, now: datetime) -> float:
+        return (now - self.kickoff).total_seconds() / 60.0
+
+    def clock(self, now: datetime) -> Tuple[Optional[str], Optional[int]]:
+        """(match_status, time_elapsed) at `now`; (None, None) before kick-off."""
+        m = self.minutes(now)
+        if m < 0:
+            return None, None
+        if m < 45:
+            return "KickOff", int(m)
+        if m < 45 + HALF_TIME_MIN:
+            return "FirstHalfEnd", 45
+        if m < 90 + HALF_TIME_MIN:
+            return "SecondHalfKickOff", int(m - HALF_TIME_MIN)
+        return "Finished", 90
+
+    def score(self, now: datetime) -> Dict[str, Dict[str, int]]:
+        m = self.minutes(now)
+        out = {"home": {"score": 0, "number_of_red_cards": 0}, "away": {"score": 0, "number_of_red_cards": 0}}
+        for minute, side in self.goals:
+            if minute <= m:
+                out[side]["score"] += 1
+        for minute, side in self.red_cards:
+            if minute <= m:
+                out[side]["number_of_red_cards"] += 1
+        return out
+
+
+# =========================================
+# Exchange
+# =========================================
+class FakeExchange:
+    def __init__(self, now: Optional[datetime] = None, clock: Optional[Callable[[], datetime]] = None,
+                 latency: float = 0.0, min_stake: float = 0.0):
+        """
+        now: start time of the manual clock (naive UTC; default: the wall clock).
+        clock: external time source instead of the manual clock.
+        latency: seconds every API call sleeps (outside the lock), to model the round-trip.
+        min_stake: smallest accepted order size (0 = no minimum).
+        """
+        self._clock = clock
+        self._now = (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+        self.latency = latency
+        self.min_stake = min_stake
+        self.events: Dict[str, FakeEvent] = {}
+        self.markets: Dict[str, FakeMarket] = {}
+        self.orders: Dict[str, FakeOrder] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._seq = itertools.count(1)
+        self._bet_ids = itertools.count(300_000_000_001)
+        self._market_ids = itertools.count(250_000_001)
+        self._selection_ids = itertools.count(1_000_001)
+
+    # ---------- clock ----------
+    @property
+    def now(self) -> datetime:
+        if self._clock is not None:
+            return self._clock().replace(tzinfo=None)
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        """Move the manual clock forward and apply the script points that became due."""
+        with self._lock:
+            self._now += timedelta(seconds=seconds)
+            self._step()
+
+    # ---------- scripting ----------
+    def add_match(self, event_id: str, home: str, away: str, kickoff: datetime, comp: str = "Fake League",
+                  comp_id: str = "1", country_code: str = "GB",
+                  prices: Sequence[Tuple] = (), goals: Sequence[Tuple[float, str]] = (),
+                  red_cards: Sequence[Tuple[float, str]] = (),
+                  market_types: Sequence[str] = ("MATCH_ODDS",)) -> FakeEvent:
+        """
+        Script one match.
+        prices: [(minute, {runner: (best_back, best_lay)}[, {runner: traded_size}])], minutes from kick-off
+                (negative = pre-off); runner is "home" / "away" / "draw" or a selection id.
+        goals / red_cards: [(minute, "home" | "away")].
+        Returns the event; its markets are in event.markets by market type.
+        """
+        if kickoff.tzinfo is not None:
+            kickoff = kickoff.astimezone(timezone.utc).replace(tzinfo=None)
+        ev = FakeEvent(str(event_id), home, away, kickoff, comp, str(comp_id), country_code,
+                       list(prices), list(goals), list(red_cards))
+        with self._lock:
+            for mtype in market_types:
+                if mtype == "MATCH_ODDS":
+                    runners = [(next(self._selection_ids), home), (next(self._selection_ids), away),
+                               (DRAW_SELECTION_ID, "The Draw")]
+                elif mtype == "OVER_UNDER_45":
+                    runners = [(1222347, "Under 4.5 Goals"), (1222346, "Over 4.5 Goals")]
+                else:
+                    runners = [(next(self._selection_ids), f"{h} - {a}") for h in range(4) for a in range(4)]
+                market = FakeMarket(f"1.{next(self._market_ids)}", mtype, ev, runners)
+                ev.markets[mtype] = market
+                self.markets[market.market_id] = market
+            self.events[ev.event_id] = ev
+            self._step()
+        return ev
+
+    def selection(self, market_id: str, runner) -> int:
+        """Selection id of "home" / "away" / "draw" (or an id) in a MATCH_ODDS market."""
+        if isinstance(runner, int):
+            return runner
+        market = self.markets[str(market_id)]
+        return {"home": market.runners[0][0], "away": market.runners[1][0], "draw": DRAW_SELECTION_ID}[runner]
+
+    def submit(self, market_id: str, selection_id: int, side: str, price: float, size: float,
+               owner: str = "other", persistence_type: str = "PERSIST") -> FakeOrder:
+        """Send an order from another participant (no validation); it matches like any order."""
+        with self._lock:
+            return self._submit(self.markets[str(market_id)], selection_id, side, price, size,
+                                persistence_type, owner)
+
+    def trade(self, market_id: str, selection_id: int, size: float) -> None:
+        """Aggressive volume of `size` on both sides of a runner at its current best prices."""
+        with self._lock:
+            market = self.markets[str(market_id)]
+            book = market.book(selection_id)
+            if book is None:
+                return
+            if book.lays:
+                self._submit(market, selection_id, "BACK", book.lays[0].price, size, "LAPSE", "taker", rest=False)
+            if book.backs:
+                self._submit(market, selection_id, "LAY", book.backs[0].price, size, "LAPSE", "taker", rest=False)
+
+    def queue_ahead(self, bet_id: str) -> Optional[float]:
+        """Size ahead of a resting bet in its price queue (None if it is not resting)."""
+        with self._lock:
+            order = self.orders.get(str(bet_id))
+            if order is None or order.size_remaining <= 0:
+                return None
+            return self.markets[order.market_id].book(order.selection_id).queue_ahead(order)
+
+    # ---------- internals ----------
+    def _call(self, name: str) -> None:
+        with self._lock:  # the order queues call in from their thread pools
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _submit(self, market: FakeMarket, selection_id: int, side: str, price: float, size: float,
+                persistence_type: str, owner: str, rest: bool = True) -> FakeOrder:
+        order = FakeOrder(str(next(self._bet_ids)), market.market_id, selection_id, side, float(price),
+                          float(size), persistence_type, next(self._seq), self.now, owner)
+        book = market.book(selection_id)
+        book.match(order)
+        if not rest and order.size_remaining > 0:
+            book.remove(order)
+            order.size_lapsed = order.size_remaining
+        if owner == "user":
+            self.orders[order.bet_id] = order
+        return order
+
+    def _step(self) -> None:
+        """Apply every price path point, kick-off and full-time that is due at the current time."""
+        now = self.now
+        for ev in self.events.values():
+            if ev.finished:
+                continue
+            minute = ev.minutes(now)
+            while ev.next_price < len(ev.prices) and ev.prices[ev.next_price][0] <= minute:
+                self._apply_prices(ev, ev.prices[ev.next_price])
+                ev.next_price += 1
+            if minute >= 0:
+                for market in ev.markets.values():
+                    if not market.inplay:
+                        market.inplay = True
+                        self._lapse(market, only_lapse_type=True)
+            if minute >= 90 + HALF_TIME_MIN:
+                ev.finished = True
+                for market in ev.markets.values():
+                    market.status = "CLOSED"
+                    self._lapse(market, only_lapse_type=False)
+
+    def _apply_prices(self, ev: FakeEvent, point: Tuple) -> None:
+        market = ev.markets.get("MATCH_ODDS")
+        if market is None or market.status != "OPEN":
+            return
+        quotes = point[1]
+        traded = point[2] if len(point) > 2 else {}
+        moved = {self.selection(market.market_id, r) for r in quotes}
+        keep = []
+        for o in market.mm_orders:
+            if o.selection_id in moved and o.size_remaining > 0:
+                market.book(o.selection_id).remove(o)
+                o.size_cancelled = round(o.size_cancelled + o.size_remaining, 2)
+            elif o.size_remaining > 0:
+                keep.append(o)
+        market.mm_orders = keep
+        for runner, (back, lay) in quotes.items():
+            sel = self.selection(market.market_id, runner)
+            for depth in range(PRICE_PATH_DEPTH):
+                size = PRICE_PATH_SIZE * (depth + 1)
+                if back:  # the maker's LAY orders are what backers see as available to back
+                    market.mm_orders.append(self._submit(market, sel, "LAY", tick_offset(back, -depth), size,
+                                                         "PERSIST", "maker"))
+                if lay:
+                    market.mm_orders.append(self._submit(market, sel, "BACK", tick_offset(lay, depth), size,
+                                                         "PERSIST", "maker"))
+        for runner, size in traded.items():
+            self.trade(market.market_id, self.selection(market.market_id, runner), size)
+
+    def _lapse(self, market: FakeMarket, only_lapse_type: bool) -> None:
+        for book in market.books.values():
+            for side in (book.backs, book.lays):
+                for o in list(side):
+                    if only_lapse_type and o.persistence_type != "LAPSE":
+                        continue
+                    o.size_lapsed = round(o.size_lapsed + o.size_remaining, 2)
+                    side.remove(o)
+
+    def _validate(self, market: Optional[FakeMarket], instr: Dict[str, Any]) -> Optional[str]:
+        if market is None:
+            return "INVALID_MARKET_ID"
+        if market.status != "OPEN":
+            return "MARKET_NOT_OPEN_FOR_BETTING"
+        limit = _field(instr, "limitOrder", "limit_order", {})
+        price, size = _field(limit, "price", "price"), _field(limit, "size", "size")
+        if market.book(_field(instr, "selectionId", "selection_id")) is None:
+            return "INVALID_RUNNER"
+        if _field(instr, "side", "side") not in ("BACK", "LAY"):
+            return "INVALID_BET_SIDE"
+        if price is None or not on_ladder(float(price)):
+            return "INVALID_ODDS"
+        if size is None or float(size) <= 0 or float(size) < self.min_stake:
+            return "INVALID_BET_SIZE"
+        return None
+
+    # ---------- API operations (called through FakeAPIClient) ----------
+    def list_market_catalogue(self, filter: Optional[Dict[str, Any]] = None, market_projection=None,
+                              max_results: int = 1000, **_) -> List[SimpleNamespace]:
+        self._call("list_market_catalogue")
+        flt = filter or {}
+        types = set(_field(flt, "marketTypeCodes", "market_type_codes", []) or [])
+        ids = set(_field(flt, "marketIds", "market_ids", []) or [])
+        window = _field(flt, "marketStartTime", "market_start_time", {})
+        frm, to = window.get("from"), window.get("to")
+        frm = datetime.strptime(frm, "%Y-%m-%dT%H:%M:%SZ") if frm else None
+        to = datetime.strptime(to, "%Y-%m-%dT%H:%M:%SZ") if to else None
+        out = []
+        with self._lock:
+            self._step()
+            for m in self.markets.values():
+                ev = m.event
+                if (types and m.market_type not in types) or (ids and m.market_id not in ids) or m.status == "CLOSED":
+                    continue
+                if (frm and ev.kickoff < frm) or (to and ev.kickoff > to):
+                    continue
+                out.append(SimpleNamespace(
+                    market_id=m.market_id, market_name=MARKET_NAMES.get(m.market_type, m.market_type),
+                    market_type=m.market_type, market_start_time=ev.kickoff, total_matched=None,
+                    competition=SimpleNamespace(id=ev.comp_id, name=ev.comp),
+                    event=SimpleNamespace(id=ev.event_id, name=ev.name, country_code=ev.country_code,
+                                          open_date=ev.kickoff),
+                    event_type=SimpleNamespace(id="1", name="Soccer"),
+                    runners=[SimpleNamespace(selection_id=sel, runner_name=name, handicap=0.0, sort_priority=i + 1)
+                             for i, (sel, name) in enumerate(m.runners)],
+                ))
+                if len(out) >= max_results:
+                    break
+        return out
+
+    def list_market_book(self, market_ids: Sequence[str], price_projection=None, **_) -> List[SimpleNamespace]:
+        self._call("list_market_book")
+        out = []
+        with self._lock:
+            self._step()
+            for mid in market_ids:
+                m = self.markets.get(str(mid))
+                if m is None:
+                    continue
+                runners = []
+                for sel, _ in m.runners:
+                    book = m.books[sel]
+                    runners.append(SimpleNamespace(
+                        selection_id=sel, status="ACTIVE", handicap=0.0, total_matched=book.total_matched,
+                        last_price_traded=book.last_price_traded,
+                        ex=SimpleNamespace(available_to_back=book.available_to_back(PRICE_PATH_DEPTH),
+                                           available_to_lay=book.available_to_lay(PRICE_PATH_DEPTH),
+                                           traded_volume=[]),
+                    ))
+                out.append(SimpleNamespace(
+                    market_id=m.market_id, status=m.status, inplay=m.inplay,
+                    total_matched=round(sum(b.total_matched for b in m.books.values()), 2), runners=runners,
+                ))
+        return out
+
+    def place_orders(self, market_id: str, instructions: Sequence[Dict[str, Any]],
+                     customer_ref: Optional[str] = None, **_) -> SimpleNamespace:
+        self._call("place_orders")
+        if not instructions:
+            raise APIError("place_orders: no instructions")
+        with self._lock:
+            self._step()
+            market = self.markets.get(str(market_id))
+            errors = [self._validate(market, i) for i in instructions]
+            if any(errors):
+                reports = [SimpleNamespace(status="FAILURE", error_code=e or "ERROR_IN_ORDER", bet_id=None,
+                                           size_matched=0.0, average_price_matched=0.0, placed_date=None,
+                                           instruction=i) for i, e in zip(instructions, errors)]
+                return SimpleNamespace(status="FAILURE", error_code=next(e for e in errors if e),
+                                       market_id=str(market_id), customer_ref=customer_ref,
+                                       place_instruction_reports=reports)
+            reports = []
+            for instr in instructions:
+                limit = _field(instr, "limitOrder", "limit_order", {})
+                order = self._submit(market, _field(instr, "selectionId", "selection_id"), instr.get("side"),
+                                     float(limit.get("price")), float(limit.get("size")),
+                                     _field(limit, "persistenceType", "persistence_type", "LAPSE"), "user")
+                reports.append(SimpleNamespace(
+                    status="SUCCESS", error_code=None, bet_id=order.bet_id, order_status=order.status,
+                    size_matched=order.size_matched, average_price_matched=order.average_price_matched,
+                    placed_date=order.placed_date, instruction=instr,
+                ))
+        return SimpleNamespace(status="SUCCESS", error_code=None, market_id=str(market_id),
+                               customer_ref=customer_ref, place_instruction_reports=reports)
+
+    def cancel_orders(self, market_id: Optional[str] = None, instructions: Optional[Sequence[Dict[str, Any]]] = None,
+                      customer_ref: Optional[str] = None, **_) -> SimpleNamespace:
+        self._call("cancel_orders")
+        reports = []
+        with self._lock:
+            self._step()
+            if not instructions:  # cancel everything unmatched (in one market, or all)
+                instructions = [{"betId": o.bet_id} for o in self.orders.values()
+                                if o.size_remaining > 0 and (market_id is None or o.market_id == str(market_id))]
+            for instr in instructions:
+                order = self.orders.get(str(_field(instr, "betId", "bet_id")))
+                if order is None or (market_id is not None and order.market_id != str(market_id)):
+                    reports.append(SimpleNamespace(status="FAILURE", error_code="INVALID_BET_ID",
+                                                   size_cancelled=0.0, cancelled_date=None, instruction=instr))
+                    continue
+                if order.size_remaining <= 0:
+                    reports.append(SimpleNamespace(status="FAILURE", error_code="BET_TAKEN_OR_LAPSED",
+                                                   size_cancelled=0.0, cancelled_date=None, instruction=instr))
+                    continue
+                reduction = _field(instr, "sizeReduction", "size_reduction")
+                size = order.size_remaining if reduction is None else min(float(reduction), order.size_remaining)
+                order.size_cancelled = round(order.size_cancelled + size, 2)
+                if order.size_remaining <= 0:
+                    self.markets[order.market_id].book(order.selection_id).remove(order)
+                reports.append(SimpleNamespace(status="SUCCESS", error_code=None, size_cancelled=size,
+                                               cancelled_date=self.now, instruction=instr))
+        failed = sum(1 for r in reports if r.status != "SUCCESS")
+        status = "SUCCESS" if not failed else ("FAILURE" if failed == len(reports) else "PROCESSED_WITH_ERRORS")
+        return SimpleNamespace(status=status, error_code=None, market_id=market_id, customer_ref=customer_ref,
+                               cancel_instruction_reports=reports)
+
+    def list_current_orders(self, bet_ids: Optional[Sequence[str]] = None, market_ids: Optional[Sequence[str]] = None,
+                            from_record: int = 0, record_count: int = 1000, **_) -> SimpleNamespace:
+        """Unmatched bets plus bets with a matched part, until their market closes (then: cleared orders)."""
+        self._call("list_current_orders")
+        wanted_bets = {str(b) for b in bet_ids} if bet_ids else None
+        wanted_markets = {str(m) for m in market_ids} if market_ids else None
+        with self._lock:
+            self._step()
+            orders = [o for o in self.orders.values()
+                      if (wanted_bets is None or o.bet_id in wanted_bets)
+                      and (wanted_markets is None or o.market_id in wanted_markets)
+                      and self.markets[o.market_id].status != "CLOSED"
+                      and (o.size_remaining > 0 or o.size_matched > 0)]
+            page = orders[from_record:from_record + (record_count or len(orders))]
+            result = [o.as_current_order() for o in page]
+        return SimpleNamespace(orders=result, more_available=from_record + len(page) < len(orders))
+
+    def get_scores(self, event_ids: Sequence[str], **_) -> List[SimpleNamespace]:
+        """Scores of the requested events that have kicked off; others are absent, like the real service."""
+        self._call("get_scores")
+        out = []
+        with self._lock:
+            self._step()
+            now = self.now
+            for eid in event_ids:
+                ev = self.events.get(str(eid))
+                if ev is None:
+                    continue
+                status, elapsed = ev.clock(now)
+                if status is None:
+                    continue
+                sc = ev.score(now)
+                out.append(SimpleNamespace(
+                    event_id=int(ev.event_id) if ev.event_id.isdigit() else ev.event_id,
+                    match_status=status, time_elapsed=elapsed,
+                    score=SimpleNamespace(home=SimpleNamespace(name=ev.home, **sc["home"]),
+                                          away=SimpleNamespace(name=ev.away, **sc["away"])),
+                ))
+        return out
+
+
+# =========================================
+# Client facade
+# =========================================
+class _Endpoint:
+    """Exposes a fixed set of FakeExchange operations under one endpoint name."""
+
+    def __init__(self, exchange: FakeExchange, operations: Sequence[str]):
+        for name in operations:
+            setattr(self, name, getattr(exchange, name))
+
+
+class FakeAPIClient:
+    """Drop-in for betfairlightweight.APIClient backed by a FakeExchange."""
+
+    def __init__(self, exchange: FakeExchange, username: str = "fake", password: str = "", app_key: str = "fake"):
+        self.exchange = exchange
+        self.username = username
+        self.password = password
+        self.app_key = app_key
+        self.session_token: Optional[str] = None
+        self.betting = _Endpoint(exchange, ("list_market_catalogue", "list_market_book", "place_orders",
+                                            "cancel_orders", "list_current_orders"))
+        self.in_play_service = _Endpoint(exchange, ("get_scores",))
+
+    def login_interactive(self) -> SimpleNamespace:
+        self.exchange._call("login")
+        self.session_token = f"fake-{id(self)}"
+        return SimpleNamespace(status="SUCCESS", session_token=self.session_token)
+
+    def login(self) -> SimpleNamespace:
+        return self.login_interactive()
+
+    def keep_alive(self) -> SimpleNamespace:
+        self.exchange._call("keep_alive")
+        return SimpleNamespace(status="SUCCESS", token=self.session_token)
+
+    def logout(self) -> SimpleNamespace:
+        self.exchange._call("logout")
+        self.session_token = None
+        return SimpleNamespace(status="SUCCESS")
+
+
+# =========================================
+# Demo scripts
+# =========================================
+def scripted_match_prices(rng: random.Random, goals: Sequence[Tuple[float, str]], minutes: int = 105,
+                          step: int = 5, traded: float = 200.0) -> List[Tuple]:
+    """
+    A plausible Match Odds price path: the draw shortens while the score is level and
+    drifts after a goal; a leading side shortens. One point every `step` minutes from -30.
+    """
+    h, a, d = rng.uniform(1.8, 3.5), rng.uniform(2.5, 5.0), rng.uniform(3.0, 3.8)
+    path = []
+    for minute in range(-30, minutes, step):
+        diff = sum(1 if s == "home" else -1 for m, s in goals if m <= minute)
+        left = max(0.0, 1.0 - max(0, minute - HALF_TIME_MIN * (minute > 45)) / 90.0)
+        draw = max(1.05, 1 + (d - 1) * left) if diff == 0 else min(1000.0, d * (1 + 8 * (1 - left)) * abs(diff))
+        home = max(1.02, h * (0.7 if diff > 0 else 1.3 if diff < 0 else 1.0))
+        away = max(1.02, a * (0.7 if diff < 0 else 1.3 if diff > 0 else 1.0))
+        quotes = {}
+        for name, p in (("home", home), ("away", away), ("draw", draw)):
+            best_back = tick_offset(p, 0)
+            quotes[name] = (best_back, tick_offset(best_back, 1))
+        path.append((minute, quotes, {"draw": traded}))
+    return path
+
+
+def build_demo_exchange(n_matches: int, start: Optional[datetime] = None, seed: int = 7,
+                        kickoff_spread_min: int = 10, latency: float = 0.0) -> FakeExchange:
+    """n scripted matches kicking off over the next kickoff_spread_min minutes (random goals and reds)."""
+    rng = random.Random(seed)
+    ex = FakeExchange(now=start, latency=latency)
+    for i in range(n_matches):
+        goals = [(rng.uniform(1, 100), rng.choice(("home", "away"))) for _ in range(rng.choice((0, 0, 1, 2, 3)))]
+        reds = [(rng.uniform(20, 100), rng.choice(("home", "away")))] if rng.random() < 0.1 else []
+        ex.add_match(str(30_000_000 + i), f"Home {i}", f"Away {i}",
+                     kickoff=ex.now + timedelta(minutes=1 + rng.uniform(0, kickoff_spread_min)),
+                     comp="Austrian Bundesliga", comp_id="59", country_code="AT",
+                     prices=scripted_match_prices(rng, goals), goals=goals, red_cards=reds,
+                     market_types=("MATCH_ODDS", "OVER_UNDER_45", "CORRECT_SCORE"))
+    return ex
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run scripted matches on the simulated exchange and lay the draw in each.")
+    ap.add_argument("--matches", type=int, default=20)
+    ap.add_argument("--minutes", type=int, default=110, help="simulated minutes to run")
+    ap.add_argument("--step", type=float, default=60.0, help="simulated seconds per step")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    ex = build_demo_exchange(args.matches, seed=args.seed)
+    api = FakeAPIClient(ex)
+    api.login_interactive()
+
+    bets: Dict[str, str] = {}
+    for _ in range(int(args.minutes * 60 / args.step)):
+        ex.advance(args.step)
+        for book in api.betting.list_market_book(market_ids=[m.market_id for m in ex.markets.values()
+                                                             if m.market_type == "MATCH_ODDS"]):
+            draw = book.runners[2].ex
+            if book.market_id in bets or not book.inplay or not draw.available_to_lay:
+                continue
+            resp = api.betting.place_orders(market_id=book.market_id, instructions=[{
+                "orderType": "LIMIT", "selectionId": DRAW_SELECTION_ID, "side": "LAY",
+                "limitOrder": {"size": 10.0, "price": tick_offset(draw.available_to_lay[0].price, -1),
+                               "persistenceType": "PERSIST"}}])
+            bets[book.market_id] = resp.place_instruction_reports[0].bet_id
+
+    orders = {o.bet_id: o for o in ex.orders.values()}
+    matched = sum(1 for b in bets.values() if orders[b].size_matched > 0)
+    logger.info("Simulated %d matches: %d lays placed, %d matched, calls=%s",
+                args.matches, len(bets), matched, dict(sorted(ex.calls.items())))
+
+
+if __name__ == "__main__":
+    main()
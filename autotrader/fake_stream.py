@@ -0,0 +1,158 @@
+"""
+fake_stream.py — local Exchange Stream server that replays recorded change messages.
+
+Speaks enough of the stream protocol for ExchangeStream: sends the connection
+message, answers authentication/subscriptions with SUCCESS and then replays
+mcm/ocm lines from a recording (one raw JSON message per line, as written by
+ExchangeStream(record_to=...)). Market changes are filtered to the subscribed
+market ids. Timing follows each message's `pt` (publish time, ms) scaled by
+`speed`; speed=0 replays as fast as possible.
+
+Usage (offline run of the bot against a recording):
+    python -m autotrader.fake_stream benchmarks/data/stream_sample.jsonl --port 9443
+    # then set STREAM_HOST="127.0.0.1", STREAM_PORT=9443, STREAM_SSL=False
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import logging
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger("fake_stream")
+
+
+def load_recording(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    out = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                msg = json.loads(line)
+                if msg.get("op") in ("mcm", "ocm"):
+                    out.append(msg)
+    return out
+
+
+class FakeStreamServer:
+    def __init__(self, messages: List[Dict[str, Any]], host: str = "127.0.0.1", port: int = 0, speed: float = 0.0):
+        self.messages = messages
+        self.speed = speed
+        self._srv = socket.create_server((host, port))
+        self.host, self.port = self._srv.getsockname()[:2]
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.authenticated = 0
+        self.subscriptions: List[Dict[str, Any]] = []
+
+    # ---------- lifecycle ----------
+    def start(self) -> "FakeStreamServer":
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, name="fake-stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        try:
+            self._srv.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ---------- internals ----------
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                conn, _ = self._srv.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        send_lock = threading.Lock()
+
+        def send(msg):
+            with send_lock:
+                conn.sendall((json.dumps(msg) + "\r\n").encode("utf-8"))
+
+        replays: Dict[str, threading.Event] = {}
+        try:
+            send({"op": "connection", "connectionId": f"fake-{id(conn)}"})
+            for raw in conn.makefile("rb"):
+                line = raw.decode("utf-8").strip()
+                if not line:
+                    continue
+                req = json.loads(line)
+                op = req.get("op")
+                send({"op": "status", "id": req.get("id"), "statusCode": "SUCCESS", "connectionClosed": False})
+                if op == "authentication":
+                    self.authenticated += 1
+                elif op in ("marketSubscription", "orderSubscription"):
+                    self.subscriptions.append(req)
+                    kind = "mcm" if op == "marketSubscription" else "ocm"
+                    if kind in replays:
+                        replays[kind].set()  # new subscription replaces the old replay
+                    stop = replays[kind] = threading.Event()
+                    ids = set((req.get("marketFilter") or {}).get("marketIds") or [])
+                    threading.Thread(target=self._replay, args=(send, kind, req.get("id"), ids, stop),
+                                     daemon=True).start()
+        except OSError:
+            pass
+        finally:
+            for ev in replays.values():
+                ev.set()
+            conn.close()
+
+    def _replay(self, send, kind: str, sub_id, market_ids: set, stop: threading.Event) -> None:
+        prev_pt = None
+        for msg in self.messages:
+            if stop.is_set() or not self._running:
+                return
+            if msg.get("op") != kind:
+                continue
+            out = dict(msg, id=sub_id)
+            if kind == "mcm" and market_ids:
+                mc = [m for m in msg.get("mc") or [] if str(m.get("id")) in market_ids]
+                if not mc and msg.get("ct") != "HEARTBEAT":
+                    continue
+                out["mc"] = mc
+            pt = msg.get("pt")
+            if self.speed and pt is not None and prev_pt is not None:
+                time.sleep(max(0.0, (pt - prev_pt) / 1000.0 / self.speed))
+            prev_pt = pt if pt is not None else prev_pt
+            try:
+                send(out)
+            except OSError:
+                return
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay recorded Exchange Stream messages on a local port.")
+    ap.add_argument("recording")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9443)
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (0 = no delays)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    srv = FakeStreamServer(load_recording(args.recording), host=args.host, port=args.port, speed=args.speed).start()
+    logger.info("Fake stream listening on %s:%s (%d messages)", srv.host, srv.port, len(srv.messages))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()
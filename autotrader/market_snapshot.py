@@ -0,0 +1,121 @@
+"""
+MarketSnapshot — one immutable view of every tracked market book per tick.
+
+AutoTrader fetches all MATCH_ODDS books in a single pass (chunked so each
+list_market_book call stays under Betfair's request-weight limit). The price
+updater and every strategy's on_tick read from the same snapshot, so they
+never disagree on prices within a tick.
+"""
+
+from __future__ import annotations
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from core import clock
+from core.settings import (
+    MARKET_BOOK_PRICE_DATA,
+    MARKET_BOOK_WEIGHT_LIMIT,
+    MARKET_BOOK_PRICE_WEIGHTS,
+)
+
+logger = logging.getLogger("AutoTrader")
+
+
+class RunnerPrices(NamedTuple):
+    selection_id: Optional[int]
+    back: Tuple[Tuple[float, float], ...]   # available_to_back (price, size), best first
+    lay: Tuple[Tuple[float, float], ...]    # available_to_lay (price, size), best first
+    total_matched: Optional[float]
+
+    @property
+    def best_back(self) -> Optional[float]:
+        return self.back[0][0] if self.back else None
+
+    @property
+    def best_lay(self) -> Optional[float]:
+        return self.lay[0][0] if self.lay else None
+
+
+class MarketPrices(NamedTuple):
+    market_id: str
+    status: Optional[str]          # OPEN, SUSPENDED, CLOSED
+    inplay: Optional[bool]
+    runners: Tuple[RunnerPrices, ...]  # Betfair order: 0=home, 1=away, 2=draw
+
+    @classmethod
+    def from_book(cls, book) -> "MarketPrices":
+        """Copy the fields we use out of a betfairlightweight MarketBook."""
+        def ladder(ex, name):
+            rungs = getattr(ex, name, None) if ex else None
+            return tuple((float(p.price), float(p.size)) for p in (rungs or []))
+
+        runners = []
+        for r in getattr(book, "runners", None) or []:
+            ex = getattr(r, "ex", None)
+            runners.append(RunnerPrices(
+                selection_id=getattr(r, "selection_id", None),
+                back=ladder(ex, "available_to_back"),
+                lay=ladder(ex, "available_to_lay"),
+                total_matched=getattr(r, "total_matched", None),
+            ))
+        return cls(
+            market_id=str(getattr(book, "market_id", "")),
+            status=getattr(book, "status", None),
+            inplay=getattr(book, "inplay", None),
+            runners=tuple(runners),
+        )
+
+
+class MarketSnapshot:
+    """Read-only market_id -> MarketPrices mapping captured at `taken_at`."""
+
+    __slots__ = ("_markets", "taken_at")
+
+    def __init__(self, markets: Optional[Mapping[str, MarketPrices]] = None, taken_at: Optional[float] = None):
+        self._markets = MappingProxyType(dict(markets or {}))
+        self.taken_at = taken_at if taken_at is not None else clock.time()
+
+    def get(self, market_id) -> Optional[MarketPrices]:
+        if market_id is None:
+            return None
+        return self._markets.get(str(market_id))
+
+    def __contains__(self, market_id) -> bool:
+        return str(market_id) in self._markets
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def __iter__(self):
+        return iter(self._markets)
+
+
+def chunk_market_ids(market_ids: Iterable[str], price_data: List[str] = MARKET_BOOK_PRICE_DATA) -> List[List[str]]:
+    """Split market ids so each chunk's request weight stays <= MARKET_BOOK_WEIGHT_LIMIT."""
+    per_market = max(1, sum(MARKET_BOOK_PRICE_WEIGHTS.get(p, 0) for p in price_data))
+    size = max(1, MARKET_BOOK_WEIGHT_LIMIT // per_market)
+    ids = list(market_ids)
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def fetch_market_snapshot(api, market_ids: Iterable[Any], price_data: List[str] = MARKET_BOOK_PRICE_DATA) -> MarketSnapshot:
+    """
+    One list_market_book pass over every market id (deduplicated, weight-chunked).
+    A failed chunk is logged and its markets are simply absent from the snapshot.
+    """
+    ids = list(dict.fromkeys(str(m) for m in market_ids if m))
+    markets: Dict[str, MarketPrices] = {}
+    taken_at = clock.time()
+
+    for chunk in chunk_market_ids(ids, price_data):
+        try:
+            books = api.betting.list_market_book(market_ids=chunk, price_projection={"priceData": list(price_data)})
+        except Exception as e:
+            logger.warning("MARKET_BOOK | chunk fetch failed | size=%d err=%s", len(chunk), e)
+            continue
+        for book in books or []:
+            mp = MarketPrices.from_book(book)
+            markets[mp.market_id] = mp
+
+    return MarketSnapshot(markets, taken_at=taken_at)
@@ -0,0 +1,283 @@
+"""
+MatchStateStore — in-memory current_matches, the source of truth during a tick.
+
+AutoTrader and the strategies talk to it exactly like a DBHelper
+(fetch_current / update_current / list_current / archive_match / ...), but reads
+come from memory and writes only mark fields dirty. flush() writes every dirty
+field to SQLite in a single transaction (once per tick, or every STATE_FLUSH_SEC).
+Writes that do not change a value are dropped, and the flush goes through
+DBHelper.coalesce(), so each changed row costs at most one UPDATE.
+
+Rows MatchFinder adds or changes arrive as match_events notifications
+(merge_rows); the periodic table re-read (STATE_RESYNC_SEC) is only a safety net.
+
+Crash safety: SQLite stays the durable copy. On startup (first attach) the store
+is rebuilt from the table; anything not yet flushed is at most one tick old.
+Fields in STATE_CRITICAL_FIELDS (e.g. a live bet id) are flushed immediately.
+
+With a DBWriter (DB_SINGLE_WRITER), the attached DBHelper is a read-only
+connection and every write — flush, archive, delete, upsert, stream log — is a
+command on the writer thread.
+"""
+
+from __future__ import annotations
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+from core import clock, match_events
+from core.settings import TABLE_CURRENT, STATE_FLUSH_SEC, STATE_RESYNC_SEC, STATE_CRITICAL_FIELDS
+from core.db_helper import DBHelper
+from core.db_writer import DBWriter
+
+logger = logging.getLogger("AutoTrader")
+
+
+def _flush_rows(db: DBHelper, pending: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> int:
+    # One UPDATE per row that really changed on disk; no-op rows are skipped
+    with db.coalesce():
+        for ev_id, fields in pending.items():
+            db.stage_current(ev_id, **fields)
+        return db.flush_staged(baseline=baseline)
+
+
+class MatchStateStore:
+    def __init__(self, writer: Optional[DBWriter] = None):
+        self.db: Optional[DBHelper] = None
+        self.writer = writer
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._prior: Dict[str, Dict[str, Any]] = {}  # on-disk value of each dirty field (flush baseline)
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._last_flush = 0.0
+        self._last_sync = 0.0
+
+    # ---------- lifecycle ----------
+    def attach(self, db: DBHelper) -> "MatchStateStore":
+        """Bind this tick's DBHelper. First attach rebuilds the store from the table (recovery)."""
+        with self._lock:
+            self.db = db
+            if not self._loaded:
+                self.load()
+            elif clock.time() - self._last_sync >= STATE_RESYNC_SEC:
+                self.sync_from_db()
+        return self
+
+    def load(self) -> None:
+        """Rebuild the store from current_matches (startup / crash recovery)."""
+        with self._lock:
+            self._rows = {str(r["event_id"]): dict(r) for r in self.db.list_current()}
+            self._dirty.clear()
+            self._prior.clear()
+            self._loaded = True
+            self._last_sync = clock.time()
+            logger.info("STATE | loaded %d rows from %s", len(self._rows), TABLE_CURRENT)
+
+    @property
+    def loaded(self) -> bool:
+        """True once the first attach() has read current_matches."""
+        return self._loaded
+
+    def sync_from_db(self) -> None:
+        """
+        Pick up rows written by other writers (MatchFinder): new rows are added, removed rows dropped,
+        and clean fields of known rows refreshed. Dirty fields always win over the table.
+        """
+        with self._lock:
+            db_rows = {str(r["event_id"]): dict(r) for r in self.db.list_current()}
+            for ev_id in set(self._rows) - set(db_rows):
+                if ev_id not in self._dirty:
+                    del self._rows[ev_id]
+            for ev_id, fresh in db_rows.items():
+                self._merge_row(ev_id, fresh)
+            self._last_sync = clock.time()
+
+    def merge_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Apply rows another writer just stored (MatchFinder's added/changed notifications) without
+        re-reading the table: new events are added, known ones refreshed; dirty fields win.
+        Only MatchFinder's own columns (match_events.FINDER_FIELDS) of a known row are taken: the
+        rows were read back before publishing, so their strategy/order fields may predate a flush
+        that committed in between. Returns how many rows were new.
+        """
+        added = 0
+        with self._lock:
+            for fresh in rows:
+                ev_id = str(fresh["event_id"])
+                if ev_id in self._rows:
+                    fresh = {k: v for k, v in fresh.items() if k in match_events.FINDER_FIELDS}
+                else:
+                    added += 1
+                self._merge_row(ev_id, fresh)
+        return added
+
+    def _merge_row(self, ev_id: str, fresh: Dict[str, Any]) -> None:
+        dirty = self._dirty.get(ev_id, {})
+        cur = self._rows.setdefault(ev_id, {})
+        prior = self._prior.get(ev_id, {})
+        for k, v in fresh.items():
+            if k not in dirty:
+                cur[k] = v
+            elif k in prior:
+                prior[k] = v
+
+    def flush(self, force: bool = True) -> int:
+        """Write all dirty fields in one transaction. Returns the number of rows actually updated."""
+        with self._lock:
+            if not self._dirty:
+                self._last_flush = clock.time()
+                return 0
+            if not force and clock.time() - self._last_flush < STATE_FLUSH_SEC:
+                return 0
+            pending, self._dirty = self._dirty, {}
+            prior, self._prior = self._prior, {}
+            # Last known on-disk rows: memory for clean fields, the pre-tick value for dirty ones
+            baseline = {ev_id: {**self._rows.get(ev_id, {}), **prior.get(ev_id, {})} for ev_id in pending}
+            try:
+                written = self._write(_flush_rows, pending, baseline)
+            except Exception:
+                # Keep the writes for the next attempt (newer values win)
+                for ev_id, fields in pending.items():
+                    self._dirty.setdefault(ev_id, {}).update({k: v for k, v in fields.items()
+                                                              if k not in self._dirty.get(ev_id, {})})
+                    self._prior.setdefault(ev_id, {}).update(prior.get(ev_id, {}))
+                raise
+            self._last_flush = clock.time()
+            logger.debug("STATE | flush rows=%d written=%d", len(pending), written)
+            return written
+
+    def maybe_flush(self) -> int:
+        """Flush if STATE_FLUSH_SEC has passed since the last flush (0 = every call)."""
+        return self.flush(force=False)
+
+    def _write(self, fn, *args):
+        """Run fn(db, *args) as a write: on the writer thread if there is one, else on the attached DBHelper."""
+        if self.writer is not None:
+            return self.writer.call(fn, *args)
+        return fn(self.db, *args)
+
+    # ---------- DBHelper-compatible surface ----------
+    @property
+    def conn(self):
+        return self.db.conn
+
+    @contextmanager
+    def tx(self):
+        if self.writer is not None:
+            yield  # each write is already its own committed command
+            return
+        with self.db.tx():
+            yield
+
+    def fetch_current(self, event_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._rows.get(str(event_id))
+            return dict(row) if row is not None else None
+
+    def list_current(self, where_sql: str = "", params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            if where_sql:
+                # Arbitrary SQL filters go to the table; make it current first
+                self.flush()
+                return [dict(r) for r in self.db.list_current(where_sql, params)]
+            return [dict(r) for r in self._rows.values()]
+
+    def count_current(self, where_sql: str = "", params: Iterable[Any] = ()) -> int:
+        with self._lock:
+            if where_sql:
+                self.flush()
+                return self.db.count_current(where_sql, params)
+            return len(self._rows)
+
+    def update_current(self, event_id: str, **fields) -> None:
+        if not fields:
+            return
+        ev_id = str(event_id)
+        with self._lock:
+            row = self._rows.get(ev_id)
+            if row is None:
+                return  # same as UPDATE ... WHERE on a missing row
+            clean = self.db._clean_fields(TABLE_CURRENT, fields)
+            # Only fields whose value actually changes become dirty
+            clean = {k: v for k, v in clean.items() if k not in row or not DBHelper._same_value(row[k], v)}
+            if not clean:
+                return
+            prior = self._prior.setdefault(ev_id, {})
+            for k in clean:
+                prior.setdefault(k, row.get(k))
+            row.update(clean)
+            row["updated_ts"] = DBHelper._now_utc()
+            self._dirty.setdefault(ev_id, {}).update(clean)
+            if any(k in STATE_CRITICAL_FIELDS and v is not None for k, v in clean.items()):
+                self.flush()
+
+    def upsert_current(self, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write(DBHelper.upsert_current, fields)
+            ev_id = str(fields["event_id"])
+            fresh = self.db.fetch_current(ev_id)
+            if fresh is not None:
+                row = self._rows.setdefault(ev_id, {})
+                row.update(dict(fresh))
+                row.update(self._dirty.get(ev_id, {}))
+                for k in self._prior.get(ev_id, {}):
+                    self._prior[ev_id][k] = fresh[k]
+
+    def refresh_fields(self, event_id: str, **fields) -> bool:
+        """
+        Apply values another writer already stored (e.g. a kick-off change from MatchFinder) to the
+        in-memory row without marking them dirty. Fields with pending local writes keep their value.
+        Returns False if the event is not in the store.
+        """
+        ev_id = str(event_id)
+        with self._lock:
+            row = self._rows.get(ev_id)
+            if row is None:
+                return False
+            dirty = self._dirty.get(ev_id, {})
+            prior = self._prior.get(ev_id, {})
+            for k, v in fields.items():
+                if k in dirty:
+                    if k in prior:
+                        prior[k] = v
+                else:
+                    row[k] = v
+            return True
+
+    def upsert_or_update_current(self, event_id: str, fields: dict):
+        if self.fetch_current(event_id) is not None:
+            self.update_current(event_id, **fields)
+        else:
+            self.upsert_current(dict(fields, event_id=event_id))
+
+    def archive_match(self, event_id: str) -> None:
+        ev_id = str(event_id)
+        with self._lock:
+            self.flush()
+            self._write(DBHelper.archive_match, ev_id)
+            self._rows.pop(ev_id, None)
+
+    def delete_from_current(self, event_id: str) -> None:
+        ev_id = str(event_id)
+        with self._lock:
+            self._write(DBHelper.delete_from_current, ev_id)
+            self._rows.pop(ev_id, None)
+            self._dirty.pop(ev_id, None)
+            self._prior.pop(ev_id, None)
+
+    def log_stream(self, fields: Dict[str, Any]) -> None:
+        if self.writer is None:
+            self.db.log_stream(fields)
+            return
+        # History rows are fire-and-forget: nothing reads them back within the tick
+        fut = self.writer.submit(DBHelper.log_stream, fields)
+        fut.add_done_callback(lambda f: f.exception() and logger.warning("STATE | log_stream failed: %s", f.exception()))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getattr__(self, name):
+        # Anything else (fetch_archive, get_stream_history, ...) goes straight to the DBHelper
+        return getattr(self.db, name)
@@ -0,0 +1,146 @@
+"""
+order_engine.py — batched, parallel order placement and cancellation for one tick.
+
+Strategies no longer call place_orders / cancel_orders themselves while the
+tick runs. They queue each instruction with a callback
+(BaseStrategy._place_order / _cancel_order); after the strategies have run,
+AutoTrader flushes the queues:
+
+- instructions are grouped per market_id, up to ORDER_PLACE_MAX_INSTRUCTIONS
+  per place_orders call (Betfair accepts up to 200) and
+  ORDER_CANCEL_MAX_INSTRUCTIONS per cancel_orders call (up to 60),
+- the calls go out in parallel on a bounded pool (ORDER_PLACE_WORKERS),
+- each instruction report is routed back to its callback by position
+  (Betfair returns reports in instruction order), on the flushing thread.
+
+A kick-off cluster of N entries (or N matches reaching 60' together) therefore
+costs about one round-trip per ORDER_PLACE_WORKERS markets instead of N serial ones.
+"""
+
+from __future__ import annotations
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.settings import ORDER_PLACE_WORKERS, ORDER_PLACE_MAX_INSTRUCTIONS, ORDER_CANCEL_MAX_INSTRUCTIONS
+
+logger = logging.getLogger("AutoTrader")
+
+# on_report(report, error): exactly one of them is set
+ReportCallback = Callable[[Any, Optional[BaseException]], None]
+
+
+class InstructionRequest:
+    __slots__ = ("market_id", "instruction", "on_report", "event_id")
+
+    def __init__(self, market_id: str, instruction, on_report: ReportCallback, event_id: Optional[str] = None):
+        self.market_id = str(market_id)
+        self.instruction = instruction
+        self.on_report = on_report
+        self.event_id = event_id
+
+
+class _InstructionQueue:
+    """Per-tick queue for one betting operation; subclasses name the API call and its report list."""
+    operation = ""     # api.betting method
+    reports_attr = ""  # response attribute holding the instruction reports
+    label = ""
+
+    def __init__(self, workers: int = ORDER_PLACE_WORKERS, max_instructions: int = 1):
+        self.workers = max(1, int(workers))
+        self.max_instructions = max(1, int(max_instructions))
+        self._pending: List[InstructionRequest] = []
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.calls = 0
+
+    def submit(self, market_id: str, instruction, on_report: ReportCallback, event_id: Optional[str] = None) -> None:
+        """Queue one instruction for the next flush (thread-safe)."""
+        with self._lock:
+            self._pending.append(InstructionRequest(market_id, instruction, on_report, event_id))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, api) -> int:
+        """Send everything queued; callbacks run here, in submission order. Returns the number of instructions."""
+        with self._lock:
+            reqs, self._pending = self._pending, []
+        if not reqs:
+            return 0
+        t0 = time.perf_counter()
+
+        by_market: Dict[str, List[InstructionRequest]] = {}
+        for r in reqs:
+            by_market.setdefault(r.market_id, []).append(r)
+        batches = [(m, rs[i:i + self.max_instructions])
+                   for m, rs in by_market.items() for i in range(0, len(rs), self.max_instructions)]
+
+        outcome: Dict[int, Tuple[Any, Optional[BaseException]]] = {}
+        if len(batches) == 1:
+            outcome.update(self._send(api, *batches[0]))
+        else:
+            pool = self._get_pool()
+            for fut in as_completed([pool.submit(self._send, api, m, rs) for m, rs in batches]):
+                outcome.update(fut.result())
+        self.calls += len(batches)
+
+        for r in reqs:
+            report, error = outcome.get(id(r), (None, RuntimeError("no instruction report")))
+            try:
+                r.on_report(report, error)
+            except Exception as e:
+                logger.error("ORDERS | report handler failed for %s: %s", r.event_id, e)
+
+        logger.info("ORDERS | %s instructions=%d markets=%d calls=%d took=%.3fs",
+                    self.label, len(reqs), len(by_market), len(batches), time.perf_counter() - t0)
+        return len(reqs)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    # ---------- internals ----------
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.operation)
+        return self._pool
+
+    def _send(self, api, market_id: str, reqs: List[InstructionRequest]) -> Dict[int, Tuple[Any, Optional[BaseException]]]:
+        """One API call for a market's instructions; maps id(request) -> (report, error)."""
+        try:
+            call = getattr(api.betting, self.operation)
+            resp = call(market_id=market_id, instructions=[r.instruction for r in reqs])
+            reports = list(getattr(resp, self.reports_attr, None) or [])
+        except Exception as e:
+            return {id(r): (None, e) for r in reqs}
+        out = {}
+        for i, r in enumerate(reqs):
+            if i < len(reports):
+                out[id(r)] = (reports[i], None)
+            else:
+                err = getattr(resp, "error_code", None) or getattr(resp, "status", None)
+                out[id(r)] = (None, RuntimeError(f"no instruction report ({err})"))
+        return out
+
+
+class OrderPlacementQueue(_InstructionQueue):
+    operation = "place_orders"
+    reports_attr = "place_instruction_reports"
+    label = "placed"
+
+    def __init__(self, workers: int = ORDER_PLACE_WORKERS, max_instructions: int = ORDER_PLACE_MAX_INSTRUCTIONS):
+        super().__init__(workers, max_instructions)
+
+
+class OrderCancelQueue(_InstructionQueue):
+    operation = "cancel_orders"
+    reports_attr = "cancel_instruction_reports"
+    label = "cancelled"
+
+    def __init__(self, workers: int = ORDER_PLACE_WORKERS, max_instructions: int = ORDER_CANCEL_MAX_INSTRUCTIONS):
+        super().__init__(workers, max_instructions)
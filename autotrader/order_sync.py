@@ -0,0 +1,184 @@
+"""
+order_sync.py — one order-state sync per tick for every open live bet.
+
+Instead of one list_current_orders(bet_ids=[betid]) call per event, the tick
+collects the bet ids of all open entries (e_betid set, not fully matched),
+fetches them in ORDER_SYNC_BET_IDS_PER_CALL chunks (paging on moreAvailable)
+and indexes the orders by bet_id as StreamOrder objects — the same shape the
+order stream cache produces. In streaming mode the orders come from the
+stream's cache (ExchangeStream.orders_for); REST is only asked for bets the
+stream does not have (just placed) or for all of them while the stream has a
+gap (no order image yet after a (re)connect, connection down, silent).
+
+sync_orders() then applies every order to its current_matches row through the
+tick's DB (the MatchStateStore), so all changes land in the tick's single
+flush. The strategies read the same OrderIndex (BaseStrategy.orders) instead of
+calling the API; a bet the index does not cover (e.g. placed during this tick)
+still falls back to a direct call.
+"""
+
+from __future__ import annotations
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.settings import PAPER_MODE, ORDER_SYNC_BET_IDS_PER_CALL, ORDER_SYNC_PAGE_SIZE
+from autotrader.streaming import ExchangeStream, StreamOrder
+
+logger = logging.getLogger("AutoTrader")
+
+
+class OrderIndex:
+    """bet_id -> StreamOrder for the bet ids one sync asked for."""
+
+    def __init__(self, requested: Iterable[str] = ()):
+        self.requested: Set[str] = {str(b) for b in requested}
+        self._orders: Dict[str, StreamOrder] = {}
+        self.calls = 0
+        self.streamed = 0  # orders taken from the order stream
+
+    def add(self, order: StreamOrder) -> None:
+        self._orders[order.bet_id] = order
+
+    def covers(self, bet_id) -> bool:
+        """True if this index was asked for bet_id (so a missing order really is missing)."""
+        return bet_id is not None and str(bet_id) in self.requested
+
+    def get(self, bet_id) -> Optional[StreamOrder]:
+        return self._orders.get(str(bet_id)) if bet_id else None
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+
+def to_stream_order(co) -> StreamOrder:
+    """CurrentOrder (REST) -> StreamOrder."""
+    o = StreamOrder(str(co.bet_id), str(getattr(co, "market_id", None)), getattr(co, "selection_id", None))
+    ps = getattr(co, "price_size", None)
+    o.side = getattr(co, "side", None)
+    o.price = getattr(ps, "price", None)
+    o.size = getattr(ps, "size", None)
+    o.size_matched = float(getattr(co, "size_matched", 0.0) or 0.0)
+    o.size_remaining = float(getattr(co, "size_remaining", 0.0) or 0.0)
+    o.size_cancelled = float(getattr(co, "size_cancelled", 0.0) or 0.0)
+    o.size_lapsed = float(getattr(co, "size_lapsed", 0.0) or 0.0)
+    o.size_voided = float(getattr(co, "size_voided", 0.0) or 0.0)
+    o.status = getattr(co, "status", None)
+    return o
+
+
+# Order states nothing at Betfair moves on from: cancelled (or the cancel failed because the bet
+# matched/lapsed meanwhile), completed, or no longer listed at all
+TERMINAL_STATUSES = ("EXECUTION_COMPLETE", "MISSING")
+TERMINAL_PREFIXES = ("CANCELLED_", "CANCEL_ERR_")
+
+
+def is_terminal(status) -> bool:
+    """True for an e_status the order sync must neither poll for nor overwrite."""
+    status = str(status or "").upper()
+    return status in TERMINAL_STATUSES or status.startswith(TERMINAL_PREFIXES)
+
+
+def needs_sync(ev: Dict[str, Any], prefix: str = "e") -> bool:
+    """Live entry with a bet id that is not fully matched yet and not in a terminal state."""
+    stake = ev.get(f"{prefix}_stake") or 0.0
+    matched = ev.get(f"{prefix}_matched") or 0.0
+    return (bool(ev.get(f"{prefix}_betid")) and stake > 0 and matched < stake
+            and not is_terminal(ev.get(f"{prefix}_status")))
+
+
+def fetch_order_index(api, bet_ids: Iterable[str], cached: Optional[Dict[str, StreamOrder]] = None) -> OrderIndex:
+    """
+    list_current_orders for bet_ids in chunks, following moreAvailable; raises on API errors.
+    Bets in `cached` (the order stream's copies) are indexed from there without a call.
+    """
+    index = OrderIndex(bet_ids)
+    for bet_id, order in (cached or {}).items():
+        if bet_id in index.requested:
+            index.add(order)
+            index.streamed += 1
+    ids = sorted(b for b in index.requested if index.get(b) is None)
+    for i in range(0, len(ids), ORDER_SYNC_BET_IDS_PER_CALL):
+        chunk = ids[i:i + ORDER_SYNC_BET_IDS_PER_CALL]
+        from_record = 0
+        while True:
+            resp = api.betting.list_current_orders(bet_ids=chunk, from_record=from_record,
+                                                   record_count=ORDER_SYNC_PAGE_SIZE)
+            index.calls += 1
+            orders = getattr(resp, "orders", None) or getattr(resp, "current_orders", None) or []
+            for co in orders:
+                index.add(to_stream_order(co))
+            if not getattr(resp, "more_available", False) or not orders:
+                break
+            from_record += len(orders)
+    return index
+
+
+def apply_order_state(db, ev: Dict[str, Any], order: Optional[StreamOrder], prefix: str = "e",
+                      log: Optional[logging.Logger] = None) -> Dict[str, Any]:
+    """
+    Write one order's state to its current_matches row (only if it changed).
+    order=None means Betfair no longer has the bet (settled/cancelled elsewhere) -> MISSING,
+    unless the row is already terminal (e.g. CANCELLED_...), which is kept as it is.
+    Returns {"status", "matched", "remaining"}.
+    """
+    log = log or logger
+    matched = ev.get(f"{prefix}_matched") or 0.0
+    if order is None:
+        if is_terminal(ev.get(f"{prefix}_status")):
+            return {"status": ev.get(f"{prefix}_status"), "matched": matched,
+                    "remaining": ev.get(f"{prefix}_remaining") or 0.0}
+        db.update_current(ev["event_id"], **{f"{prefix}_status": "MISSING", f"{prefix}_remaining": 0.0})
+        return {"status": "MISSING", "matched": matched, "remaining": 0.0}
+
+    new_matched = float(order.size_matched or 0.0)
+    new_remaining = float(order.size_remaining or 0.0)
+    new_status = order.status  # EXECUTABLE, EXECUTION_COMPLETE, etc.
+
+    # Only write if something actually changed
+    if (
+        new_matched != matched
+        or new_remaining != ev.get(f"{prefix}_remaining")
+        or new_status != ev.get(f"{prefix}_status")
+    ):
+        db.update_current(
+            ev["event_id"],
+            **{
+                f"{prefix}_matched": new_matched,
+                f"{prefix}_remaining": new_remaining,
+                f"{prefix}_status": new_status,
+            }
+        )
+        log.info(
+            "ORDER_SYNC | %s | betid=%s status=%s matched=%.2f remaining=%.2f",
+            ev["event_id"], order.bet_id, new_status, new_matched, new_remaining
+        )
+    return {"status": new_status, "matched": new_matched, "remaining": new_remaining}
+
+
+def sync_orders(db, api, rows: Iterable[Dict[str, Any]], prefix: str = "e",
+                stream: Optional[ExchangeStream] = None) -> Optional[OrderIndex]:
+    """
+    The tick's order-sync stage: fetch every open live bet in one pass and apply the results.
+    With a connected `stream`, its order cache answers and REST only covers what it lacks.
+    Returns the OrderIndex for the strategies, or None (paper mode, no API, nothing open, API error).
+    """
+    if PAPER_MODE or api is None:
+        return None
+    open_rows: List[Dict[str, Any]] = [ev for ev in map(dict, rows) if needs_sync(ev, prefix)]
+    if not open_rows:
+        return None
+    bet_ids = [str(r[f"{prefix}_betid"]) for r in open_rows]
+    cached = stream.orders_for(bet_ids) if stream is not None else None
+    try:
+        index = fetch_order_index(api, bet_ids, cached)
+    except Exception as e:
+        logger.error("ORDER_SYNC_FAIL | batch of %d bets | err=%s", len(open_rows), e)
+        return None
+    for ev in open_rows:
+        try:
+            apply_order_state(db, ev, index.get(ev[f"{prefix}_betid"]), prefix)
+        except Exception as e:
+            logger.error("ORDER_SYNC_FAIL | %s | betid=%s err=%s", ev["event_id"], ev.get(f"{prefix}_betid"), e)
+    logger.debug("ORDER_SYNC | bets=%d found=%d streamed=%d calls=%d",
+                 len(open_rows), len(index), index.streamed, index.calls)
+    return index
@@ -0,0 +1,214 @@
+"""
+paper_fill.py — queue-position-aware fill model for paper orders.
+
+A paper order no longer counts as matched the moment the price is acceptable.
+It fills the way a resting limit order would, from what each tick's market
+book shows for its runner:
+
+- at placement it takes the opposite side's visible liquidity at or better
+  than its price (a LAY at p against available_to_lay <= p); the rest rests
+  at p behind the size already visible there (its queue position),
+- the runner's traded-volume delta (total_matched, times
+  PAPER_FILL_VOLUME_SHARE for the side that hits resting orders) reaches the
+  order only at the front of its side: priced better than anything visible
+  there, it gets all of it; sharing the best price, it gets no more than the
+  size visible at that price went down by (volume traded elsewhere on the
+  ladder leaves the level alone). What reaches the level works through the
+  queue first and then fills the order,
+- cancellations ahead shorten the queue: it is never longer than the size
+  now visible at the order's price,
+- if the market moves through the price, the crossing liquidity at that
+  moment fills it — once per order: the paper order takes nothing out of the
+  real book, so more size showing at a crossed price, or a crossing that
+  goes away and comes back, is not a new fill; after the crossing only
+  traded volume fills the order.
+
+An order placed behind the visible depth starts with an unknown (infinite)
+queue that collapses to the visible size once its price shows on the ladder.
+State is in memory, a few floats per order, dropped when the entry is
+cancelled or the market closes; a restart re-enters open orders at the back
+of their queue (PaperFillModel.resume).
+"""
+
+from __future__ import annotations
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from core.settings import PAPER_FILL_VOLUME_SHARE
+from autotrader.market_snapshot import MarketPrices, RunnerPrices
+
+
+class PaperOrder:
+    __slots__ = ("selection_id", "side", "price", "size", "matched", "queue_ahead", "last_volume", "last_visible",
+                 "crossed")
+
+    def __init__(self, selection_id: int, side: str, price: float, size: float):
+        self.selection_id = selection_id
+        self.side = side
+        self.price = float(price)
+        self.size = float(size)
+        self.matched = 0.0
+        self.queue_ahead = float("inf")
+        self.last_volume: Optional[float] = None
+        self.last_visible: Optional[float] = None  # own-side size at the price in the last book
+        self.crossed = False  # crossing liquidity already taken (at placement or the first crossing)
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.size - self.matched)
+
+
+def _crossing_size(side: str, price: float, runner: RunnerPrices) -> float:
+    """Opposite-side size an order at `price` would take now."""
+    if side == "LAY":
+        return sum(s for p, s in runner.lay if p <= price)
+    return sum(s for p, s in runner.back if p >= price)
+
+
+def _own_side(side: str, runner: RunnerPrices):
+    """The ladder resting orders on this side show up in (a LAY rests in available_to_back)."""
+    return runner.back if side == "LAY" else runner.lay
+
+
+def _size_at(side: str, price: float, runner: RunnerPrices) -> Optional[float]:
+    """Size visible at exactly `price` on the order's own side; 0 if the price is inside the
+    visible range without a rung (or better than the best); None if it lies beyond the depth."""
+    ladder = _own_side(side, runner)
+    for p, s in ladder:
+        if p == price:
+            return s
+    if not ladder:
+        return 0.0
+    worst = ladder[-1][0]
+    beyond = price < worst if side == "LAY" else price > worst
+    return None if beyond else 0.0
+
+
+def _front(side: str, price: float, runner: RunnerPrices) -> int:
+    """1: better than every resting order on this side, 0: at the best price, -1: behind it."""
+    ladder = _own_side(side, runner)
+    if not ladder:
+        return 1
+    best = ladder[0][0]
+    if price == best:
+        return 0
+    better = price > best if side == "LAY" else price < best
+    return 1 if better else -1
+
+
+def _find_runner(market: Optional[MarketPrices], selection_id: int) -> Optional[RunnerPrices]:
+    if market is None:
+        return None
+    for r in market.runners:
+        if r.selection_id == selection_id:
+            return r
+    return None
+
+
+class PaperFillModel:
+    def __init__(self, volume_share: float = PAPER_FILL_VOLUME_SHARE):
+        self.volume_share = volume_share
+        self._orders: Dict[str, Dict[str, PaperOrder]] = {}  # event_id -> entry tag -> order
+        self._lock = threading.Lock()
+
+    def place(self, event_id: str, tag: str, selection_id: int, side: str, price: float, size: float,
+              market: Optional[MarketPrices]) -> Optional[PaperOrder]:
+        """
+        New paper order; fills what the ladder allows now and queues the rest.
+        Returns None when the market book has no such runner (caller falls back to its own rule).
+        """
+        runner = _find_runner(market, selection_id)
+        if runner is None:
+            return None
+        order = PaperOrder(selection_id, side, price, size)
+        crossing = _crossing_size(side, order.price, runner)
+        order.matched = min(order.size, crossing)
+        order.crossed = crossing > 0
+        queue = _size_at(side, order.price, runner)
+        order.queue_ahead = float("inf") if queue is None else queue
+        order.last_visible = queue
+        order.last_volume = runner.total_matched
+        self._store(event_id, tag, order)
+        return order
+
+    def resume(self, event_id: str, tag: str, selection_id: int, side: str, price: float, remaining: float,
+               market: Optional[MarketPrices]) -> Optional[PaperOrder]:
+        """Re-enter an order whose state was lost (restart): its open size goes to the back of the queue."""
+        runner = _find_runner(market, selection_id)
+        if runner is None or remaining <= 0:
+            return None
+        order = PaperOrder(selection_id, side, price, remaining)
+        order.crossed = _crossing_size(side, order.price, runner) > 0  # taken before the restart
+        queue = _size_at(side, order.price, runner)
+        order.queue_ahead = float("inf") if queue is None else queue
+        order.last_visible = queue
+        order.last_volume = runner.total_matched
+        self._store(event_id, tag, order)
+        return order
+
+    def update(self, event_id: str, market: Optional[MarketPrices]) -> List[Tuple[PaperOrder, float]]:
+        """
+        Advance the event's open orders by this tick's book.
+        Returns (order, size newly matched) for each order that filled; a closed market drops the orders.
+        """
+        if market is not None and market.status == "CLOSED":
+            self.cancel_event(event_id)
+            return []
+        fills = []
+        for _, order in self.orders_for(event_id):
+            size = self._advance(order, market)
+            if size > 0:
+                fills.append((order, size))
+        return fills
+
+    def orders_for(self, event_id: str) -> List[Tuple[str, PaperOrder]]:
+        with self._lock:
+            return list(self._orders.get(str(event_id), {}).items())
+
+    def cancel_event(self, event_id: str) -> None:
+        with self._lock:
+            self._orders.pop(str(event_id), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._orders.values())
+
+    # ---------- internals ----------
+    def _store(self, event_id: str, tag: str, order: PaperOrder) -> None:
+        with self._lock:
+            self._orders.setdefault(str(event_id), {})[tag] = order
+
+    def _advance(self, order: PaperOrder, market: Optional[MarketPrices]) -> float:
+        runner = _find_runner(market, order.selection_id)
+        if runner is None or order.remaining <= 0:
+            return 0.0
+
+        volume = 0.0
+        if runner.total_matched is not None and order.last_volume is not None:
+            volume = max(0.0, runner.total_matched - order.last_volume) * self.volume_share
+        order.last_volume = runner.total_matched
+
+        # The first crossing fills from the size shown then; afterwards only traded volume does
+        fill = 0.0
+        if not order.crossed:
+            fill = _crossing_size(order.side, order.price, runner)
+            order.crossed = fill > 0
+            if fill:
+                volume = 0.0  # this tick's trades are what crossed the price, not a fill on top of it
+
+        visible = _size_at(order.side, order.price, runner)
+        front = _front(order.side, order.price, runner)
+        if volume and front == 0:
+            # Sharing the best price: only what left the level can have traded there
+            shrunk = (order.last_visible or 0.0) - (visible or 0.0)
+            volume = min(volume, max(0.0, shrunk))
+        if volume and front >= 0:
+            fill += max(0.0, volume - order.queue_ahead)
+            order.queue_ahead = max(0.0, order.queue_ahead - volume)
+        if visible is not None:
+            order.queue_ahead = min(order.queue_ahead, visible)
+        order.last_visible = visible
+
+        fill = min(order.remaining, fill)
+        order.matched += fill
+        return fill
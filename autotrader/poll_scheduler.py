@@ -0,0 +1,119 @@
+"""
+MatchPollScheduler — per-match refresh rates for the REST polling loop.
+
+Instead of refreshing every row every 10 s, each match is polled at a rate set by
+its state, so API calls and DB writes go to matches where a decision is imminent:
+
+  hours before KO             -> POLL_FAR_PREKO_SEC  (minutes)
+  within POLL_NEAR_PREKO_MIN  -> POLL_PREKO_SEC
+  KO entry / SP capture window, 55'-65' second-entry window -> POLL_HOT_SEC (1-2 s)
+  other in-play               -> POLL_INPLAY_SEC
+  Finished / Cancelled / Abandoned -> not polled (housekeeping only)
+"""
+
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from core import clock
+from core.settings import (
+    LTD60_KO_WINDOW_MINUTES,
+    SP_CAPTURE_WINDOW_SEC,
+    POLL_FAR_PREKO_SEC,
+    POLL_NEAR_PREKO_MIN,
+    POLL_PREKO_SEC,
+    POLL_HOT_SEC,
+    POLL_INPLAY_SEC,
+    POLL_KO_GRACE_MIN,
+    POLL_HOT_INPLAY_MINUTES,
+    POLL_MIN_SLEEP_SEC,
+    POLL_MAX_SLEEP_SEC,
+)
+
+FINISHED_STATUSES = ("Finished", "Cancelled", "Abandoned")
+
+
+def _parse_kickoff(iso_str) -> Optional[datetime]:
+    if not iso_str:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(iso_str).replace("Z", "+00:00"))
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class MatchPollScheduler:
+    def __init__(self):
+        self._next_due: Dict[str, float] = {}
+
+    def interval_for(self, row, now: Optional[datetime] = None) -> Optional[float]:
+        """Refresh interval in seconds for this row, or None if it should not be polled."""
+        now = now or clock.now()
+        status = row["inplay_status"]
+        if status in FINISHED_STATUSES:
+            return None
+
+        te = row["time_elapsed"]
+        try:
+            te = int(te) if te is not None and te != "" else None
+        except (TypeError, ValueError):
+            te = None
+
+        # Second-entry window (55'-65')
+        lo, hi = POLL_HOT_INPLAY_MINUTES
+        if te is not None and lo <= te <= hi:
+            return POLL_HOT_SEC
+
+        ko = _parse_kickoff(row["kickoff"])
+        if ko is not None:
+            minutes_to_ko = (ko - now).total_seconds() / 60.0
+            hot_window_min = max(LTD60_KO_WINDOW_MINUTES, SP_CAPTURE_WINDOW_SEC / 60.0)
+            # KO entry window + SP capture window (and a short grace after KO until entries settle)
+            if not status and -POLL_KO_GRACE_MIN <= minutes_to_ko <= hot_window_min:
+                return POLL_HOT_SEC
+            if not status and minutes_to_ko > POLL_NEAR_PREKO_MIN:
+                return POLL_FAR_PREKO_SEC
+            if not status and minutes_to_ko > 0:
+                return POLL_PREKO_SEC
+
+        return POLL_INPLAY_SEC
+
+    def due(self, rows: Iterable, now_ts: Optional[float] = None) -> List:
+        """Rows whose refresh is due now; reschedules them. Forgets rows no longer present."""
+        now_ts = now_ts if now_ts is not None else clock.time()
+        now_dt = datetime.fromtimestamp(now_ts, tz=timezone.utc)
+        out, seen = [], set()
+
+        for r in rows:
+            ev_id = str(r["event_id"])
+            seen.add(ev_id)
+            interval = self.interval_for(r, now_dt)
+            if interval is None:
+                self._next_due.pop(ev_id, None)
+                continue
+            next_due = self._next_due.get(ev_id)
+            if next_due is None or now_ts >= next_due:
+                out.append(r)
+                self._next_due[ev_id] = now_ts + interval
+            elif now_ts + interval < next_due:
+                # Entered a faster band (e.g. KO window opened) -> pull the next poll forward
+                self._next_due[ev_id] = now_ts + interval
+
+        for ev_id in set(self._next_due) - seen:
+            del self._next_due[ev_id]
+        return out
+
+    def reschedule_now(self, event_ids: Iterable[str], now_ts: Optional[float] = None) -> None:
+        """Make these matches due again now (e.g. skipped at a tick deadline); sleep_seconds() follows."""
+        now_ts = now_ts if now_ts is not None else clock.time()
+        for ev_id in event_ids:
+            self._next_due[str(ev_id)] = now_ts
+
+    def sleep_seconds(self, now_ts: Optional[float] = None) -> float:
+        """Time until the earliest due match, clamped to [POLL_MIN_SLEEP_SEC, POLL_MAX_SLEEP_SEC]."""
+        now_ts = now_ts if now_ts is not None else clock.time()
+        if not self._next_due:
+            return POLL_MAX_SLEEP_SEC
+        wait = min(self._next_due.values()) - now_ts
+        return min(POLL_MAX_SLEEP_SEC, max(POLL_MIN_SLEEP_SEC, wait))
@@ -0,0 +1,199 @@
+"""
+recorder.py — append-only recording of everything the trading loop gets from Betfair.
+
+ApiRecorder.wrap(api) returns a client with the same surface whose betting /
+in_play_service calls are written, with their arguments and response (or
+error), to RECORD_DIR/<UTC day>.jsonl.gz — one JSON record per line:
+
+  {"ts": 1760000000.0, "kind": "call", "endpoint": "betting", "method": "list_market_book",
+   "kwargs": {...}, "resp": ..., "error": null}
+  {"ts": ..., "kind": "rows", "rows": [...]}            current_matches when a day's file is opened
+  {"ts": ..., "kind": "event", "topic": "events_added", "payload": {...}}   core.match_events traffic
+
+Responses are stored as plain data: objects become {"$o": {attribute: value}}
+(public attributes only), datetimes {"$dt": iso}. decode() turns them back into
+SimpleNamespace objects with the same attribute names, which is all the bot
+reads. A restart appends a new gzip member to the same day's file.
+"""
+
+from __future__ import annotations
+import gzip
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from core import clock, match_events
+from core.settings import RECORD_DIR, RECORD_FLUSH_SEC
+
+logger = logging.getLogger("AutoTrader")
+
+RECORDED_ENDPOINTS = ("betting", "in_play_service")
+RECORDED_TOPICS = (match_events.EVENTS_ADDED, match_events.EVENTS_CHANGED,
+                   match_events.EVENTS_REMOVED, match_events.KICKOFF_CHANGED)
+
+
+def encode(obj: Any) -> Any:
+    """API response -> JSON-safe data (see module docstring)."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, datetime):
+        return {"$dt": obj.isoformat()}
+    if isinstance(obj, (list, tuple, set)):
+        return [encode(v) for v in obj]
+    if isinstance(obj, dict):
+        return {str(k): encode(v) for k, v in obj.items()}
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is None and hasattr(obj, "__slots__"):
+        attrs = {k: getattr(obj, k, None) for k in obj.__slots__}
+    if attrs is None:
+        return str(obj)
+    return {"$o": {k: encode(v) for k, v in attrs.items() if not k.startswith("_")}}
+
+
+def decode(data: Any) -> Any:
+    if isinstance(data, list):
+        return [decode(v) for v in data]
+    if isinstance(data, dict):
+        if "$o" in data and len(data) == 1:
+            return SimpleNamespace(**{k: decode(v) for k, v in data["$o"].items()})
+        if "$dt" in data and len(data) == 1:
+            return datetime.fromisoformat(data["$dt"])
+        return {k: decode(v) for k, v in data.items()}
+    return data
+
+
+def read_records(paths: Union[str, Path, Iterable[Union[str, Path]]]) -> Iterator[Dict[str, Any]]:
+    """Records of one or more day files, in file order (a torn last line is skipped)."""
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            try:
+                for line in fh:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        logger.warning("RECORDING | skipped unreadable line in %s", path)
+            except EOFError:
+                logger.warning("RECORDING | %s ends mid-block (not closed cleanly)", path)
+
+
+class _RecordingEndpoint:
+    def __init__(self, recorder: "ApiRecorder", endpoint, name: str):
+        self._recorder = recorder
+        self._endpoint = endpoint
+        self._name = name
+
+    def __getattr__(self, attr):
+        target = getattr(self._endpoint, attr)
+        if not callable(target):
+            return target
+
+        def call(*args, **kwargs):
+            try:
+                resp = target(*args, **kwargs)
+            except Exception as e:
+                self._recorder.record_call(self._name, attr, args, kwargs, None, e)
+                raise
+            self._recorder.record_call(self._name, attr, args, kwargs, resp, None)
+            return resp
+
+        return call
+
+
+class _RecordingClient:
+    """Same surface as the wrapped client; betting / in_play_service calls are recorded."""
+
+    def __init__(self, recorder: "ApiRecorder", api):
+        self._api = api
+        self._endpoints = {name: _RecordingEndpoint(recorder, getattr(api, name), name)
+                           for name in RECORDED_ENDPOINTS if hasattr(api, name)}
+
+    def __getattr__(self, attr):
+        if attr in self._endpoints:
+            return self._endpoints[attr]
+        return getattr(self._api, attr)
+
+
+class ApiRecorder:
+    def __init__(self, directory: Union[str, Path] = RECORD_DIR, flush_sec: float = RECORD_FLUSH_SEC,
+                 rows_fn: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        """rows_fn: returns the current_matches rows written at the top of each day's file."""
+        self.directory = Path(directory)
+        self.flush_sec = flush_sec
+        self._rows_fn = rows_fn
+        self._lock = threading.Lock()
+        self._fh = None
+        self._day: Optional[str] = None
+        self._last_flush = 0.0
+        self._failed = False
+        self._wrapped = None  # (api, wrapper) for the last client wrapped
+        self.records = 0
+        self._unsubscribe = [match_events.subscribe(topic, partial(self._on_event, topic))
+                             for topic in RECORDED_TOPICS]
+
+    def wrap(self, api):
+        if api is None:
+            return None
+        if self._wrapped is None or self._wrapped[0] is not api:
+            self._wrapped = (api, _RecordingClient(self, api))
+        return self._wrapped[1]
+
+    def record_call(self, endpoint: str, method: str, args, kwargs, resp, error: Optional[BaseException]) -> None:
+        rec = {"kind": "call", "endpoint": endpoint, "method": method, "kwargs": encode(kwargs),
+               "resp": None if error is not None else encode(resp),
+               "error": None if error is None else f"{type(error).__name__}: {error}"}
+        if args:
+            rec["args"] = encode(args)
+        self._write(rec)
+
+    def close(self) -> None:
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh, self._day = None, None
+
+    # ---------- internals ----------
+    def _on_event(self, topic: str, **payload) -> None:
+        self._write({"kind": "event", "topic": topic, "payload": encode(payload)})
+
+    def _write(self, rec: Dict[str, Any]) -> None:
+        """Append one record (thread-safe). Recording problems are logged, never raised into the loop."""
+        ts = clock.time()
+        try:
+            with self._lock:
+                day = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+                if day != self._day:
+                    self._open_day(day, ts)
+                self._fh.write(json.dumps(dict(rec, ts=ts), separators=(",", ":")) + "\n")
+                self.records += 1
+                if time.monotonic() - self._last_flush >= self.flush_sec:
+                    self._fh.flush()
+                    self._last_flush = time.monotonic()
+        except Exception as e:
+            if not self._failed:
+                logger.error("RECORDING | write failed (recording off until it recovers): %s", e)
+            self._failed = True
+        else:
+            self._failed = False
+
+    def _open_day(self, day: str, ts: float) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{day}.jsonl.gz"
+        self._fh = gzip.open(path, "at", encoding="utf-8")
+        self._day = day
+        logger.info("RECORDING | %s", path)
+        if self._rows_fn is not None:
+            rows = self._rows_fn()
+            self._fh.write(json.dumps({"ts": ts, "kind": "rows", "rows": encode(rows)}, separators=(",", ":")) + "\n")
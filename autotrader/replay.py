@@ -0,0 +1,259 @@
+"""
+replay.py — run a recorded day (autotrader/recorder.py) back through AutoTrader at N× speed.
+
+The replay builds a fresh database from the recording's first current_matches
+snapshot, installs a WarpClock starting at the first record and runs the
+normal REST loop (AutoTrader.start, the strategies, the poll scheduler) with a
+ReplayClient in place of the Betfair session:
+
+- list_market_book / get_scores / list_current_orders answer per id with the
+  latest recorded market book / score / order at or before the warped time,
+- place_orders / cancel_orders hand out the recorded responses for that market
+  in order (bet ids therefore match the recording); past the recording they
+  fail with NOT_RECORDED,
+- MatchFinder's recorded row changes are written and announced on
+  core.match_events at their original times.
+
+PAPER_MODE comes from core/settings.py as in the recorded run.
+
+Usage:
+    python -m autotrader.replay logs/recordings/2026-10-17.jsonl.gz --speed 60 --db /tmp/replay.db
+"""
+
+from __future__ import annotations
+import argparse
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from core import clock, match_events
+from core.settings import DB_PATH
+from core.db_helper import DBHelper
+from core.db_writer import shutdown_db_writer
+from autotrader.recorder import decode, read_records
+
+logger = logging.getLogger("replay")
+
+
+class _Timeline:
+    """Values per key over time: latest value at or before t."""
+
+    def __init__(self):
+        self._ts: Dict[str, List[float]] = {}
+        self._values: Dict[str, List[Any]] = {}
+
+    def add(self, key: str, ts: float, value: Any) -> None:
+        self._ts.setdefault(key, []).append(ts)
+        self._values.setdefault(key, []).append(value)
+
+    def at(self, key: str, ts: float) -> Optional[Any]:
+        times = self._ts.get(key)
+        if not times:
+            return None
+        i = bisect.bisect_right(times, ts)
+        return self._values[key][i - 1] if i else None
+
+
+class ReplayClient:
+    """Answers the bot's API calls from a recording, at the current (warped) clock time."""
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self._books = _Timeline()
+        self._scores = _Timeline()
+        self._orders = _Timeline()
+        self._reports: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.served: Dict[str, int] = {}
+        self.not_recorded: Dict[str, int] = {}
+        for rec in records:
+            if rec.get("kind") == "call":
+                self._index(rec)
+        self.betting = SimpleNamespace(
+            list_market_book=self.list_market_book, list_current_orders=self.list_current_orders,
+            place_orders=self._order_call("place_orders", "place_instruction_reports"),
+            cancel_orders=self._order_call("cancel_orders", "cancel_instruction_reports"),
+            list_market_catalogue=lambda **_: [],
+        )
+        self.in_play_service = SimpleNamespace(get_scores=self.get_scores)
+        self.app_key = "replay"
+        self.session_token = None
+
+    def _index(self, rec: Dict[str, Any]) -> None:
+        method, ts, resp = rec.get("method"), rec["ts"], rec.get("resp")
+        if method == "list_market_book" and resp:
+            for book in resp:
+                self._books.add(str(book["$o"].get("market_id")), ts, book)
+        elif method == "get_scores" and resp:
+            for score in resp:
+                self._scores.add(str(score["$o"].get("event_id")), ts, score)
+        elif method == "list_current_orders" and resp:
+            data = resp.get("$o", {})
+            for order in data.get("orders") or data.get("current_orders") or []:
+                self._orders.add(str(order["$o"].get("bet_id")), ts, order)
+        elif method in ("place_orders", "cancel_orders"):
+            market_id = str((rec.get("kwargs") or {}).get("market_id"))
+            self._reports.setdefault((method, market_id), deque()).append(rec)
+
+    def _count(self, name: str, missing: bool = False) -> None:
+        with self._lock:
+            target = self.not_recorded if missing else self.served
+            target[name] = target.get(name, 0) + 1
+
+    # ---------- endpoints ----------
+    def list_market_book(self, market_ids, **_) -> List[Any]:
+        now = clock.time()
+        self._count("list_market_book")
+        return [decode(b) for b in (self._books.at(str(m), now) for m in market_ids) if b is not None]
+
+    def get_scores(self, event_ids, **_) -> List[Any]:
+        now = clock.time()
+        self._count("get_scores")
+        return [decode(s) for s in (self._scores.at(str(e), now) for e in event_ids) if s is not None]
+
+    def list_current_orders(self, bet_ids=None, **_) -> SimpleNamespace:
+        now = clock.time()
+        self._count("list_current_orders")
+        orders = [decode(o) for o in (self._orders.at(str(b), now) for b in bet_ids or []) if o is not None]
+        return SimpleNamespace(orders=orders, more_available=False)
+
+    def _order_call(self, method: str, reports_attr: str):
+        def call(market_id=None, instructions=None, **_):
+            return self._next_response(method, reports_attr, market_id, instructions or [])
+        return call
+
+    def _next_response(self, method: str, reports_attr: str, market_id, instructions) -> Any:
+        """The next recorded place/cancel response for this market (recorded errors are raised again)."""
+        with self._lock:
+            queue = self._reports.get((method, str(market_id)))
+            rec = queue.popleft() if queue else None
+        if rec is None:
+            self._count(method, missing=True)
+            return SimpleNamespace(status="FAILURE", error_code="NOT_RECORDED", market_id=market_id, **{
+                reports_attr: [SimpleNamespace(status="FAILURE", error_code="NOT_RECORDED", bet_id=None,
+                                               size_matched=0.0, instruction=i) for i in instructions]})
+        self._count(method)
+        if rec.get("error"):
+            raise RuntimeError(rec["error"])
+        return decode(rec["resp"])
+
+
+def build_replay_db(db_path: Union[str, Path], rows: List[Dict[str, Any]]) -> None:
+    """Fresh database with the repo schema, seeded with the recording's current_matches rows."""
+    from database.database_rework import SCHEMA, INDEXES
+
+    path = Path(db_path)
+    if path.resolve() == Path(DB_PATH).resolve():
+        raise ValueError("refusing to replay into the live database")
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(path) + suffix).unlink(missing_ok=True)
+    with DBHelper(path) as db:
+        with db.tx():
+            for ddl in SCHEMA.values():
+                db.conn.execute(ddl)
+            for idx in INDEXES:
+                db.conn.execute(idx)
+        with db.tx():
+            db.bulk_upsert_current(rows)
+
+
+class Replayer:
+    def __init__(self, paths, speed: float = 60.0, db_path: Union[str, Path] = "replay.db"):
+        self.records = sorted(read_records(paths), key=lambda r: r.get("ts", 0.0))
+        if not self.records:
+            raise ValueError("recording is empty")
+        self.speed = speed
+        self.db_path = Path(db_path)
+        self.start_ts = self.records[0]["ts"]
+        self.end_ts = self.records[-1]["ts"]
+        self.client = ReplayClient(self.records)
+        self.events_applied = 0
+        self._done = threading.Event()
+
+    def run(self) -> Dict[str, Any]:
+        from autotrader.autotrader import AutoTrader
+
+        snapshot = next((r for r in self.records if r.get("kind") == "rows"), None)
+        build_replay_db(self.db_path, decode(snapshot["rows"]) if snapshot else [])
+
+        t0 = time.perf_counter()
+        old_clock = clock.set_clock(clock.WarpClock(datetime.fromtimestamp(self.start_ts, timezone.utc), self.speed))
+        trader = AutoTrader(api=self.client, db_path=self.db_path, record=False)
+        failure: List[BaseException] = []
+
+        def run_trader():
+            try:
+                trader.start()
+            except BaseException as e:
+                failure.append(e)
+
+        threads = [threading.Thread(target=run_trader, name="replay-trader", daemon=True),
+                   threading.Thread(target=self._pump_events, name="replay-events", daemon=True)]
+        try:
+            for t in threads:
+                t.start()
+            while clock.time() < self.end_ts and threads[0].is_alive():
+                time.sleep(0.05)
+        finally:
+            self._done.set()
+            trader.stop()
+            threads[0].join(timeout=30)
+            trader.close()
+            shutdown_db_writer()
+            clock.set_clock(old_clock)
+
+        if failure:
+            raise failure[0]
+        return {
+            "records": len(self.records),
+            "simulated_sec": round(self.end_ts - self.start_ts, 1),
+            "wall_sec": round(time.perf_counter() - t0, 1),
+            "calls_served": self.client.served,
+            "not_recorded": self.client.not_recorded,
+            "events_applied": self.events_applied,
+        }
+
+    def _pump_events(self) -> None:
+        """Write and announce MatchFinder's recorded changes at their recorded times."""
+        from match_finder import FinderResult, store_finder_result
+
+        for rec in self.records:
+            if rec.get("kind") != "event":
+                continue
+            while clock.time() < rec["ts"]:  # wait without moving the clock (speed=0 advances on sleep)
+                if self._done.wait(0.01):
+                    return
+            payload = decode(rec["payload"])
+            topic = rec["topic"]
+            try:
+                if topic in (match_events.EVENTS_ADDED, match_events.EVENTS_CHANGED):
+                    rows = [{k: v for k, v in r.items() if k in match_events.FINDER_FIELDS} for r in payload["rows"]]
+                    added, changed = store_finder_result(FinderResult(rows, (), (), None), self.db_path)
+                    if added or changed:
+                        match_events.publish(topic, rows=added + changed)
+                else:
+                    match_events.publish(topic, **payload)
+                self.events_applied += 1
+            except Exception as e:
+                logger.error("REPLAY | %s at %.0f not applied: %s", topic, rec["ts"], e)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a recorded trading day through AutoTrader.")
+    ap.add_argument("recordings", nargs="+", help="day files written by the recorder (.jsonl.gz)")
+    ap.add_argument("--speed", type=float, default=60.0, help="simulated seconds per real second (0 = no waiting)")
+    ap.add_argument("--db", default="replay.db", help="database to (re)create for the replay")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    summary = Replayer(args.recordings, speed=args.speed, db_path=args.db).run()
+    logger.info("Replay finished: %s", summary)
+
+
+if __name__ == "__main__":
+    main()
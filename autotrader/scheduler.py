@@ -3,19 +3,35 @@ scheduler.py — Lightweight background scheduler for FootballTrader v0.3.3
 
 Responsibilities:
   • Run MatchFinder automatically every X minutes
-  • Run in its own background thread (daemon)
+  • Run it in a child process (MATCHFINDER_PROCESS) or a background thread (daemon)
   • Log start/end + row count of each refresh
   • Thread-safe, no duplicate runs
+
+Process mode: the child only fetches and normalises the catalogue
+(MatchFinder.collect) and sends each FinderResult over a pipe. A pump thread
+here writes it through this process's DB writer (one writer for the whole
+database stays true), acknowledges it, and publishes the added / changed /
+removed notifications on core.match_events for AutoTrader. The catalogue work
+no longer shares the trading process's GIL.
+
+The child does not log in to Betfair itself: it adopts the trading process's
+session token (passed at start, and again whenever the parent logs in anew),
+so there is one Betfair session for the whole bot. Only if that token is
+rejected does the child open its own session.
+
+Pipe messages:
+  child  -> parent  ("result", FinderResult)
+  parent -> child   ("stored", ok, detail) | ("session", token) | ("stop",)
 """
 
 import logging
+import multiprocessing
 import threading
 import time
 from datetime import datetime, timedelta
 import sqlite3
 
-from core.settings import SCHEDULE_MATCHFINDER_MIN
-from match_finder import MatchFinder
+from core.settings import SCHEDULE_MATCHFINDER_MIN, MATCHFINDER_PROCESS, MATCHFINDER_RESTART_SEC
 
 # -----------------------------------------------------------------------------
 # Logging setup
@@ -32,10 +48,19 @@ if not logger.handlers:
 # -----------------------------------------------------------------------------
 _running = threading.Event()
 _scheduler_thread: threading.Thread | None = None
+_child: multiprocessing.process.BaseProcess | None = None
+_child_conn = None  # parent end of the pipe
+_child_session = None  # session generation last handed to the child
 
 
 def _run_matchfinder_job():
-    """Execute a single MatchFinder run safely. Retry if failed."""
+    """
+    Execute a single MatchFinder run safely. Writes go through the single DB writer,
+    so a lock can only come from another process (migration, DB browser) — retry then.
+    """
+    # Imported here, on the scheduler thread, so loading the catalogue code never delays the trader's start
+    from match_finder import MatchFinder
+
     for attempt in range(1, 6):
         try:
             logger.info("MatchFinder scheduled run starting...")
@@ -72,9 +97,169 @@ def _scheduler_loop():
             time.sleep(1)
 
 
+# -----------------------------------------------------------------------------
+# Process mode: MatchFinder child + pump thread
+# -----------------------------------------------------------------------------
+def _matchfinder_process(conn, interval_min: int, session_token=None) -> None:
+    """
+    Child entry point: run MatchFinder.collect() every interval_min minutes and send each
+    result to the parent. Waits for the parent's "stored" reply before the next run, so the
+    catalogue cache it reloads always includes the previous run.
+    session_token: the parent's Betfair session, used instead of a login of our own.
+    """
+    from match_finder import MatchFinder
+    from core.betfair_session import get_session_manager, shutdown_session_manager
+
+    mf_logger = logging.getLogger("matchfinder")
+    mf = MatchFinder()
+    if session_token:
+        get_session_manager().adopt(session_token)
+    next_run = time.monotonic()
+    try:
+        while True:
+            if conn.poll(max(0.0, next_run - time.monotonic())):
+                msg = conn.recv()
+                if msg[0] == "stop":
+                    return
+                if msg[0] == "session":
+                    get_session_manager().adopt(msg[1])
+                continue
+            next_run = time.monotonic() + interval_min * 60
+            try:
+                result = mf.collect()
+            except Exception as e:
+                mf_logger.exception("MatchFinder run failed: %s", e)
+                continue
+            if result is None:
+                continue
+            conn.send(("result", result))
+            while True:
+                msg = conn.recv()
+                if msg[0] == "stop":
+                    return
+                if msg[0] == "session":
+                    get_session_manager().adopt(msg[1])
+                    continue
+                if msg[0] == "stored":
+                    _, ok, detail = msg
+                    if ok:
+                        mf_logger.info("MatchFinder run stored (added=%d changed=%d).", *detail)
+                    else:
+                        mf_logger.error("MatchFinder results not stored: %s", detail)
+                    break
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass  # parent gone or Ctrl+C: just exit
+    finally:
+        shutdown_session_manager()
+
+
+def _parent_session():
+    """(generation, token) of this process's Betfair session, logging in if needed; (None, None) on failure."""
+    from core.betfair_session import get_session_manager
+
+    try:
+        manager = get_session_manager()
+        manager.get_client()
+        return manager.generation, manager.session_token
+    except Exception as e:
+        logger.warning("No Betfair session to share with MatchFinder (%s); it will log in itself.", e)
+        return None, None
+
+
+def _share_session(conn) -> None:
+    """Hand the child the parent's session again after a re-login here."""
+    global _child_session
+    if _child_session is None:
+        return  # the child has its own session
+    from core.betfair_session import get_session_manager
+
+    manager = get_session_manager()
+    if manager.generation == _child_session:
+        return
+    token = manager.session_token
+    if token:
+        conn.send(("session", token))
+        _child_session = manager.generation
+
+
+def _start_child() -> None:
+    global _child, _child_conn, _child_session
+    _child_session, token = _parent_session()
+    ctx = multiprocessing.get_context("spawn")  # no inherited threads/locks/sqlite handles
+    parent_conn, child_conn = ctx.Pipe()
+    _child = ctx.Process(target=_matchfinder_process, args=(child_conn, SCHEDULE_MATCHFINDER_MIN, token),
+                         name="matchfinder", daemon=True)
+    _child.start()
+    child_conn.close()
+    _child_conn = parent_conn
+    logger.info("MatchFinder process started (pid=%s).", _child.pid)
+
+
+def _store_result(conn, result) -> None:
+    """Write one child result through the DB writer, reply to the child, then notify AutoTrader."""
+    from match_finder import store_finder_result, publish_finder_result
+
+    try:
+        added, changed = store_finder_result(result)
+    except Exception as e:
+        logger.exception("MatchFinder results could not be stored: %s", e)
+        conn.send(("stored", False, str(e)))
+        return
+    conn.send(("stored", True, (len(added), len(changed))))
+    publish_finder_result(result, added, changed)
+    logger.info("MatchFinder run stored (added=%d changed=%d removed=%d kickoff_changes=%d).",
+                len(added), len(changed), len(result.removed), len(result.kickoff_changes))
+
+
+def _pump_loop() -> None:
+    """Parent side: receive child results and keep the child alive."""
+    died_at = None
+    while _running.is_set():
+        if _child is None or not _child.is_alive():
+            if died_at is None:
+                died_at = time.monotonic()
+                logger.error("MatchFinder process exited (code=%s); restarting in %ss.",
+                             getattr(_child, "exitcode", None), MATCHFINDER_RESTART_SEC)
+            if time.monotonic() - died_at >= MATCHFINDER_RESTART_SEC:
+                died_at = None
+                _start_child()
+            time.sleep(1)
+            continue
+        conn = _child_conn
+        try:
+            _share_session(conn)
+            if not conn.poll(1.0):
+                continue
+            kind, payload = conn.recv()
+        except (EOFError, OSError):
+            _child.join(timeout=1)
+            continue
+        if kind == "result":
+            try:
+                _store_result(conn, payload)
+            except (EOFError, OSError):
+                pass  # child went away mid-reply; restart handles it
+
+
+def _stop_child() -> None:
+    global _child, _child_conn
+    if _child is None:
+        return
+    try:
+        _child_conn.send(("stop",))
+    except (OSError, ValueError):
+        pass
+    _child.join(timeout=5)
+    if _child.is_alive():
+        _child.terminate()
+        _child.join(timeout=2)
+    _child_conn.close()
+    _child, _child_conn = None, None
+
+
 def start_scheduler():
     """
-    Starts the scheduler thread if not already running.
+    Starts MatchFinder (child process + pump thread, or the scheduler thread) if not already running.
     """
     global _scheduler_thread
     if _running.is_set():
@@ -82,18 +267,23 @@ def start_scheduler():
         return
 
     _running.set()
-    _scheduler_thread = threading.Thread(target=_scheduler_loop, daemon=True)
+    if MATCHFINDER_PROCESS:
+        _start_child()
+        _scheduler_thread = threading.Thread(target=_pump_loop, name="matchfinder-pump", daemon=True)
+    else:
+        _scheduler_thread = threading.Thread(target=_scheduler_loop, daemon=True)
     _scheduler_thread.start()
     logger.info(f"Scheduler started: MatchFinder every {SCHEDULE_MATCHFINDER_MIN} minutes.")
 
 
 def stop_scheduler():
     """
-    Stops the scheduler thread gracefully.
+    Stops the scheduler thread (and the MatchFinder process) gracefully.
     """
     if _running.is_set():
         logger.info("Stopping scheduler thread...")
         _running.clear()
         if _scheduler_thread and _scheduler_thread.is_alive():
             _scheduler_thread.join(timeout=3)
+        _stop_child()
         logger.info("Scheduler stopped.")
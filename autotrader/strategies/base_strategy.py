@@ -9,8 +9,12 @@ Strategies should:
 
 from __future__ import annotations
 from typing import Optional, Dict, Any
-from core.settings import BOT_VERSION, PAPER_MODE
+from core.settings import BOT_VERSION, PAPER_MODE, DRAW_SELECTION_ID
 from core.db_helper import DBHelper
+from autotrader.market_snapshot import MarketSnapshot, MarketPrices
+from autotrader.order_sync import OrderIndex, apply_order_state, needs_sync, to_stream_order
+from autotrader.order_engine import OrderCancelQueue, OrderPlacementQueue, ReportCallback
+from autotrader.paper_fill import PaperFillModel
 
 
 class BaseStrategy:
@@ -21,6 +25,14 @@ class BaseStrategy:
     filtered_leagues_csv: Optional[str] = None
     late_goal_leagues_csv: Optional[str] = None
 
+    # This tick's batched order state (set by AutoTrader; None -> per-bet API calls)
+    orders: Optional[OrderIndex] = None
+    # Tick-wide placement / cancel queues (set by AutoTrader; None -> the API is called directly)
+    placer: Optional[OrderPlacementQueue] = None
+    canceller: Optional[OrderCancelQueue] = None
+    # Queue-aware paper fills (set by strategies that use it; None -> filled once the price is reached)
+    paper_fills: Optional[PaperFillModel] = None
+
     def assign_if_applicable(self, db: DBHelper, ev: Dict[str, Any]) -> None:
         """
         Idempotently assign this strategy to current_matches row if eligible.
@@ -28,9 +40,10 @@ class BaseStrategy:
         """
         return
 
-    def on_tick(self, db: DBHelper, ev: Dict[str, Any], api=None) -> None:
+    def on_tick(self, db: DBHelper, ev: Dict[str, Any], api=None, books: Optional[MarketSnapshot] = None) -> None:
         """
         Called every loop for each event row in current_matches.
+        `books` is the tick's shared MarketSnapshot — read prices from it rather than the API.
         Must be idempotent.
         """
         raise NotImplementedError
@@ -68,6 +81,35 @@ class BaseStrategy:
             e_betid=betid,
         )
 
+    def _place_order(self, api, market_id: str, instruction, on_report: ReportCallback,
+                     event_id: Optional[str] = None) -> None:
+        """
+        Place one instruction: queued for the tick's batched placement when a placer is set,
+        otherwise sent now. on_report(report, error) gets the PlaceInstructionReport or the exception.
+        """
+        self._send_instruction(self.placer, api, "place_orders", "place_instruction_reports",
+                               market_id, instruction, on_report, event_id)
+
+    def _cancel_order(self, api, market_id: str, instruction, on_report: ReportCallback,
+                      event_id: Optional[str] = None) -> None:
+        """Cancel counterpart of _place_order (CancelInstructionReport, batched through the canceller)."""
+        self._send_instruction(self.canceller, api, "cancel_orders", "cancel_instruction_reports",
+                               market_id, instruction, on_report, event_id)
+
+    @staticmethod
+    def _send_instruction(queue, api, operation: str, reports_attr: str, market_id: str, instruction,
+                          on_report: ReportCallback, event_id: Optional[str]) -> None:
+        if queue is not None:
+            queue.submit(market_id, instruction, on_report, event_id)
+            return
+        try:
+            resp = getattr(api.betting, operation)(market_id=str(market_id), instructions=[instruction])
+            report = getattr(resp, reports_attr)[0]
+        except Exception as e:
+            on_report(None, e)
+            return
+        on_report(report, None)
+
     def _log_stream(self, db: DBHelper, ev: Dict[str, Any], h=None, a=None, d=None, inplay_time: int | None = None):
         """Optional: append a row to match_stream_history for odds tracking."""
         fields = {
@@ -93,6 +135,7 @@ class BaseStrategy:
         ev: dict,
         market_id: str,
         prefix: str = "e",   # "e" for entry1, "x" for exit if you add later
+        books: Optional[MarketSnapshot] = None,
     ) -> dict | None:
         """
         Sync an existing Betfair order with DB state.
@@ -113,6 +156,11 @@ class BaseStrategy:
             # No order or already fully matched → nothing to do
             if stake <= 0 or matched == stake or stake == None:
                 return None 
+            if self.paper_fills is not None:
+                market = books.get(market_id) if books is not None else None
+                if market is None:
+                    return None  # no book this tick -> no fills
+                return self._sync_paper_fills(db, ev, market, prefix)
             # For LAY side Strats 
             if cur_d_lay_price <= price and status in ('PAPER_EXECUTED', 'PAPER_SECOND'):
                 # Calculate liability
@@ -125,64 +173,52 @@ class BaseStrategy:
                     liability=liab)
 
         else:
-            # No order or already fully matched → nothing to do
-            if not betid or stake <= 0 or matched >= stake:
+            # No order, already fully matched or cancelled/complete → nothing to do
+            if not needs_sync(ev, prefix):
                 return None
 
+            if self.orders is not None and self.orders.covers(betid):
+                # Already fetched (and written) by the tick's order-sync stage
+                return apply_order_state(db, ev, self.orders.get(betid), prefix, logger)
+
             try:
                 resp = api.betting.list_current_orders(bet_ids=[betid])
-                orders = resp.current_orders or []
+                orders = getattr(resp, "orders", None) or getattr(resp, "current_orders", None) or []
             except Exception as e:
-                self.log.error("ORDER_SYNC_FAIL | %s | betid=%s err=%s",
+                logger.error("ORDER_SYNC_FAIL | %s | betid=%s err=%s",
                             ev["event_id"], betid, e)
                 return None
 
-            # Order no longer exists at Betfair (fully settled/cancelled elsewhere)
-            if not orders:
-                db.update_current(
-                    ev["event_id"],
-                    **{
-                        f"{prefix}_status": "MISSING",
-                        f"{prefix}_remaining": 0.0,
-                    }
-                )
-                return {
-                    "status": "MISSING",
-                    "matched": matched,
-                    "remaining": 0.0,
-                }
-
-            o = orders[0]
-
-            new_matched = float(o.size_matched or 0.0)
-            new_remaining = float(o.size_remaining or 0.0)
-            new_status = o.status  # EXECUTABLE, EXECUTION_COMPLETE, etc.
-
-            # Only write if something actually changed
-            if (
-                new_matched != matched
-                or new_remaining != ev.get(f"{prefix}_remaining")
-                or new_status != ev.get(f"{prefix}_status")
-            ):
-                db.update_current(
-                    ev["event_id"],
-                    **{
-                        f"{prefix}_matched": new_matched,
-                        f"{prefix}_remaining": new_remaining,
-                        f"{prefix}_status": new_status,
-                    }
-                )
-
-                logger.info(
-                    "ORDER_SYNC | %s | betid=%s status=%s matched=%.2f remaining=%.2f",
-                    ev["event_id"], betid, new_status, new_matched, new_remaining
-                )
-
-            return {
-                "status": new_status,
-                "matched": new_matched,
-                "remaining": new_remaining,
-        }
+            # No order -> no longer exists at Betfair (fully settled/cancelled elsewhere)
+            return apply_order_state(db, ev, to_stream_order(orders[0]) if orders else None, prefix, logger)
+
+    def _sync_paper_fills(self, db: DBHelper, ev: dict, market: MarketPrices, prefix: str) -> dict | None:
+        """Paper order state from the fill model: this tick's fills are added to matched/liability."""
+        ev_id = ev["event_id"]
+        status = ev.get(f"{prefix}_status")
+        if status not in ('PAPER_EXECUTED', 'PAPER_SECOND'):
+            return None
+        stake = float(ev.get(f"{prefix}_stake") or 0.0)
+        matched = float(ev.get(f"{prefix}_matched") or 0.0)
+        remaining = float(ev.get(f"{prefix}_remaining") or 0.0)
+
+        if not self.paper_fills.orders_for(ev_id):
+            # Restarted with an open paper order: it rejoins at the back of the queue
+            self.paper_fills.resume(ev_id, prefix, DRAW_SELECTION_ID, ev.get(f"{prefix}_side") or "LAY",
+                                    float(ev.get(f"{prefix}_price") or 0.0), remaining, market)
+
+        fills = self.paper_fills.update(ev_id, market)
+        if not fills:
+            return None
+        size = sum(f for _, f in fills)
+        # For LAY side Strats
+        liab = (ev.get("liability") or 0.0) + sum(max(0.0, (o.price - 1.0) * f) for o, f in fills)
+        matched = min(stake, matched + size)
+        remaining = max(0.0, remaining - size)
+        db.update_current(ev_id, **{f"{prefix}_matched": matched, f"{prefix}_remaining": remaining}, liability=liab)
+        if remaining <= 0:
+            self.paper_fills.cancel_event(ev_id)
+        return {"matched": matched, "remaining": remaining}
 
     def calculate_pnl(self, logger, ev: Dict[str, Any], result_val):
         strat = ev.get("strategy")
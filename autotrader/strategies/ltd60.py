@@ -31,16 +31,22 @@ from core.settings import (
     LOG_DIR,
     LTD60_SECOND_ENTRY_TIME,
     FILTERED_LEAGUES_CSV_V3,
-    LATE_GOAL_LEAGUES_CSV_V3
+    LATE_GOAL_LEAGUES_CSV_V3,
+    PAPER_FILL_MODEL,
     
 )
+from core import clock
 from core.db_helper import DBHelper
 from autotrader.strategies.base_strategy import BaseStrategy
+from autotrader.market_snapshot import MarketSnapshot, MarketPrices
+from autotrader.paper_fill import PaperFillModel
+from autotrader.order_sync import is_terminal
 
 # Logging Setup
 from core.logging_setup import setup_LTD60_logging
 
-logger = setup_LTD60_logging(log_dir=LOG_DIR / "logs")
+# Handlers are attached when the strategy is instantiated, not on import
+logger = logging.getLogger("LTD60")
 
 #   # Betfair's global selection id for "The Draw" in Match Odds
 # MAX_KO_LAY_ODDS = 4.0      # hard-cap for entry
@@ -60,6 +66,7 @@ class LTD60(BaseStrategy):
     late_goal_leagues_csv = str(LATE_GOAL_LEAGUES_CSV_V3)
 
     def __init__(self):
+        setup_LTD60_logging(log_dir=LOG_DIR / "logs")
         self._filtered: Set[str] = self._load_leagues(self.filtered_leagues_csv)
         
         self._late_goals: Set[str] = self._load_leagues(self.late_goal_leagues_csv)
@@ -67,6 +74,8 @@ class LTD60(BaseStrategy):
         self._filtered = {self._normalise(lg) for lg in self._filtered}
         
         self._late_goals = {self._normalise(lg) for lg in self._late_goals}
+        if PAPER_MODE and PAPER_FILL_MODEL:
+            self.paper_fills = PaperFillModel()
 
     # ---------- Logging Helpers -------------
     def _ev_tag(self, ev: dict) -> str:
@@ -120,7 +129,7 @@ class LTD60(BaseStrategy):
                 self._log_order(logger.info, "ASSIGNED", ev)
 
     # ---------- per tick ----------
-    def on_tick(self, db: DBHelper, ev: Dict[str, Any], api=None) -> None:
+    def on_tick(self, db: DBHelper, ev: Dict[str, Any], api=None, books: Optional[MarketSnapshot] = None) -> None:
         if ev.get("strategy") != self.name:
             return  # not ours
 
@@ -136,7 +145,7 @@ class LTD60(BaseStrategy):
         ev = dict(row0)
 
         # Keep prices fresh (and optionally log stream)
-        h, d, a = self._fetch_mo_prices(api, market_id)
+        h, d, a = self._fetch_mo_prices(api, market_id, books=books)
         if any(p is not None for p in (h, d, a)):
             self._set_lay_prices(db, ev_id, h=h, a=a, d=d)
 
@@ -150,13 +159,13 @@ class LTD60(BaseStrategy):
 
         # Decide entry timing
         kickoff = self._parse_dt(ev.get("kickoff"))
-        now = datetime.now(timezone.utc)
+        now = clock.now()
         minutes_to_ko = None
         if kickoff:
             minutes_to_ko = (kickoff - now).total_seconds() / 60.0
 
         # Entry 1: near KO
-        self._maybe_entry1(db, ev, d_price=d, minutes_to_ko=minutes_to_ko, api=api, market_id=market_id)
+        self._maybe_entry1(db, ev, d_price=d, minutes_to_ko=minutes_to_ko, api=api, market_id=market_id, books=books)
 
         # Refresh after entry1 so we have e_betid/e_status/e_matched updated
         row2 = db.fetch_current(ev_id)
@@ -171,7 +180,8 @@ class LTD60(BaseStrategy):
             logger=logger,
             ev=ev,
             market_id=market_id,
-            prefix="e"
+            prefix="e",
+            books=books,
         )
 
         # Refresh ev snapshot if anything changed
@@ -207,12 +217,13 @@ class LTD60(BaseStrategy):
         ev = dict(row3)
 
         # Entry 2: at 60' if draw and league is late-goal
-        self._maybe_entry2(db, ev, d_price=d, api=api, market_id=market_id)
+        self._maybe_entry2(db, ev, d_price=d, api=api, market_id=market_id, books=books)
 
 
     # ---------- entries ----------
     def _maybe_entry1(self, db: DBHelper, ev: Dict[str, Any], d_price: Optional[float],
-                      minutes_to_ko: Optional[float], api, market_id: str) -> None:
+                      minutes_to_ko: Optional[float], api, market_id: str,
+                      books: Optional[MarketSnapshot] = None) -> None:
         if ev.get("e_ordered"):
             return  # already in
 
@@ -227,8 +238,14 @@ class LTD60(BaseStrategy):
         price = float(LTD60_MAX_ODDS_ACCEPT if d_price > LTD60_MAX_ODDS_ACCEPT else d_price)
 
         if PAPER_MODE:
+            order = self._place_paper(ev["event_id"], "e1", price, size, market_id, books)
+            if order is not None:
+                # Fill model: takes what the ladder offers now, the rest rests in the queue
+                matched = order.matched
+                remaining = order.remaining
+                liability = max(0.0, (float(price) - 1.0) * matched)
             # Simulate LIMIT order if price above accepted
-            if price >= LTD60_MAX_ODDS_ACCEPT:
+            elif price >= LTD60_MAX_ODDS_ACCEPT:
                 matched = 0
                 liability = 0
                 remaining = size
@@ -251,41 +268,52 @@ class LTD60(BaseStrategy):
 
 
         else:
-            # Live: place order
-            try:
-                
-                limit_order = filters.limit_order(size=size, price=float(price), persistence_type="PERSIST")
-                instruction = filters.place_instruction(
-                    order_type="LIMIT",
-                    selection_id=DRAW_SELECTION_ID,
-                    side="LAY",
-                    limit_order=limit_order,
-                )
-                resp = api.betting.place_orders(market_id=str(market_id), instructions=[instruction])
-                rep = resp.place_instruction_reports[0]
+            # Live: queue the order (placed with the rest of the tick's instructions)
+            ev_id = ev["event_id"]
+
+            def on_report(rep, err):
+                if err is not None:
+                    # Record the attempt even if failed
+                    self._order_snapshot(
+                        db, ev_id, side="LAY", price=float(price), size=size,
+                        status=f"ERROR:{err}", matched=0.0, remaining=size, betid=None
+                    )
+                    return
                 status = rep.status
                 betid = getattr(rep, "bet_id", None)
                 matched = getattr(rep, "size_matched", 0.0) or 0.0
 
                 self._order_snapshot(
-                    db, ev["event_id"], side="LAY", price=float(price), size=size,
+                    db, ev_id, side="LAY", price=float(price), size=size,
                     status=status, matched=matched, remaining=max(0.0, size - matched), betid=betid
                 )
                 liability = max(0.0, (float(price) - 1.0) * size)
-                db.update_current(ev["event_id"], liability=liability)
+                db.update_current(ev_id, liability=liability)
 
                 # ---------LOGGING LIVE ENTRY 1 PLACED ------------
                 self._log_order(logger.info, "ENTRY1_PLACED", ev,
                 price=price, size=size, betid=betid, status=status, matched=matched)
 
-            except Exception as e:
-                # Record the attempt even if failed
-                self._order_snapshot(
-                    db, ev["event_id"], side="LAY", price=float(price), size=size,
-                    status=f"ERROR:{e}", matched=0.0, remaining=size, betid=None
+            try:
+                limit_order = filters.limit_order(size=size, price=float(price), persistence_type="PERSIST")
+                instruction = filters.place_instruction(
+                    order_type="LIMIT",
+                    selection_id=DRAW_SELECTION_ID,
+                    side="LAY",
+                    limit_order=limit_order,
                 )
+            except Exception as e:
+                on_report(None, e)
+                return
+            # In flight: e_ordered=1 now, so nothing re-enters before the report arrives
+            self._order_snapshot(
+                db, ev_id, side="LAY", price=float(price), size=size,
+                status="PLACING", matched=0.0, remaining=size, betid=None
+            )
+            self._place_order(api, market_id, instruction, on_report, event_id=ev_id)
 
-    def _maybe_entry2(self, db: DBHelper, ev: Dict[str, Any], d_price: Optional[float], api, market_id: str) -> None:
+    def _maybe_entry2(self, db: DBHelper, ev: Dict[str, Any], d_price: Optional[float], api, market_id: str,
+                      books: Optional[MarketSnapshot] = None) -> None:
         # Only allowed if league in late-goal set
         if self._normalise(ev.get("comp")) not in self._late_goals:
             return
@@ -343,8 +371,13 @@ class LTD60(BaseStrategy):
             prev_liability = float(ev.get("liability") or 0.0)
             prev_stake = float(ev.get("e_stake") or 0.0)
             prev_remaining = float(ev.get("e_remaining") or 0.0)
+            order = self._place_paper(ev["event_id"], "e2", price, STAKE_LTD_PAPER, market_id, books)
+            if order is not None:
+                matched = prev_matched + order.matched
+                remaining = prev_remaining + order.remaining
+                liability = prev_liability + max(0.0, (float(price) - 1.0) * order.matched)
             # Simulate LIMIT order if price above accepted
-            if price >= LTD60_MAX_SECOND_ENTRY_ODDS:
+            elif price >= LTD60_MAX_SECOND_ENTRY_ODDS:
                 matched = prev_matched
                 liability = prev_liability
                 remaining = prev_remaining + STAKE_LTD_PAPER
@@ -372,24 +405,23 @@ class LTD60(BaseStrategy):
             self._log_order(logger.info, "ENTRY2_PAPER_EXEC", ev, price=price, size=new_stake)
             
         else:
-            try:
-                
-                limit_order = filters.limit_order(size=second_size, price=float(price), persistence_type="PERSIST")
-                instruction = filters.place_instruction(
-                    order_type="LIMIT",
-                    selection_id=DRAW_SELECTION_ID,
-                    side="LAY",
-                    limit_order=limit_order,
-                )
-                resp = api.betting.place_orders(market_id=str(market_id), instructions=[instruction])
-                rep = resp.place_instruction_reports[0]
+            ev_id = ev["event_id"]
+
+            def on_report(rep, err):
+                if err is not None:
+                    # Log attempt
+                    db.update_current(
+                        ev_id,
+                        e_status=f"SECOND_ERROR:{err}",
+                    )
+                    return
                 status = rep.status
                 betid = getattr(rep, "bet_id", None)
                 matched = getattr(rep, "size_matched", 0.0) or 0.0
                 prev_stake = float(ev.get("e_stake") or 0.0)
                 new_stake = prev_stake + second_size
                 db.update_current(
-                    ev["event_id"],
+                    ev_id,
                     e_ordered=2,
                     e_status=status,
                     e_stake=new_stake,
@@ -399,18 +431,24 @@ class LTD60(BaseStrategy):
                 # recompute liability using avg price if you want; we keep it simple:
                 effective_price = float(ev.get("e_price") or price)
                 liability = max(0.0, (effective_price - 1.0) * new_stake)
-                db.update_current(ev["event_id"], liability=liability)
+                db.update_current(ev_id, liability=liability)
 
                 # ---------- LOGGING LIVE ENTRY 2 PLACED -----------
                 self._log_order(logger.info, "ENTRY2_PLACED", ev,
                 price=price, size=second_size, betid=betid, status=status, matched=matched)
 
-            except Exception as e:
-                # Log attempt
-                db.update_current(
-                    ev["event_id"],
-                    e_status=f"SECOND_ERROR:{e}",
+            try:
+                limit_order = filters.limit_order(size=second_size, price=float(price), persistence_type="PERSIST")
+                instruction = filters.place_instruction(
+                    order_type="LIMIT",
+                    selection_id=DRAW_SELECTION_ID,
+                    side="LAY",
+                    limit_order=limit_order,
                 )
+            except Exception as e:
+                on_report(None, e)
+                return
+            self._place_order(api, market_id, instruction, on_report, event_id=ev_id)
 
     # ----------cancel entrys -------
     def _maybe_cancel_entry1(
@@ -442,9 +480,9 @@ class LTD60(BaseStrategy):
             if not betid:
                 return
 
-        # Status guards
+        # Status guards: cancelled, cancel failed, complete or no longer at Betfair
         status = (ev.get("e_status") or "").upper()
-        if "CANCEL" in status or "EXECUTION_COMPLETE" in status:
+        if "CANCEL" in status or is_terminal(status):
             return
 
         # Only cancel capped orders
@@ -469,26 +507,9 @@ class LTD60(BaseStrategy):
         # -----LOGGING CANCEL ENTRY 1 TRIGGER ----------
         self._log_order(logging.WARNING, "ENTRY1_CANCEL_TRIGGER", ev,
                         reason=reason, betid=ev.get("e_betid"), price=ev.get("e_price"))
-        try:
-            if PAPER_MODE == 0:
-                instr = filters.cancel_instruction(bet_id=str(betid))
-                api.betting.cancel_orders(market_id=str(market_id), instructions=[instr])
-
-            # Mark cancelled in DB. Keep e_ordered=1 to indicate "attempted" (recommended).
-            db.update_current(
-                ev["event_id"],
-                e_status=f"CANCELLED_{reason}",
-                e_remaining=0.0,
-                e_matched=0.0
-            )
-
-            # ---------- LOGGING CANCELLED ENTRY 1 ----------
-            self._log_order(logger.info, "ENTRY1_CANCELLED", ev, reason=reason, betid=ev.get("e_betid"))
-        except Exception as e:
-            db.update_current(ev["event_id"], e_status=f"CANCEL_ERR_{reason}:{e}")
-
-            # -----LOGGING FAIL CANCEL ENTRY 1 TRIGGER ----------
-            self._log_order(logger.info, "ENTRY1_CANCEL_FAIL", ev, reason=reason, err=str(e))
+        # Mark cancelled in DB. Keep e_ordered=1 to indicate "attempted" (recommended).
+        self._cancel_entry(db, ev, api, market_id, reason, "ENTRY1",
+                           e_status=f"CANCELLED_{reason}", e_remaining=0.0, e_matched=0.0)
 
     def _maybe_cancel_entry2(
         self,
@@ -522,9 +543,9 @@ class LTD60(BaseStrategy):
             if not betid:
                 return
 
-        # Status guards
+        # Status guards: cancelled, cancel failed, complete or no longer at Betfair
         status = (ev.get("e_status") or "").upper()
-        if "CANCEL" in status or "EXECUTION_COMPLETE" in status:
+        if "CANCEL" in status or is_terminal(status):
             return
 
         # Only cancel capped orders
@@ -551,28 +572,54 @@ class LTD60(BaseStrategy):
         # -----LOGGING CANCEL ENTRY 1 TRIGGER ----------
         self._log_order(logging.WARNING, "ENTRY2_CANCEL_TRIGGER", ev,
                         reason=reason, betid=ev.get("e_betid"), price=ev.get("e_price"))
-        try:
-            if PAPER_MODE == 0:
-                instr = filters.cancel_instruction(bet_id=str(betid))
-                api.betting.cancel_orders(market_id=str(market_id), instructions=[instr])
+        # Mark cancelled in DB. Keep e_ordered=2 to indicate "attempted" (recommended).
+        self._cancel_entry(db, ev, api, market_id, reason, "ENTRY2",
+                           e_status=f"CANCELLED_{reason}", e_remaining=0.0)
 
-            # Mark cancelled in DB. Keep e_ordered=1 to indicate "attempted" (recommended).
-            db.update_current(
-                ev["event_id"],
-                e_status=f"CANCELLED_{reason}",
-                e_remaining=0.0,
-            )
+    def _cancel_entry(self, db: DBHelper, ev: Dict[str, Any], api, market_id: str, reason: str,
+                      tag: str, **cancelled_fields) -> None:
+        """
+        Cancel the entry's bet (live: queued on the tick's cancel batch) and write cancelled_fields
+        once Betfair confirms. A failed instruction (e.g. the bet matched meanwhile) -> CANCEL_ERR_<reason>.
+        """
+        ev_id = ev["event_id"]
 
-            # ---------- LOGGING CANCELLED ENTRY 1 ----------
-            self._log_order(logger.info, "ENTRY2_CANCELLED", ev, reason=reason, betid=ev.get("e_betid"))
-        except Exception as e:
-            db.update_current(ev["event_id"], e_status=f"CANCEL_ERR_{reason}:{e}")
+        def on_report(rep, err):
+            if err is None and rep is not None and getattr(rep, "status", None) not in (None, "SUCCESS"):
+                err = RuntimeError(getattr(rep, "error_code", None) or rep.status)
+            if err is not None:
+                db.update_current(ev_id, e_status=f"CANCEL_ERR_{reason}:{err}")
+
+                # -----LOGGING FAIL CANCEL TRIGGER ----------
+                self._log_order(logger.info, f"{tag}_CANCEL_FAIL", ev, reason=reason, err=str(err))
+                return
+            db.update_current(ev_id, **cancelled_fields)
+
+            # ---------- LOGGING CANCELLED ----------
+            self._log_order(logger.info, f"{tag}_CANCELLED", ev, reason=reason, betid=ev.get("e_betid"))
 
-            # -----LOGGING FAIL CANCEL ENTRY 1 TRIGGER ----------
-            self._log_order(logger.info, "ENTRY2_CANCEL_FAIL", ev, reason=reason, err=str(e))
+        if PAPER_MODE:
+            if self.paper_fills is not None:
+                self.paper_fills.cancel_event(ev_id)
+            on_report(None, None)
+            return
+        try:
+            instr = filters.cancel_instruction(bet_id=str(ev.get("e_betid")))
+        except Exception as e:
+            on_report(None, e)
+            return
+        self._cancel_order(api, market_id, instr, on_report, event_id=ev_id)
 
 
     # ---------- utilities ----------
+    def _place_paper(self, ev_id: str, tag: str, price: float, size: float, market_id: str,
+                     books: Optional[MarketSnapshot]):
+        """Paper LAY on the draw through the fill model; None -> use the instant-fill rule."""
+        if self.paper_fills is None or books is None:
+            return None
+        return self.paper_fills.place(ev_id, tag, DRAW_SELECTION_ID, "LAY", float(price), size,
+                                      books.get(market_id))
+
     def _parse_dt(self, s) -> Optional[datetime]:
         if not s:
             return None
@@ -585,27 +632,31 @@ class LTD60(BaseStrategy):
         except Exception:
             return None
 
-    def _fetch_mo_prices(self, api, market_id: str):
-        """Return (home_lay, draw_lay, away_lay) simplified from list_runner_book."""
-        if api is None:
+    def _fetch_mo_prices(self, api, market_id: str, books: Optional[MarketSnapshot] = None):
+        """
+        Return (home_lay, draw_lay, away_lay).
+        Reads the tick's shared snapshot when given; otherwise falls back to a direct list_market_book.
+        """
+        if books is not None:
+            market = books.get(market_id)
+        elif api is None:
             return (None, None, None)
-        try:
-            books = api.betting.list_market_book(
-                market_ids=[str(market_id)],
-                price_projection={"priceData": ["EX_BEST_OFFERS"]},
-            )
-            if not books:
+        else:
+            try:
+                raw = api.betting.list_market_book(
+                    market_ids=[str(market_id)],
+                    price_projection={"priceData": ["EX_BEST_OFFERS"]},
+                )
+                market = MarketPrices.from_book(raw[0]) if raw else None
+            except Exception:
                 return (None, None, None)
-            runners = books[0].runners or []
-            # Assumption: runner 0 = Home, 1 = Draw, 2 = Away (common ordering)
-            # Safer approach is to map by selection_id; for now we follow your previous draw id usage.
-            def best_lay(r):
-                probs = getattr(r.ex, "available_to_lay", None) or []
-                return float(probs[0].price) if probs else None
-
-            home = best_lay(runners[0]) if len(runners) > 0 else None
-            away = best_lay(runners[1]) if len(runners) > 1 else None
-            draw = best_lay(runners[2]) if len(runners) > 2 else None
-            return (home, draw, away)
-        except Exception:
+
+        if market is None:
             return (None, None, None)
+        runners = market.runners
+        # Assumption: runner 0 = Home, 1 = Away, 2 = Draw (Betfair sort priority)
+        # Safer approach is to map by selection_id; for now we follow your previous draw id usage.
+        home = runners[0].best_lay if len(runners) > 0 else None
+        away = runners[1].best_lay if len(runners) > 1 else None
+        draw = runners[2].best_lay if len(runners) > 2 else None
+        return (home, draw, away)
@@ -0,0 +1,384 @@
+"""
+Exchange Stream API client — alternative to REST polling for AutoTrader.
+
+- Subscribes to market changes (prices, status) for every tracked MATCH_ODDS market
+  and to order changes for the account.
+- Keeps an in-memory market cache and order cache from the change messages; the
+  tick's order sync reads the order cache (orders_for) instead of polling REST.
+- Lets the trader block until something changed (wait_for_changes) and hands it the
+  same MarketSnapshot type the REST path builds, so strategies are unchanged.
+
+Protocol: CRLF-delimited JSON over TLS (stream-api.betfair.com:443). See
+autotrader/fake_stream.py for a local replay server used to run this offline.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import socket
+import ssl
+import threading
+import time
+from copy import copy
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.settings import (
+    STREAM_HOST,
+    STREAM_PORT,
+    STREAM_SSL,
+    STREAM_MARKET_FIELDS,
+    STREAM_LADDER_LEVELS,
+    STREAM_CONFLATE_MS,
+    STREAM_HEARTBEAT_MS,
+)
+from autotrader.market_snapshot import MarketPrices, MarketSnapshot, RunnerPrices
+
+logger = logging.getLogger("AutoTrader")
+
+# Stream order status codes -> REST (list_current_orders) equivalents
+_ORDER_STATUS = {"E": "EXECUTABLE", "EC": "EXECUTION_COMPLETE"}
+
+
+# ========== MARKET CACHE ==========
+class _RunnerCache:
+    __slots__ = ("selection_id", "sort_priority", "atb", "atl", "batb", "batl", "trd", "tv", "ltp")
+
+    def __init__(self, selection_id: int):
+        self.selection_id = selection_id
+        self.sort_priority = None
+        self.atb: Dict[float, float] = {}   # price -> size (full depth)
+        self.atl: Dict[float, float] = {}
+        self.batb: Dict[int, tuple] = {}    # level -> (price, size) (best offers)
+        self.batl: Dict[int, tuple] = {}
+        self.trd: Dict[float, float] = {}   # price -> traded volume
+        self.tv = None
+        self.ltp = None
+
+    @staticmethod
+    def _apply_ladder(book: Dict[float, float], updates) -> None:
+        for price, size in updates:
+            if size == 0:
+                book.pop(price, None)
+            else:
+                book[price] = size
+
+    @staticmethod
+    def _apply_levels(book: Dict[int, tuple], updates) -> None:
+        for level, price, size in updates:
+            if size == 0:
+                book.pop(level, None)
+            else:
+                book[level] = (price, size)
+
+    def apply(self, rc: Dict[str, Any]) -> None:
+        if "atb" in rc: self._apply_ladder(self.atb, rc["atb"])
+        if "atl" in rc: self._apply_ladder(self.atl, rc["atl"])
+        if "batb" in rc: self._apply_levels(self.batb, rc["batb"])
+        if "batl" in rc: self._apply_levels(self.batl, rc["batl"])
+        if "trd" in rc: self._apply_ladder(self.trd, rc["trd"])
+        if "tv" in rc: self.tv = rc["tv"]
+        if "ltp" in rc: self.ltp = rc["ltp"]
+
+    def to_prices(self) -> RunnerPrices:
+        if self.batb or self.batl:
+            back = tuple(self.batb[k] for k in sorted(self.batb))
+            lay = tuple(self.batl[k] for k in sorted(self.batl))
+        else:
+            back = tuple(sorted(self.atb.items(), key=lambda x: -x[0]))
+            lay = tuple(sorted(self.atl.items(), key=lambda x: x[0]))
+        return RunnerPrices(selection_id=self.selection_id, back=back, lay=lay, total_matched=self.tv)
+
+
+class MarketStreamCache:
+    """In-memory market state built from mcm change messages."""
+
+    def __init__(self):
+        self._markets: Dict[str, Dict[str, Any]] = {}
+
+    def apply(self, mc: Dict[str, Any]) -> str:
+        market_id = str(mc["id"])
+        if mc.get("img") or market_id not in self._markets:
+            self._markets[market_id] = {"status": None, "inplay": None, "runners": {}}
+        m = self._markets[market_id]
+
+        md = mc.get("marketDefinition")
+        if md:
+            m["status"] = md.get("status", m["status"])
+            m["inplay"] = md.get("inPlay", m["inplay"])
+            for rd in md.get("runners") or []:
+                r = m["runners"].setdefault(rd["id"], _RunnerCache(rd["id"]))
+                r.sort_priority = rd.get("sortPriority", r.sort_priority)
+
+        for rc in mc.get("rc") or []:
+            r = m["runners"].setdefault(rc["id"], _RunnerCache(rc["id"]))
+            r.apply(rc)
+        return market_id
+
+    def discard(self, market_ids: Iterable[str]) -> None:
+        for mid in market_ids:
+            self._markets.pop(str(mid), None)
+
+    def prices(self, market_id: str) -> Optional[MarketPrices]:
+        m = self._markets.get(str(market_id))
+        if m is None:
+            return None
+        runners = sorted(
+            m["runners"].values(),
+            key=lambda r: (r.sort_priority is None, r.sort_priority or 0),
+        )
+        return MarketPrices(
+            market_id=str(market_id),
+            status=m["status"],
+            inplay=m["inplay"],
+            runners=tuple(r.to_prices() for r in runners),
+        )
+
+    def market_ids(self) -> List[str]:
+        return list(self._markets)
+
+
+# ========== ORDER CACHE ==========
+class StreamOrder:
+    """Shape-compatible with the CurrentOrder fields strategies read."""
+    __slots__ = ("bet_id", "market_id", "selection_id", "side", "price", "size",
+                 "size_matched", "size_remaining", "size_cancelled", "size_lapsed", "size_voided", "status")
+
+    def __init__(self, bet_id: str, market_id: str, selection_id: int):
+        self.bet_id = bet_id
+        self.market_id = market_id
+        self.selection_id = selection_id
+        self.side = self.price = self.size = None
+        self.size_matched = self.size_remaining = 0.0
+        self.size_cancelled = self.size_lapsed = self.size_voided = 0.0
+        self.status = None
+
+
+class OrderStreamCache:
+    """bet_id -> StreamOrder, built from ocm change messages. `ready` once the subscription image arrived."""
+
+    def __init__(self):
+        self._orders: Dict[str, StreamOrder] = {}
+        self.ready = False
+
+    def apply(self, oc: Dict[str, Any]) -> str:
+        market_id = str(oc["id"])
+        for orc in oc.get("orc") or []:
+            for uo in orc.get("uo") or []:
+                bet_id = str(uo["id"])
+                o = self._orders.get(bet_id) or StreamOrder(bet_id, market_id, orc.get("id"))
+                o.side = {"L": "LAY", "B": "BACK"}.get(uo.get("side"), uo.get("side"))
+                o.price = uo.get("p", o.price)
+                o.size = uo.get("s", o.size)
+                o.size_matched = float(uo.get("sm", o.size_matched) or 0.0)
+                o.size_remaining = float(uo.get("sr", o.size_remaining) or 0.0)
+                o.size_cancelled = float(uo.get("sc", o.size_cancelled) or 0.0)
+                o.size_lapsed = float(uo.get("sl", o.size_lapsed) or 0.0)
+                o.size_voided = float(uo.get("sv", o.size_voided) or 0.0)
+                o.status = _ORDER_STATUS.get(uo.get("status"), uo.get("status"))
+                self._orders[bet_id] = o
+        return market_id
+
+    def get(self, bet_id) -> Optional[StreamOrder]:
+        return self._orders.get(str(bet_id)) if bet_id else None
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+
+# ========== CONNECTION ==========
+class ExchangeStream:
+    """
+    One stream connection carrying a market subscription and an order subscription.
+    A daemon reader thread applies change messages to the caches and records which
+    markets changed; AutoTrader drains that set with wait_for_changes().
+    """
+
+    def __init__(self, app_key: str, session_token: str, host: str = STREAM_HOST, port: int = STREAM_PORT,
+                 use_ssl: bool = STREAM_SSL, record_to: Optional[str] = None):
+        self.app_key = app_key
+        self.session_token = session_token
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.record_to = record_to
+
+        self.markets = MarketStreamCache()
+        self.orders = OrderStreamCache()
+
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[threading.Thread] = None
+        self._send_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._changed: Set[str] = set()
+        self._subscribed: Set[str] = set()
+        self._msg_id = 0
+        self._running = False
+        self.connection_id = None
+        self.last_message_ts = 0.0
+        self._started_ts = 0.0
+
+    # ---------- lifecycle ----------
+    def start(self) -> "ExchangeStream":
+        raw = socket.create_connection((self.host, self.port), timeout=30)
+        if self.use_ssl:
+            raw = ssl.create_default_context().wrap_socket(raw, server_hostname=self.host)
+        raw.settimeout(None)
+        self._sock = raw
+        self._running = True
+        self._started_ts = time.time()
+        self._reader = threading.Thread(target=self._read_loop, name="exchange-stream", daemon=True)
+        self._reader.start()
+        self._send({"op": "authentication", "appKey": self.app_key, "session": self.session_token})
+        self.subscribe_orders()
+        logger.info("STREAM | connected | %s:%s", self.host, self.port)
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        self._close_sock()
+        with self._cond:
+            self._cond.notify_all()
+
+    def is_alive(self) -> bool:
+        """Reader running and the connection not silent for three heartbeats (a half-open socket is dead)."""
+        return self._running and self._reader is not None and self._reader.is_alive() and not self._stale()
+
+    # ---------- subscriptions ----------
+    def subscribe_markets(self, market_ids: Iterable[str]) -> None:
+        """(Re)subscribe to exactly this market set; a new subscription replaces the previous one."""
+        wanted = {str(m) for m in market_ids if m}
+        if not wanted or wanted == self._subscribed:
+            return  # an empty marketFilter would subscribe to everything
+        msg = {
+            "op": "marketSubscription",
+            "marketFilter": {"marketIds": sorted(wanted)},
+            "marketDataFilter": {"fields": list(STREAM_MARKET_FIELDS), "ladderLevels": STREAM_LADDER_LEVELS},
+            "conflateMs": STREAM_CONFLATE_MS,
+            "heartbeatMs": STREAM_HEARTBEAT_MS,
+        }
+        # No clk resume: a changed market set needs fresh images for the new markets anyway
+        self._send(msg)
+        self.markets.discard(self._subscribed - wanted)
+        logger.info("STREAM | market subscription | markets=%d", len(wanted))
+        self._subscribed = wanted
+
+    def subscribe_orders(self) -> None:
+        self._send({"op": "orderSubscription", "orderFilter": {"includeOverallPosition": False},
+                    "conflateMs": STREAM_CONFLATE_MS, "heartbeatMs": STREAM_HEARTBEAT_MS})
+
+    # ---------- consumer API ----------
+    def wait_for_changes(self, timeout: float) -> Set[str]:
+        """Block until at least one market changed (or timeout); return and clear the changed set."""
+        with self._cond:
+            if not self._changed and self._running:
+                self._cond.wait(timeout)
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def orders_for(self, bet_ids: Iterable[str]) -> Optional[Dict[str, StreamOrder]]:
+        """
+        Copies of the cached orders among bet_ids (bet_id -> StreamOrder), or None while the order
+        cache cannot be trusted: no order image on this connection yet, connection down, or silent
+        for three heartbeats. Bets missing from the result are not known to the stream (yet).
+        """
+        with self._cond:
+            if not self.orders.ready or not self.is_alive():
+                return None
+            found = (self.orders.get(b) for b in bet_ids)
+            return {o.bet_id: copy(o) for o in found if o is not None}
+
+    def snapshot(self) -> MarketSnapshot:
+        """Cached prices of the subscribed markets; empty while the stream is down or stale (use REST books)."""
+        with self._cond:
+            if not self.is_alive():
+                return MarketSnapshot()
+            markets = {mid: self.markets.prices(mid) for mid in self.markets.market_ids()}
+        return MarketSnapshot(markets, taken_at=self.last_message_ts or time.time())
+
+    # ---------- internals ----------
+    def _stale(self) -> bool:
+        """No message for three heartbeats (counted from the connect until the first one arrives)."""
+        return time.time() - (self.last_message_ts or self._started_ts) > 3 * STREAM_HEARTBEAT_MS / 1000
+
+    def _close_sock(self) -> None:
+        """Shut the socket down first: that wakes a reader blocked in recv, close alone does not."""
+        sock = self._sock
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            sock.close()
+        except Exception:
+            pass
+
+    def _send(self, msg: Dict[str, Any]) -> None:
+        with self._send_lock:
+            self._msg_id += 1
+            msg = dict(msg, id=self._msg_id)
+            self._sock.sendall((json.dumps(msg) + "\r\n").encode("utf-8"))
+
+    def _read_loop(self) -> None:
+        rec = open(self.record_to, "a", encoding="utf-8") if self.record_to else None
+        fh = None
+        try:
+            fh = self._sock.makefile("rb")
+            for raw in fh:
+                if not self._running:
+                    break
+                line = raw.decode("utf-8").strip()
+                if not line:
+                    continue
+                if rec:
+                    rec.write(line + "\n")
+                try:
+                    self._on_message(json.loads(line))
+                except Exception as e:
+                    logger.warning("STREAM | bad message skipped | err=%s", e)
+        except OSError as e:
+            if self._running:
+                logger.warning("STREAM | connection lost | err=%s", e)
+        finally:
+            self._running = False
+            if fh:
+                fh.close()
+            self._close_sock()
+            if rec:
+                rec.close()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _on_message(self, msg: Dict[str, Any]) -> None:
+        op = msg.get("op")
+        if op == "connection":
+            self.connection_id = msg.get("connectionId")
+            return
+        if op == "status":
+            if msg.get("statusCode") != "SUCCESS":
+                logger.error("STREAM | status %s | %s: %s", msg.get("statusCode"),
+                             msg.get("errorCode"), msg.get("errorMessage"))
+            if msg.get("connectionClosed"):
+                self._running = False
+            return
+        if op not in ("mcm", "ocm"):
+            return
+
+        self.last_message_ts = time.time()
+        if msg.get("ct") == "HEARTBEAT":
+            return
+
+        changed = set()
+        with self._cond:
+            if op == "mcm":
+                for mc in msg.get("mc") or []:
+                    changed.add(self.markets.apply(mc))
+            else:
+                if msg.get("ct") == "SUB_IMAGE":
+                    self.orders.ready = True  # every open order of the account is in the cache from here
+                for oc in msg.get("oc") or []:
+                    changed.add(self.orders.apply(oc))
+            if changed:
+                self._changed |= changed
+                self._cond.notify_all()
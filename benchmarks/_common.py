@@ -0,0 +1,42 @@
+"""
+Shared helpers for the offline benchmarks: repo path setup, bot logging kept
+out of logs/ and a throwaway SQLite database built from
+database/database_rework.py's schema.
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "database"))
+
+from database_rework import SCHEMA, INDEXES  # noqa: E402
+from core.logging_setup import setup_null_logging  # noqa: E402
+
+setup_null_logging()  # an AutoTrader built by a bench must not write to the tracked logs/
+
+
+def make_db(path, n_matches: int = 0, kickoff_offset_min: float = -30, comp: str = "Austrian Bundesliga") -> str:
+    """Create a fresh WAL database at `path` with `n_matches` rows in current_matches."""
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("PRAGMA journal_mode = WAL;")
+        for ddl in SCHEMA.values():
+            conn.execute(ddl)
+        for idx in INDEXES:
+            conn.execute(idx)
+        ko = (datetime.now(timezone.utc) + timedelta(minutes=kickoff_offset_min)).isoformat()
+        conn.executemany(
+            "INSERT INTO current_matches (comp, event_name, event_id, kickoff, market_id_MATCH_ODDS) VALUES (?,?,?,?,?)",
+            [(comp, f"Home {i} v Away {i}", str(30_000_000 + i), ko, f"1.{250_000_000 + i}") for i in range(n_matches)],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return str(path)
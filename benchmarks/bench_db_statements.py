@@ -0,0 +1,133 @@
+"""
+bench_db_statements.py — tick write path on a synthetic workload, old vs new.
+
+Each tick every match gets the usual in-play + price writes (two update_current
+calls); a share of matches (--change) actually moves, the rest repeat their values.
+
+  before: new DBHelper per tick, one UPDATE per update_current call
+  after:  one long-lived DBHelper, writes coalesced per event and flushed with
+          the fixed-order hot statement (executemany)
+  store:  the live path — after + MatchStateStore (diff in memory, no read-back)
+
+Reported per variant: SQL statements per tick and per update_current call
+(lower is better) and update_current calls/sec.
+
+Usage:
+    python benchmarks/bench_db_statements.py [--matches 500] [--ticks 40] [--change 0.3]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from _common import make_db
+
+from core.db_helper import DBHelper  # noqa: E402
+from autotrader.match_state import MatchStateStore  # noqa: E402
+
+
+def _tick_writes(rnd: random.Random, event_ids, tick: int, change: float):
+    """(event_id, scores, prices) for every match this tick."""
+    out = []
+    for i, ev_id in enumerate(event_ids):
+        moved = rnd.random() < change
+        te = min(90, tick // 2)
+        base = 2.0 + (i % 40) / 20 + ((tick % 7) / 100 if moved else 0.0)
+        scores = dict(inplay_status="InPlay", time_elapsed=te, h_score=0, a_score=0,
+                      h_red_cards=0, a_red_cards=0)
+        prices = dict(h_back_price=base, d_back_price=base + 1.0, a_back_price=base + 2.0,
+                      h_lay_price=base + 0.02, d_lay_price=base + 1.02, a_lay_price=base + 2.02,
+                      market_state="OPEN")
+        out.append((ev_id, scores, prices))
+    return out
+
+
+def _counted(db: DBHelper, counter: dict) -> DBHelper:
+    def trace(sql):
+        counter["stmts"] += 1
+    db.conn.set_trace_callback(trace)
+    return db
+
+
+def run_before(db_path, event_ids, ticks, change):
+    rnd, counter, times = random.Random(1), {"stmts": 0}, []
+    for t in range(ticks):
+        writes = _tick_writes(rnd, event_ids, t, change)
+        t0 = time.perf_counter()
+        with DBHelper(db_path) as db:
+            _counted(db, counter)
+            with db.tx():
+                for ev_id, scores, prices in writes:
+                    db.update_current(ev_id, **scores)
+                    db.update_current(ev_id, **prices)
+        times.append(time.perf_counter() - t0)
+    return counter["stmts"], times
+
+
+def run_after(db_path, event_ids, ticks, change):
+    rnd, counter, times = random.Random(1), {"stmts": 0}, []
+    db = _counted(DBHelper(db_path), counter)
+    try:
+        for t in range(ticks):
+            writes = _tick_writes(rnd, event_ids, t, change)
+            t0 = time.perf_counter()
+            with db.coalesce():
+                for ev_id, scores, prices in writes:
+                    db.update_current(ev_id, **scores)
+                    db.update_current(ev_id, **prices)
+            times.append(time.perf_counter() - t0)
+    finally:
+        db.close()
+    return counter["stmts"], times
+
+
+def run_store(db_path, event_ids, ticks, change):
+    rnd, counter, times = random.Random(1), {"stmts": 0}, []
+    db = DBHelper(db_path)
+    store = MatchStateStore().attach(db)
+    _counted(db, counter)
+    try:
+        for t in range(ticks):
+            writes = _tick_writes(rnd, event_ids, t, change)
+            t0 = time.perf_counter()
+            for ev_id, scores, prices in writes:
+                store.update_current(ev_id, **scores)
+                store.update_current(ev_id, **prices)
+            store.flush()
+            times.append(time.perf_counter() - t0)
+    finally:
+        db.close()
+    return counter["stmts"], times
+
+
+def _report(name, stmts, times, calls):
+    # Statements per update_current call / per tick is the cost being cut; statements/sec
+    # only tracks how fast the loop ran.
+    total = sum(times)
+    print(f"{name:<7} tick p50={statistics.median(times) * 1000:7.1f} ms  "
+          f"statements/tick={stmts / len(times):>9,.1f}  statements/call={stmts / calls:>6.3f}  "
+          f"update_current calls/sec={calls / total:>10,.0f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=500)
+    ap.add_argument("--ticks", type=int, default=40)
+    ap.add_argument("--change", type=float, default=0.3, help="share of matches whose prices move each tick")
+    args = ap.parse_args()
+
+    calls = args.matches * args.ticks * 2
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in (("before", run_before), ("after", run_after), ("store", run_store)):
+            db_path = make_db(Path(tmp) / f"{name}.db", n_matches=args.matches)
+            with DBHelper(db_path) as db:
+                event_ids = [r["event_id"] for r in db.list_current()]
+            stmts, times = fn(db_path, event_ids, args.ticks, args.change)
+            _report(name, stmts, times, calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+bench_matchfinder_upsert.py — MatchFinder's current_matches upsert on a synthetic catalogue.
+
+  before: one upsert_current per row, PRAGMA table_info on every call (old path)
+  after:  DBHelper.bulk_upsert_current (diff + executemany, one transaction)
+
+Three runs per side, like consecutive MatchFinder refreshes:
+  first    empty table, every row inserted
+  repeat   identical catalogue (nothing changed)
+  drift    10% of kick-off times moved
+
+Usage:
+    python benchmarks/bench_matchfinder_upsert.py [--markets 1000]
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from _common import make_db
+
+from core.db_helper import DBHelper  # noqa: E402
+
+
+class UncachedDBHelper(DBHelper):
+    """Old behaviour: schema read on every call."""
+
+    def _table_columns(self, table: str) -> frozenset:
+        cur = self.conn.execute(f"PRAGMA table_info({table})")
+        return frozenset(r[1] for r in cur.fetchall())
+
+
+def catalogue(n: int, drift: float = 0.0):
+    base = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+    out = []
+    for i in range(n):
+        ko = base + timedelta(minutes=15 * (i % 40))
+        if drift and i % int(1 / drift) == 0:
+            ko += timedelta(minutes=30)
+        out.append({
+            "event_id": str(40_000_000 + i),
+            "comp": f"Country {i % 30}, League {i % 3}",
+            "comp_id": str(1000 + i % 90),
+            "country_code": "GB",
+            "event_name": f"Home {i} v Away {i}",
+            "kickoff": ko.isoformat(),
+            "h_team": f"Home {i}",
+            "a_team": f"Away {i}",
+            "market_id_MATCH_ODDS": f"1.{300_000_000 + i}",
+            "market_id_OU45": f"1.{310_000_000 + i}",
+            "market_id_CS": f"1.{320_000_000 + i}",
+            "paper": 1,
+            "bot_v": "bench",
+        })
+    return out
+
+
+def _count_writes(db):
+    n = {"w": 0}
+    db.conn.set_trace_callback(lambda sql: n.__setitem__("w", n["w"] + sql.lstrip().upper().startswith("INSERT")))
+    return n
+
+
+def run_before(db_path, runs):
+    out = []
+    for name, rows in runs:
+        with UncachedDBHelper(db_path) as db:
+            n = _count_writes(db)
+            t0 = time.perf_counter()
+            with db.tx():
+                for r in rows:
+                    db.upsert_current(r)
+            out.append((name, time.perf_counter() - t0, n["w"]))
+    return out
+
+
+def run_after(db_path, runs):
+    out = []
+    for name, rows in runs:
+        with DBHelper(db_path) as db:
+            n = _count_writes(db)
+            t0 = time.perf_counter()
+            with db.tx():
+                db.bulk_upsert_current(rows)
+            out.append((name, time.perf_counter() - t0, n["w"]))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--markets", type=int, default=1000)
+    args = ap.parse_args()
+
+    runs = [("first", catalogue(args.markets)), ("repeat", catalogue(args.markets)),
+            ("drift", catalogue(args.markets, drift=0.1))]
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, fn in (("before", run_before), ("after", run_after)):
+            db_path = make_db(Path(tmp) / f"{name}.db")
+            results[name] = fn(db_path, runs)
+
+    for (run, tb, wb), (_, ta, wa) in zip(results["before"], results["after"]):
+        print(f"{run:<7} before={tb * 1000:7.1f} ms ({wb:>5} row writes)  "
+              f"after={ta * 1000:7.1f} ms ({wa:>5} row writes)  {tb / ta:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
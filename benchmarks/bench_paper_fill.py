@@ -0,0 +1,102 @@
+"""
+bench_paper_fill.py — cost and fill rate of the paper fill model.
+
+Places one paper LAY on the draw per market (capped at LTD60_MAX_ODDS_ACCEPT,
+like LTD60 entry 1) and steps every market through a random walk of draw
+ladders with growing traded volume. Each market keeps its depth: a rung's
+size is drawn once, when the price first shows, so the ladder only changes
+when the price moves. Prints the time PaperFillModel.update takes per tick
+for all orders, and how much stake the model fills compared with the old
+rule (filled in full once the draw lay price reaches the order price); the
+model never fills more than that rule.
+
+Usage:
+    python benchmarks/bench_paper_fill.py [--orders 100,500,2000] [--ticks 60] [--seed 7]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import _common  # noqa: F401  (repo path)
+
+from core.settings import DRAW_SELECTION_ID, LTD60_MAX_ODDS_ACCEPT  # noqa: E402
+from autotrader.fake_exchange import tick_offset  # noqa: E402
+from autotrader.market_snapshot import MarketPrices, RunnerPrices  # noqa: E402
+from autotrader.paper_fill import PaperFillModel  # noqa: E402
+
+STAKE = 100.0
+
+
+def _market(market_id: str, best_back: float, traded: float, depth: dict, rng: random.Random) -> MarketPrices:
+    """MATCH_ODDS book with a three-deep draw ladder around best_back; depth: price -> size, kept per market."""
+    def rung(price):
+        return price, depth.setdefault(price, round(rng.uniform(20, 400), 2))
+
+    back = tuple(rung(tick_offset(best_back, -i)) for i in range(3))
+    lay = tuple(rung(tick_offset(best_back, i + 1)) for i in range(3))
+    runners = (
+        RunnerPrices(1, ((2.5, 100.0),), ((2.52, 100.0),), 0.0),
+        RunnerPrices(2, ((3.0, 100.0),), ((3.05, 100.0),), 0.0),
+        RunnerPrices(DRAW_SELECTION_ID, back, lay, traded),
+    )
+    return MarketPrices(market_id, "OPEN", True, runners)
+
+
+def run(n_orders: int, ticks: int, seed: int):
+    rng = random.Random(seed)
+    model = PaperFillModel()
+    state = {}  # market_id -> [best_back, traded, depth]
+    legacy_filled = set()
+    books = {}
+    for i in range(n_orders):
+        mid = f"1.{i}"
+        best_back = tick_offset(round(rng.uniform(4.2, 6.0), 1), 0)
+        state[mid] = [best_back, 0.0, {}]
+        books[mid] = _market(mid, best_back, 0.0, state[mid][2], rng)
+        best_lay = books[mid].runners[2].best_lay
+        price = min(best_lay, LTD60_MAX_ODDS_ACCEPT)
+        model.place(mid, "e1", DRAW_SELECTION_ID, "LAY", price, STAKE, books[mid])
+        if best_lay <= price:
+            legacy_filled.add(mid)  # old rule: matched below the cap, or by the same tick's sync at the cap
+
+    prices = {mid: model.orders_for(mid)[0][1].price for mid in state}
+    durations = []
+    for _ in range(ticks):
+        for mid, s in state.items():
+            s[0] = tick_offset(s[0], rng.choice((-1, 0, 0, 0, 1)))
+            s[1] += rng.uniform(0, 60)
+            books[mid] = _market(mid, s[0], s[1], s[2], rng)
+            if books[mid].runners[2].best_lay <= prices[mid]:
+                legacy_filled.add(mid)  # old sync rule: d_lay_price <= price
+        t0 = time.perf_counter()
+        for mid in state:
+            model.update(mid, books[mid])
+        durations.append(time.perf_counter() - t0)
+
+    model_matched = sum(o.matched for mid in state for _, o in model.orders_for(mid))
+    return {
+        "tick_ms_p50": statistics.median(durations) * 1000,
+        "tick_ms_max": max(durations) * 1000,
+        "legacy_stake": len(legacy_filled) * STAKE,
+        "model_stake": model_matched,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orders", default="100,500,2000")
+    ap.add_argument("--ticks", type=int, default=60)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"{'orders':>7} {'p50_ms':>8} {'max_ms':>8} {'legacy_matched':>15} {'model_matched':>14}")
+    for n in [int(x) for x in args.orders.split(",")]:
+        r = run(n, args.ticks, args.seed)
+        print(f"{n:>7} {r['tick_ms_p50']:>8.2f} {r['tick_ms_max']:>8.2f} "
+              f"{r['legacy_stake']:>15.0f} {r['model_stake']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
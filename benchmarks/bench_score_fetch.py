@@ -0,0 +1,88 @@
+"""
+bench_score_fetch.py — per-event vs batched in-play score fetch.
+
+Runs both score-fetch strategies against a fake in-play service that charges a
+fixed round-trip latency per HTTP call plus a small cost per event id, and
+prints tick time vs number of tracked events.
+
+Usage:
+    python benchmarks/bench_score_fetch.py [--latency-ms 40] [--sizes 10,50,100,300]
+"""
+
+import argparse
+import time
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+
+import _common  # noqa: F401  (repo path, bot logging muted)
+
+from autotrader.autotrader import AutoTrader  # noqa: E402
+
+
+class FakeInPlayService:
+    """Mimics api.in_play_service.get_scores with a per-call round-trip cost."""
+
+    def __init__(self, latency_s: float, per_event_s: float = 0.0002):
+        self.latency_s = latency_s
+        self.per_event_s = per_event_s
+        self.calls = 0
+
+    def get_scores(self, event_ids):
+        self.calls += 1
+        time.sleep(self.latency_s + self.per_event_s * len(event_ids))
+        return [
+            SimpleNamespace(
+                event_id=int(ev_id),
+                match_status="InPlay",
+                time_elapsed=30,
+                score=SimpleNamespace(
+                    home=SimpleNamespace(score=0, number_of_red_cards=0),
+                    away=SimpleNamespace(score=1, number_of_red_cards=0),
+                ),
+            )
+            for ev_id in event_ids
+        ]
+
+
+def _rows(n: int):
+    ko = (datetime.now(timezone.utc) - timedelta(minutes=30)).isoformat()
+    return [{"event_id": str(30_000_000 + i), "kickoff": ko, "inplay_status": "InPlay"} for i in range(n)]
+
+
+def _per_event(api, rows):
+    out = {}
+    for r in rows:
+        scores = api.in_play_service.get_scores(event_ids=[r["event_id"]])
+        if scores:
+            out[r["event_id"]] = scores[0]
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=40.0)
+    ap.add_argument("--sizes", default="10,50,100,300")
+    args = ap.parse_args()
+
+    trader = AutoTrader.__new__(AutoTrader)  # skip strategy install; only the fetch stage is measured
+    print(f"{'events':>7} {'before_s':>9} {'calls':>6} {'after_s':>8} {'calls':>6} {'speedup':>8}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        rows = _rows(n)
+
+        before_api = SimpleNamespace(in_play_service=FakeInPlayService(args.latency_ms / 1000))
+        t0 = time.perf_counter()
+        before = _per_event(before_api, rows)
+        t_before = time.perf_counter() - t0
+
+        after_api = SimpleNamespace(in_play_service=FakeInPlayService(args.latency_ms / 1000))
+        t0 = time.perf_counter()
+        after = trader._fetch_scores(after_api, rows)
+        t_after = time.perf_counter() - t0
+
+        assert set(before) == set(after)
+        print(f"{n:>7} {t_before:>9.3f} {before_api.in_play_service.calls:>6} "
+              f"{t_after:>8.3f} {after_api.in_play_service.calls:>6} {t_before / t_after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
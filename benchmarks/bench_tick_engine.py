@@ -0,0 +1,76 @@
+"""
+bench_tick_engine.py — serial per-event loop vs AsyncTickEngine.
+
+Every event runs a strategy whose on_tick blocks for a simulated API round-trip
+(place/cancel/list orders). The serial loop's tick time grows with the number of
+events; the engine's grows with events / concurrency.
+
+Usage:
+    python benchmarks/bench_tick_engine.py [--latency-ms 50] [--sizes 10,50,200] [--concurrency 8]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from _common import make_db
+
+from core.db_helper import DBHelper  # noqa: E402
+from autotrader.autotrader import AutoTrader  # noqa: E402
+from autotrader.async_engine import AsyncTickEngine  # noqa: E402
+from autotrader.market_snapshot import MarketSnapshot  # noqa: E402
+from core.db_writer import shutdown_db_writer  # noqa: E402
+from autotrader.strategies.base_strategy import BaseStrategy  # noqa: E402
+
+
+class SlowStrategy(BaseStrategy):
+    name = "SLOW"
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def on_tick(self, db, ev, api=None, books=None) -> None:
+        time.sleep(self.latency_s)  # simulated blocking API call
+        db.update_current(ev["event_id"], market_state="OPEN")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--sizes", default="10,50,200")
+    ap.add_argument("--concurrency", type=int, default=8)
+    args = ap.parse_args()
+
+    sizes = [int(x) for x in args.sizes.split(",")]
+
+    print(f"{'events':>7} {'serial_s':>9} {'engine_s':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # One DB for every size: the trader's DB writer is bound to its path
+        db_path = make_db(Path(tmp) / "bench.db", n_matches=max(sizes))
+        trader = AutoTrader(api=None, db_path=db_path, record=False)
+        trader.strategies = [SlowStrategy(args.latency_ms / 1000)]
+        engine = AsyncTickEngine(trader, concurrency=args.concurrency, deadline_sec=3600)
+        for n in sizes:
+            with DBHelper(db_path) as db:
+                rows = db.list_current()[:n]
+
+                t0 = time.perf_counter()
+                for row in rows:
+                    ev = trader._update_event(db, None, row, {}, MarketSnapshot())
+                    if ev is not None:
+                        trader._run_strategies(db, None, ev, MarketSnapshot())
+                t_serial = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                engine.run_tick(db, None, rows, {}, MarketSnapshot())
+                t_engine = time.perf_counter() - t0
+
+            print(f"{n:>7} {t_serial:>9.3f} {t_engine:>9.3f} {t_serial / t_engine:>7.1f}x")
+        engine.shutdown()
+        trader.close()
+        shutdown_db_writer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+bench_tick_load.py — AutoTrader's REST loop under synthetic match populations.
+
+For each population size a fresh process scripts N matches on the fake
+exchange (autotrader/fake_exchange.py) in kick-off clusters — a few already in
+play, a big wave at the next two slots, the rest later in the day — seeds
+current_matches with them and runs AutoTrader.start against FakeAPIClient on a
+WarpClock with speed 0 (simulated time only moves when the loop sleeps, so
+ticks run back to back for --minutes of simulated time).
+
+Per tick (one loop iteration, ended by its sleep) it records:
+  - wall time of the iteration,
+  - SQL statements on every connection in the process (trader reads and the
+    single writer; writer work is asynchronous, so a tick's count may include
+    the previous tick's flush — the totals are exact),
+  - API calls served by the fake exchange,
+and per run the peak RSS of the process.
+
+Every population runs once per --modes entry: "paper" (PAPER_MODE=1, orders
+filled by the paper model) and "live" (PAPER_MODE=0, so LTD60 places, cancels
+and syncs real orders on the fake exchange through the placement queue and the
+batched order sync); the summary reports those order calls per run and per
+entry. A run whose order calls exceed what its entries can need (two places
+and two cancels per entry, one order-sync call per tick plus one per entry)
+is reported as a SANITY failure and the bench exits non-zero, so a loop that
+re-cancels or re-syncs the same bet every tick cannot become the baseline.
+
+Results are written as JSON to --out (the system temp dir by default) and
+summarised on stdout, so regressions in AutoTrader.start, DBHelper or
+LTD60.on_tick show up as numbers. The poll rates come from core/settings.py;
+bot logging is muted by _common.
+
+Usage:
+    python benchmarks/bench_tick_load.py [--sizes 50,200,500,2000] [--minutes 30] [--modes paper,live]
+                                         [--out /tmp/tick_load.json]
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from _common import make_db
+
+from core import clock  # noqa: E402
+from core import settings  # noqa: E402
+from core.settings import TICK_CONCURRENCY, DB_SINGLE_WRITER, ORDER_SYNC_BET_IDS_PER_CALL  # noqa: E402
+
+START = datetime(2026, 10, 17, 13, 50, tzinfo=timezone.utc)
+
+# (minutes from START, share of matches): Saturday-style slots around 14:00 / 16:30 / 19:00 UTC
+KICKOFF_CLUSTERS = (
+    (-80, 0.05),   # second half
+    (-35, 0.05),   # first half / half-time
+    (10, 0.35),    # the big wave: entry window opens during the run
+    (25, 0.10),
+    (160, 0.25),
+    (310, 0.20),
+)
+OTHER_COMP = "Synthetic Non-Target League"  # not in LTD60's league list: polled, never assigned
+ORDER_CALLS = ("place_orders", "cancel_orders", "list_current_orders")
+MODES = {"paper": 1, "live": 0}  # --modes entry -> PAPER_MODE
+# Order calls one LTD60 entry can need: entry 1 and the 60' second entry, one cancel for each
+MAX_PLACES_PER_ENTRY = 2
+MAX_CANCELS_PER_ENTRY = 2
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, _sql) -> None:
+        with self._lock:
+            self.n += 1
+
+
+class _TickClock(clock.WarpClock):
+    """WarpClock(speed=0) whose sleeps by the trader thread close a tick (and end the run)."""
+
+    def __init__(self, start: datetime, end: datetime, on_tick):
+        super().__init__(start, speed=0)
+        self.end_ts = end.timestamp()
+        self._on_tick = on_tick
+        self.thread = None
+
+    def sleep(self, seconds: float) -> None:
+        if threading.current_thread() is self.thread:
+            self._on_tick()
+        super().sleep(seconds)
+
+
+def _build_population(ex, n: int, comps, seed: int):
+    """Script n matches in KICKOFF_CLUSTERS on the fake exchange; returns their current_matches rows."""
+    from autotrader.fake_exchange import scripted_match_prices
+
+    rng = random.Random(seed)
+    rows = []
+    offsets = rng.choices([m for m, _ in KICKOFF_CLUSTERS], weights=[w for _, w in KICKOFF_CLUSTERS], k=n)
+    for i, offset in enumerate(offsets):
+        goals = [(rng.uniform(1, 100), rng.choice(("home", "away"))) for _ in range(rng.choice((0, 0, 1, 2, 3)))]
+        kickoff = START + timedelta(minutes=offset)
+        comp = rng.choice(comps) if rng.random() < 0.6 else OTHER_COMP
+        event_id = str(30_000_000 + i)
+        ev = ex.add_match(event_id, f"Home {i}", f"Away {i}", kickoff=kickoff.replace(tzinfo=None), comp=comp,
+                          prices=scripted_match_prices(rng, goals), goals=goals)
+        rows.append((comp, f"Home {i} v Away {i}", event_id, kickoff.isoformat(),
+                     ev.markets["MATCH_ODDS"].market_id))
+    return rows
+
+
+def _percentile(values, q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _summary(values, scale: float = 1.0, digits: int = 2):
+    if not values:
+        return {}
+    return {
+        "p50": round(_percentile(values, 0.50) * scale, digits),
+        "p99": round(_percentile(values, 0.99) * scale, digits),
+        "max": round(max(values) * scale, digits),
+        "mean": round(statistics.fmean(values) * scale, digits),
+    }
+
+
+def _order_call_problems(r: dict) -> list:
+    """Order-call budget violations of one run (empty when the calls fit its entries and ticks)."""
+    oc, entries, ticks = r["order_calls"], r["entries"], r["ticks"]
+    budget = {
+        "place_orders": MAX_PLACES_PER_ENTRY * entries,
+        "cancel_orders": MAX_CANCELS_PER_ENTRY * entries,
+        # one batched sync per tick, plus a direct call for a bet placed during the tick
+        "list_current_orders": ticks * math.ceil(entries / ORDER_SYNC_BET_IDS_PER_CALL) + entries,
+    }
+    return [f"{r['mode']} n={r['matches']}: {name}={oc[name]} > {limit} for {entries} entries"
+            for name, limit in budget.items() if oc[name] > limit]
+
+
+def run_population(n: int, minutes: float, seed: int, mode: str = "paper") -> dict:
+    """One population in this process (called in a fresh child per run, so peak RSS is per run)."""
+    # The trader modules import PAPER_MODE by name: set it before the first import in this child
+    assert "autotrader.autotrader" not in sys.modules, "run_population needs a fresh process"
+    settings.PAPER_MODE = MODES[mode]
+
+    statements = _StatementCounter()
+    connect = sqlite3.connect
+
+    def counted_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements)
+        return conn
+
+    sqlite3.connect = counted_connect
+
+    from autotrader.autotrader import AutoTrader
+    from autotrader.fake_exchange import FakeAPIClient, FakeExchange
+    from core.db_writer import shutdown_db_writer
+
+    ticks = []
+    last = {"t": time.perf_counter(), "stmts": 0, "calls": 0}
+    trader = None
+    ex = FakeExchange(clock=clock.now)
+
+    def on_tick():
+        now = time.perf_counter()
+        calls = sum(ex.calls.values())
+        ticks.append((now - last["t"], statements.n - last["stmts"], calls - last["calls"]))
+        last.update(t=now, stmts=statements.n, calls=calls)
+        if clock.time() >= tick_clock.end_ts:
+            trader.stop()
+
+    tick_clock = _TickClock(START, START + timedelta(minutes=minutes), on_tick)
+    old_clock = clock.set_clock(tick_clock)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_db(Path(tmp) / "tick_load.db")
+        try:
+            api = FakeAPIClient(ex)
+            api.login_interactive()
+            trader = AutoTrader(api=api, db_path=db_path, record=False)
+            comps = sorted(trader.strategies[0]._filtered) or ["Austrian Bundesliga"]
+            rows = _build_population(ex, n, comps, seed)
+            conn = connect(db_path)
+            conn.executemany("INSERT INTO current_matches (comp, event_name, event_id, kickoff, market_id_MATCH_ODDS)"
+                             " VALUES (?,?,?,?,?)", rows)
+            conn.commit()
+            conn.close()
+
+            tick_clock.thread = threading.current_thread()
+            wall0 = time.perf_counter()
+            last.update(t=wall0, stmts=statements.n, calls=sum(ex.calls.values()))
+            trader.start()
+            wall = time.perf_counter() - wall0
+        finally:
+            if trader is not None:
+                trader.close()
+            shutdown_db_writer()
+            clock.set_clock(old_clock)
+            sqlite3.connect = connect
+
+        conn = connect(db_path)
+        entries = conn.execute("SELECT COUNT(*) FROM current_matches WHERE e_ordered IS NOT NULL").fetchone()[0]
+        assigned = conn.execute("SELECT COUNT(*) FROM current_matches WHERE strategy IS NOT NULL").fetchone()[0]
+        conn.close()
+
+    return {
+        "mode": mode,
+        "matches": n,
+        "ticks": len(ticks),
+        "simulated_min": minutes,
+        "wall_sec": round(wall, 2),
+        "tick_ms": _summary([t for t, _, _ in ticks], scale=1000),
+        "db_statements_per_tick": _summary([s for _, s, _ in ticks], digits=1),
+        "api_calls_per_tick": _summary([c for _, _, c in ticks], digits=2),
+        "db_statements_total": sum(s for _, s, _ in ticks),
+        "api_calls": dict(sorted(ex.calls.items())),
+        "order_calls": {name: ex.calls.get(name, 0) for name in ORDER_CALLS},
+        "order_calls_per_entry": round(sum(ex.calls.get(name, 0) for name in ("place_orders", "cancel_orders"))
+                                       / entries, 2) if entries else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "assigned": assigned,
+        "entries": entries,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="50,200,500,2000")
+    ap.add_argument("--minutes", type=float, default=30.0, help="simulated minutes per population")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--modes", default="paper,live", help="comma-separated: paper, live")
+    ap.add_argument("--out", default=str(Path(tempfile.gettempdir()) / "tick_load.json"), help="JSON results file")
+    args = ap.parse_args()
+    modes = args.modes.split(",")
+    for mode in modes:
+        if mode not in MODES:
+            ap.error(f"unknown mode {mode!r} (expected one of {', '.join(MODES)})")
+
+    runs = []
+    print(f"{'mode':>5} {'matches':>8} {'ticks':>6} {'p50_ms':>8} {'p99_ms':>8} {'stmts/tick':>11} {'calls/tick':>11} "
+          f"{'place':>6} {'cancel':>7} {'list_ord':>9} {'ord/entry':>10} {'rss_mb':>7} {'entries':>8}")
+    problems = []
+    for n in [int(x) for x in args.sizes.split(",")]:
+        for mode in modes:
+            # Fresh process per run: clean module state (PAPER_MODE) and a per-run peak RSS
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                r = pool.submit(run_population, n, args.minutes, args.seed, mode).result()
+            runs.append(r)
+            oc = r["order_calls"]
+            per_entry = "-" if r["order_calls_per_entry"] is None else f"{r['order_calls_per_entry']:.2f}"
+            problems += _order_call_problems(r)
+            print(f"{mode:>5} {n:>8} {r['ticks']:>6} {r['tick_ms']['p50']:>8.1f} {r['tick_ms']['p99']:>8.1f} "
+                  f"{r['db_statements_per_tick']['mean']:>11.1f} {r['api_calls_per_tick']['mean']:>11.2f} "
+                  f"{oc['place_orders']:>6} {oc['cancel_orders']:>7} {oc['list_current_orders']:>9} "
+                  f"{per_entry:>10} {r['peak_rss_mb']:>7.1f} {r['entries']:>8}")
+
+    result = {
+        "benchmark": "tick_load",
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {"TICK_CONCURRENCY": TICK_CONCURRENCY, "DB_SINGLE_WRITER": DB_SINGLE_WRITER},
+        "modes": modes,
+        "seed": args.seed,
+        "runs": runs,
+        "sanity_failures": problems,
+    }
+    Path(args.out).write_text(json.dumps(result, indent=2))
+    print(f"results -> {args.out}")
+    if problems:
+        for p in problems:
+            print(f"SANITY | {p}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+bench_update_current.py — DBHelper.update_current calls/sec with and without the schema cache.
+
+"before" re-runs PRAGMA table_info on every call (the old behaviour);
+"after" uses the per-connection column cache.
+
+Usage:
+    python benchmarks/bench_update_current.py [--calls 20000] [--matches 300]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from _common import make_db
+
+from core.db_helper import DBHelper  # noqa: E402
+
+
+class UncachedDBHelper(DBHelper):
+    """Old behaviour: schema read on every call."""
+
+    def _table_columns(self, table: str) -> frozenset:
+        cur = self.conn.execute(f"PRAGMA table_info({table})")
+        return frozenset(r[1] for r in cur.fetchall())
+
+
+def _run(helper_cls, db_path: str, event_ids, calls: int) -> float:
+    rnd = random.Random(7)
+    with helper_cls(db_path) as db:
+        t0 = time.perf_counter()
+        for i in range(calls):
+            db.update_current(
+                rnd.choice(event_ids),
+                h_lay_price=2.0 + (i % 50) / 100,
+                d_lay_price=3.0 + (i % 30) / 100,
+                a_lay_price=4.0 + (i % 20) / 100,
+                market_state="OPEN",
+            )
+        db.conn.commit()
+        return calls / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=20000)
+    ap.add_argument("--matches", type=int, default=300)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_db(Path(tmp) / "bench.db", n_matches=args.matches)
+        with DBHelper(db_path) as db:
+            event_ids = [r["event_id"] for r in db.list_current()]
+
+        before = _run(UncachedDBHelper, db_path, event_ids, args.calls)
+        after = _run(DBHelper, db_path, event_ids, args.calls)
+
+    print(f"update_current calls/sec  before={before:,.0f}  after={after:,.0f}  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
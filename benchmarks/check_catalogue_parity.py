@@ -0,0 +1,80 @@
+"""
+check_catalogue_parity.py — group_catalogue() vs the legacy pandas frames.
+
+Feeds a recorded catalogue (rows in MatchFinder._catalogue_row shape) through
+both paths and checks the upsert payloads are identical, then times them.
+Needs pandas for the legacy side; the live process no longer does.
+tests/test_catalogue_parity.py asserts the same parity on the sample fixture.
+
+Usage:
+    python benchmarks/check_catalogue_parity.py [benchmarks/data/catalogue_sample.json ...]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from _common import ROOT
+
+from match_finder import MatchFinder, group_catalogue  # noqa: E402
+
+DEFAULT_FIXTURE = ROOT / "benchmarks" / "data" / "catalogue_sample.json"
+
+
+def load_rows(path):
+    rows = json.loads(Path(path).read_text(encoding="utf-8"))
+    for r in rows:
+        # betfairlightweight hands market_start_time over as a naive UTC datetime
+        if r.get("market_start_time"):
+            r["market_start_time"] = datetime.fromisoformat(r["market_start_time"])
+    return rows
+
+
+def legacy_payloads(rows):
+    mf = MatchFinder()
+    frames = [
+        mf._build_market_df(rows, target="MATCH_ODDS"),
+        mf._build_market_df(rows, target="OVER_UNDER_45", exact_market_name="Over/Under 4.5 Goals"),
+        mf._build_market_df(rows, target="CORRECT_SCORE"),
+    ]
+    return MatchFinder._frame_payloads(mf._build_base_df(frames))
+
+
+def new_payloads(rows):
+    return [r.payload() for r in group_catalogue(rows) if r.comp is not None]
+
+
+def check(path) -> bool:
+    rows = load_rows(path)
+    t0 = time.perf_counter()
+    old = {p["event_id"]: p for p in legacy_payloads(rows)}
+    t1 = time.perf_counter()
+    new = {p["event_id"]: p for p in new_payloads(rows)}
+    t2 = time.perf_counter()
+
+    problems = []
+    for ev_id in sorted(set(old) | set(new)):
+        if old.get(ev_id) != new.get(ev_id):
+            problems.append(f"  {ev_id}\n    legacy: {old.get(ev_id)}\n    new:    {new.get(ev_id)}")
+
+    status = "OK" if not problems else f"{len(problems)} MISMATCHES"
+    print(f"{Path(path).name}: {len(rows)} catalogue rows -> {len(new)} events | {status} | "
+          f"legacy={1000 * (t1 - t0):.1f} ms new={1000 * (t2 - t1):.1f} ms")
+    for p in problems:
+        print(p)
+    return not problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("fixtures", nargs="*", default=[str(DEFAULT_FIXTURE)])
+    args = ap.parse_args()
+    ok = all([check(f) for f in args.fixtures])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 import logging
+import threading
 import betfairlightweight
 
+from core.settings import CONFIG_PATH, BETFAIR_KEEP_ALIVE_MIN
+from core.config_loader import load_betfair_credentials
+
 logger = logging.getLogger(__name__)
 
+# Error codes Betfair returns once the session token is no longer valid
+SESSION_ERROR_CODES = ("INVALID_SESSION_INFORMATION", "NO_SESSION", "INVALID_SESSION")
+
+
 class BetfairSession:
     """
     Simple context manager for a single API session per run.
@@ -32,3 +40,187 @@ class BetfairSession:
     def connect(self):
         self.client.login_interactive()
         return self.client
+
+
+def _is_session_error(exc: Exception) -> bool:
+    text = str(exc).upper()
+    return any(code in text for code in SESSION_ERROR_CODES)
+
+
+class _RetryingEndpoint:
+    """Wraps an API endpoint (betting, in_play_service, ...) so calls re-login once on session expiry."""
+
+    def __init__(self, manager: "BetfairSessionManager", name: str):
+        self._manager = manager
+        self._name = name
+
+    def __getattr__(self, attr):
+        target = getattr(getattr(self._manager.raw_client, self._name), attr)
+        if not callable(target):
+            return target
+
+        def call(*args, **kwargs):
+            generation = self._manager.generation
+            try:
+                return target(*args, **kwargs)
+            except Exception as e:
+                if not _is_session_error(e):
+                    raise
+                logger.warning("Betfair session expired during %s.%s; re-logging in.", self._name, attr)
+                self._manager.relogin(seen_generation=generation)
+                return getattr(getattr(self._manager.raw_client, self._name), attr)(*args, **kwargs)
+
+        return call
+
+
+class _RetryingClient:
+    """What callers receive as `api`: same surface as APIClient, with transparent re-login."""
+
+    _WRAPPED = ("betting", "in_play_service", "account")
+
+    def __init__(self, manager: "BetfairSessionManager"):
+        self._manager = manager
+        self._endpoints = {name: _RetryingEndpoint(manager, name) for name in self._WRAPPED}
+
+    def __getattr__(self, attr):
+        if attr in self._endpoints:
+            return self._endpoints[attr]
+        return getattr(self._manager.raw_client, attr)
+
+    def logout(self):
+        # The shared session outlives any single caller; only the manager logs out.
+        return None
+
+
+class BetfairSessionManager:
+    """
+    Process-wide Betfair session shared by AutoTrader, MatchFinder and the strategies.
+    - Logs in once (lazily, on first get_client()).
+    - Calls keep_alive every BETFAIR_KEEP_ALIVE_MIN minutes on a daemon thread.
+    - Re-logs in transparently when a call fails with a session-expiry error.
+    - adopt() takes over a session token logged in by another process (the MatchFinder child
+      uses the trading process's session): no login, keep-alive or logout here; only if the
+      token is rejected does this process log in on its own.
+    """
+    def __init__(self, username: str, password: str, app_key: str, keep_alive_min: float = BETFAIR_KEEP_ALIVE_MIN):
+        self._session = BetfairSession(username, password, app_key)
+        self._keep_alive_sec = keep_alive_min * 60
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._logged_in = False
+        self._borrowed = False  # session token owned by another process (adopt())
+        self.generation = 0  # bumped on every successful login or adopted token
+        self.client = _RetryingClient(self)
+
+    @property
+    def raw_client(self):
+        return self._session.client
+
+    @property
+    def session_token(self) -> str | None:
+        """Token of the current session (None before login), e.g. to hand to a child process."""
+        with self._lock:
+            return self.raw_client.session_token if self._logged_in else None
+
+    def adopt(self, session_token: str) -> None:
+        """Use a session another process logged in and keeps alive, instead of logging in here."""
+        with self._lock:
+            if self._logged_in and self.raw_client.session_token == session_token:
+                return
+            if self._logged_in and not self._borrowed:
+                self._logout()  # our own fallback session is no longer needed
+            self.raw_client.set_session_token(session_token)
+            self._logged_in = True
+            self._borrowed = True
+            self.generation += 1
+            logger.info("Betfair API session adopted from the parent process.")
+
+    def get_client(self) -> _RetryingClient:
+        """Return the shared client, logging in first if needed."""
+        with self._lock:
+            if not self._logged_in:
+                self._login()
+            if self._borrowed:
+                return self.client  # the owning process keeps the session alive
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._keep_alive_loop, name="betfair-keepalive", daemon=True)
+                self._thread.start()
+        return self.client
+
+    def relogin(self, seen_generation: int | None = None) -> None:
+        """Log in again unless another thread already did since `seen_generation`."""
+        with self._lock:
+            if seen_generation is not None and seen_generation != self.generation:
+                return
+            self._login()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=3)
+        with self._lock:
+            if self._borrowed:
+                self._logged_in = self._borrowed = False  # the owning process logs out
+                return
+            if self._logged_in:
+                self._logout()
+
+    # ---------- internals ----------
+    def _logout(self) -> None:
+        try:
+            self.raw_client.logout()
+            logger.info("Betfair API session closed.")
+        except Exception as e:
+            logger.warning(f"Error during Betfair logout: {e}")
+        self._logged_in = False
+
+    def _login(self) -> None:
+        logger.info("Opening Betfair API session...")
+        self._session.connect()
+        self._logged_in = True
+        self._borrowed = False
+        self.generation += 1
+        logger.info("Betfair API session established.")
+
+    def _keep_alive_loop(self) -> None:
+        while not self._stop.wait(self._keep_alive_sec):
+            with self._lock:
+                try:
+                    self.raw_client.keep_alive()
+                    logger.debug("Betfair keep-alive OK.")
+                except Exception as e:
+                    logger.warning("Betfair keep-alive failed (%s); re-logging in.", e)
+                    try:
+                        self._login()
+                    except Exception as e2:
+                        self._logged_in = False
+                        logger.error("Betfair re-login failed: %s", e2)
+
+
+# ---------- process-wide instance ----------
+_manager: BetfairSessionManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager(config_path=CONFIG_PATH) -> BetfairSessionManager:
+    """
+    Return the process-wide session manager, creating it from config.ini on first use.
+    The MatchFinder child process has its own manager, which adopts this process's token.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            username, password, app_key = load_betfair_credentials(config_path)
+            _manager = BetfairSessionManager(username, password, app_key)
+        return _manager
+
+
+def shutdown_session_manager() -> None:
+    """Log out and stop the keep-alive thread (call once on process exit)."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
@@ -0,0 +1,247 @@
+"""
+catalogue_cache.py — MatchFinder's persistent market catalogue, keyed by market_id.
+
+Rows are the normalised catalogue dicts MatchFinder builds (`_catalogue_row`),
+kept in the catalogue_cache table so they survive restarts. The meta table
+records how far ahead the cache is complete (covered_to) and when the last
+full fetch ran (last_full).
+
+A MatchFinder run with a warm cache:
+  1. revalidate(): one cheap MARKET_START_TIME call per chunk of known events
+     (one market per event) -> kick-off changes, vanished events dropped
+  2. fetch only [covered_to, now + lookahead) — the newly opened part
+  3. prune markets that have started, save only what changed
+"""
+
+from __future__ import annotations
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.settings import (
+    DB_PATH,
+    TABLE_CATALOGUE,
+    TABLE_CATALOGUE_META,
+    CATALOGUE_FULL_REFRESH_HOURS,
+    CATALOGUE_REVALIDATE_CHUNK,
+)
+from core.db_helper import DBHelper
+
+logger = logging.getLogger("matchfinder")
+
+# The only definition of these tables: database/database_rework.py adds them to the bot's schema
+CATALOGUE_SCHEMA = {
+    TABLE_CATALOGUE: f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_CATALOGUE} (
+        market_id     TEXT PRIMARY KEY,
+        event_id      TEXT,
+        market_name   TEXT,
+        start_time    TEXT,          -- ISO8601 UTC
+        payload       TEXT NOT NULL, -- normalised catalogue row (JSON)
+        updated_ts    TEXT
+    );
+    """,
+    TABLE_CATALOGUE_META: f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_CATALOGUE_META} (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """,
+}
+
+CATALOGUE_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_catalogue_event ON {TABLE_CATALOGUE}(event_id);",
+]
+
+# Preferred market per event for kick-off revalidation
+_REVALIDATE_ORDER = ("match odds", "over/under 4.5 goals", "correct score")
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value if value is None or value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat() if dt is not None else None
+
+
+def ensure_catalogue_schema(db: DBHelper) -> None:
+    for ddl in [*CATALOGUE_SCHEMA.values(), *CATALOGUE_INDEXES]:
+        db.conn.execute(ddl)
+
+
+def persist_changes(db: DBHelper, upserts: List[Tuple], deletes: List[str], meta: Dict[str, str]) -> None:
+    """Apply CatalogueCache.take_changes() output on db (inside the caller's transaction)."""
+    ensure_catalogue_schema(db)
+    if deletes:
+        db.conn.executemany(f"DELETE FROM {TABLE_CATALOGUE} WHERE market_id=?", [(m,) for m in deletes])
+    if upserts:
+        db.conn.executemany(
+            f"""INSERT INTO {TABLE_CATALOGUE} (market_id, event_id, market_name, start_time, payload, updated_ts)
+                VALUES (?,?,?,?,?,?)
+                ON CONFLICT(market_id) DO UPDATE SET
+                    event_id=excluded.event_id, market_name=excluded.market_name,
+                    start_time=excluded.start_time, payload=excluded.payload, updated_ts=excluded.updated_ts""",
+            upserts,
+        )
+    if meta:
+        db.conn.executemany(
+            f"INSERT INTO {TABLE_CATALOGUE_META} (key, value) VALUES (?,?) "
+            f"ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            list(meta.items()),
+        )
+
+
+class CatalogueCache:
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.covered_to: Optional[datetime] = None
+        self.last_full: Optional[datetime] = None
+        self._changed: set = set()
+        self._removed: set = set()
+
+    # ---------- persistence ----------
+    def load(self) -> "CatalogueCache":
+        with DBHelper(self.db_path) as db:
+            tables = {r[0] for r in db.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            if TABLE_CATALOGUE not in tables or TABLE_CATALOGUE_META not in tables:
+                return self  # cold: the first persist_changes() creates the tables
+            for r in db.conn.execute(f"SELECT market_id, payload FROM {TABLE_CATALOGUE}"):
+                row = json.loads(r["payload"])
+                row["market_start_time"] = _parse_ts(row.get("market_start_time"))
+                self.markets[r["market_id"]] = row
+            meta = dict(db.conn.execute(f"SELECT key, value FROM {TABLE_CATALOGUE_META}").fetchall())
+        self.covered_to = _parse_ts(meta.get("covered_to"))
+        self.last_full = _parse_ts(meta.get("last_full"))
+        return self
+
+    def take_changes(self) -> Tuple[List[Tuple], List[str], Dict[str, str]]:
+        """
+        Changed/removed markets and the meta row since the last call, as persist_changes() arguments
+        (picklable, so a MatchFinder child process can hand them to the parent's writer).
+        """
+        now = DBHelper._now_utc()
+        upserts = []
+        for market_id in self._changed:
+            row = self.markets.get(market_id)
+            if row is None:
+                continue
+            payload = dict(row, market_start_time=_iso(row.get("market_start_time")))
+            upserts.append((market_id, str(row.get("event_id")), row.get("market_name"),
+                            payload["market_start_time"], json.dumps(payload, default=str), now))
+        deletes = list(self._removed)
+        meta = {k: _iso(v) for k, v in (("covered_to", self.covered_to), ("last_full", self.last_full)) if v}
+        self._changed.clear()
+        self._removed.clear()
+        return upserts, deletes, meta
+
+    # ---------- planning ----------
+    def needs_full_refresh(self, now: datetime) -> bool:
+        if not self.markets or self.covered_to is None or self.last_full is None:
+            return True
+        return now - self.last_full >= timedelta(hours=CATALOGUE_FULL_REFRESH_HOURS)
+
+    # ---------- updates ----------
+    def replace_all(self, rows: List[Dict[str, Any]], now: datetime, covered_to: datetime) -> None:
+        self._removed.update(self.markets)
+        self.markets = {}
+        self.merge(rows)
+        self._removed.difference_update(self.markets)
+        self.last_full = now
+        self.covered_to = covered_to
+
+    def merge(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            market_id = row.get("market_id")
+            if market_id is None:
+                continue
+            row = dict(row, market_start_time=_parse_ts(row.get("market_start_time")))
+            if self.markets.get(market_id) != row:
+                self.markets[market_id] = row
+                self._changed.add(market_id)
+
+    def prune(self, now: datetime) -> None:
+        """Drop markets whose start time has passed (MatchFinder only lists upcoming ones)."""
+        for market_id, row in list(self.markets.items()):
+            start = row.get("market_start_time")
+            if start is None or start < now:
+                self._drop(market_id)
+
+    def upcoming_events(self, now: datetime) -> set:
+        """event_ids with at least one market that has not started yet."""
+        return {str(r.get("event_id")) for r in self.markets.values()
+                if r.get("market_start_time") is not None and r["market_start_time"] >= now}
+
+    def rows_between(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        return [r for r in self.markets.values()
+                if r.get("market_start_time") is not None and start <= r["market_start_time"] <= end]
+
+    def _drop(self, market_id: str) -> None:
+        if self.markets.pop(market_id, None) is not None:
+            self._removed.add(market_id)
+            self._changed.discard(market_id)
+
+    # ---------- revalidation ----------
+    def revalidate(self, api, now: datetime) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Re-read the start time of one market per known upcoming event. Kick-off moves are applied
+        to all of the event's markets; events whose market has gone are dropped.
+        Returns [(event_id, old_kickoff, new_kickoff)].
+        """
+        from betfairlightweight import filters  # here, so the schema script can import this module without it
+
+        by_event: Dict[str, List[str]] = {}
+        for market_id, row in self.markets.items():
+            start = row.get("market_start_time")
+            if start is not None and start >= now:
+                by_event.setdefault(str(row.get("event_id")), []).append(market_id)
+
+        probe: Dict[str, str] = {}  # market_id -> event_id
+        for event_id, market_ids in by_event.items():
+            def rank(m):
+                name = (self.markets[m].get("market_name") or "").casefold()
+                return _REVALIDATE_ORDER.index(name) if name in _REVALIDATE_ORDER else len(_REVALIDATE_ORDER)
+            probe[min(market_ids, key=rank)] = event_id
+
+        ids = list(probe)
+        seen: Dict[str, datetime] = {}
+        for i in range(0, len(ids), CATALOGUE_REVALIDATE_CHUNK):
+            chunk = ids[i:i + CATALOGUE_REVALIDATE_CHUNK]
+            cats = api.betting.list_market_catalogue(
+                filter=filters.market_filter(market_ids=chunk),
+                market_projection=["MARKET_START_TIME"],
+                max_results=len(chunk),
+                lightweight=False,
+            )
+            for mc in cats:
+                start = _parse_ts(getattr(mc, "market_start_time", None))
+                if start is not None:
+                    seen[str(getattr(mc, "market_id", None))] = start
+
+        changes = []
+        for market_id, event_id in probe.items():
+            new = seen.get(market_id)
+            if new is None:
+                # Market closed/removed: forget the event; a full refresh picks it up again if it returns
+                for m in by_event[event_id]:
+                    self._drop(m)
+                continue
+            old = self.markets[market_id]["market_start_time"]
+            if new != old:
+                for m in by_event[event_id]:
+                    self.markets[m]["market_start_time"] = new
+                    self._changed.add(m)
+                changes.append((event_id, old, new))
+
+        logger.info("Catalogue revalidated | events=%d calls=%d kickoff_changes=%d dropped=%d",
+                    len(probe), (len(ids) + CATALOGUE_REVALIDATE_CHUNK - 1) // CATALOGUE_REVALIDATE_CHUNK,
+                    len(changes), len(probe) - len(seen))
+        return changes
@@ -0,0 +1,86 @@
+"""
+clock.py — the trading loop's time source.
+
+AutoTrader, the strategies, the poll scheduler and DBHelper read the time
+through this module instead of datetime.now() / time.time(), so a replay can
+run a recorded day on a warped clock:
+
+    from core import clock
+    clock.now()      # aware UTC datetime
+    clock.time()     # epoch seconds
+    clock.sleep(s)   # loop sleeps
+
+SystemClock (the default) is the wall clock. WarpClock starts at a given
+instant and runs `speed` times faster than real time; its sleep() waits
+s / speed real seconds (speed=0: time only moves when something sleeps).
+set_clock() swaps the process-wide clock and returns the previous one.
+"""
+
+from __future__ import annotations
+import threading
+import time as _time
+from datetime import datetime, timezone
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def time(self) -> float:
+        return _time.time()
+
+    def sleep(self, seconds: float) -> None:
+        _time.sleep(seconds)
+
+
+class WarpClock:
+    def __init__(self, start: datetime, speed: float = 1.0):
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        self.speed = max(0.0, float(speed))
+        self._start_ts = start.timestamp()
+        self._real0 = _time.monotonic()
+        self._skipped = 0.0  # simulated seconds added by sleep() when speed == 0
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._start_ts + (_time.monotonic() - self._real0) * self.speed + self._skipped
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time(), tz=timezone.utc)
+
+    def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        if self.speed:
+            _time.sleep(seconds / self.speed)
+        else:
+            with self._lock:
+                self._skipped += seconds
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(new_clock) -> object:
+    """Install new_clock for the whole process; returns the one it replaces."""
+    global _clock
+    old, _clock = _clock, new_clock
+    return old
+
+
+def now() -> datetime:
+    return _clock.now()
+
+
+def time() -> float:
+    return _clock.time()
+
+
+def sleep(seconds: float) -> None:
+    _clock.sleep(seconds)
@@ -4,8 +4,24 @@ from typing import Dict, Any, Iterable, Optional
 from contextlib import contextmanager
 from typing import Any, Dict, Optional, Tuple, List
 import sqlite3
-from datetime import datetime, timezone
-from core.settings import TABLE_CURRENT, TABLE_STREAM, PRICE_EPSILON
+import time
+from pathlib import Path
+from core import clock
+from core.settings import TABLE_CURRENT, TABLE_STREAM, PRICE_EPSILON, DB_SCHEMA_CHECK_SEC
+
+# Hot write path: scores + prices touched every tick. A row whose changes stay inside this set is
+# written with one fixed-order statement, so sqlite3 prepares it once and reuses it (and executemany
+# can batch it). Order is part of the statement text; do not reorder casually.
+# Only AutoTrader writes these columns (MatchFinder upserts catalogue fields), so rewriting an
+# unchanged hot column with the value just read back is safe.
+HOT_CURRENT_COLUMNS = (
+    "inplay_status", "time_elapsed",
+    "h_score", "a_score", "h_red_cards", "a_red_cards",
+    "h_back_price", "d_back_price", "a_back_price",
+    "h_lay_price", "d_lay_price", "a_lay_price",
+    "market_state",
+)
+STATEMENT_CACHE_SIZE = 256
 
 class DBHelper:
     """
@@ -13,15 +29,31 @@ class DBHelper:
     - Opens with WAL + sensible PRAGMAs.
     - event_id is UNIQUE in current_matches and archive_v3.
     - archive_match() MOVES row from current_matches -> archive_v3.
+    - read_only=True opens a reader connection (writes go through core/db_writer.py).
     """
-    def __init__(self, db_path: str, check_same_thread: bool = False, timeout: float = 30.0):
+    def __init__(self, db_path: str, check_same_thread: bool = False, timeout: float = 30.0,
+                 read_only: bool = False):
         self.db_path = db_path
+        self.read_only = read_only
         self.conn = sqlite3.connect(
-            db_path,
+            f"file:{Path(db_path).as_posix()}?mode=ro" if read_only else db_path,
             check_same_thread=check_same_thread,
             timeout=timeout,   # <-- IMPORTANT
+            cached_statements=STATEMENT_CACHE_SIZE,
+            uri=read_only,
         )
         self.conn.row_factory = sqlite3.Row
+        # Per-connection schema cache: table -> column set, plus keys already confirmed unknown.
+        # Dropped when PRAGMA schema_version moves (a migration in any process), checked every
+        # DB_SCHEMA_CHECK_SEC.
+        self._schema_cache: Dict[str, frozenset] = {}
+        self._unknown_cols: Dict[str, set] = {}
+        self._hot_sql: Optional[str] = None  # "" = table lacks a hot column
+        self._schema_version: Optional[int] = None
+        self._schema_checked = float("-inf")
+        # Change tracking for current_matches: event_id -> fields staged inside coalesce()
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._coalesce_depth = 0
         self._boot()
 
     def _boot(self):
@@ -51,10 +83,126 @@ class DBHelper:
             self.conn.rollback()
             raise
 
+    # ---------- CHANGE TRACKING ----------
+    @contextmanager
+    def coalesce(self):
+        """
+        Buffer update_current() calls per event_id for the duration of the block. On exit the
+        staged fields are diffed against the stored row and each changed row gets at most one
+        UPDATE (all in one transaction); rows with nothing new are not written at all.
+        Nested blocks flush when the outermost one exits.
+        """
+        self._coalesce_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._coalesce_depth -= 1
+            if self._coalesce_depth == 0:
+                self._staged.clear()
+            raise
+        self._coalesce_depth -= 1
+        if self._coalesce_depth == 0:
+            with self.tx():
+                self.flush_staged()
+
+    def stage_current(self, event_id: str, **fields) -> None:
+        """Record field updates for event_id without writing them (later values win)."""
+        if not fields:
+            return
+        clean = self._clean_fields(TABLE_CURRENT, fields)
+        if clean:
+            self._staged.setdefault(str(event_id), {}).update(clean)
+
+    def flush_staged(self, event_id: Optional[str] = None,
+                     baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """
+        Write staged fields (all events, or just event_id). Each row is compared with its last
+        known values first; only fields that differ go into its UPDATE. Returns the number of rows
+        written. `baseline` (event_id -> full row) supplies those values when the caller already
+        holds them (MatchStateStore); otherwise they are read back in one query.
+        Does not commit — callers run it inside tx() (coalesce() does).
+        """
+        if event_id is not None:
+            fields = self._staged.pop(str(event_id), None)
+            pending = {str(event_id): fields} if fields else {}
+        else:
+            pending, self._staged = self._staged, {}
+        if not pending:
+            return 0
+
+        stored = baseline if baseline is not None else self._fetch_current_many(pending)
+        hot_sql = self._hot_update_sql()
+        now = self._now_utc()
+        hot_params = []
+        written = 0
+        for ev_id, fields in pending.items():
+            row = stored.get(ev_id)
+            if row is None:
+                continue  # same as UPDATE ... WHERE on a missing row
+            changed = {k: v for k, v in fields.items() if not self._same_value(row[k], v)}
+            if not changed:
+                continue
+            written += 1
+            if hot_sql is not None and changed.keys() <= set(HOT_CURRENT_COLUMNS):
+                # Canonical statement: unchanged hot columns are rewritten with their stored value
+                hot_params.append([changed[c] if c in changed else row[c] for c in HOT_CURRENT_COLUMNS]
+                                  + [now, ev_id])
+                continue
+            changed["updated_ts"] = now
+            keys = sorted(changed)
+            self.conn.execute(
+                f"UPDATE {TABLE_CURRENT} SET {self._kv_sql(keys)} WHERE event_id=?",
+                [changed[k] for k in keys] + [ev_id],
+            )
+        if hot_params:
+            self.conn.executemany(hot_sql, hot_params)
+        return written
+
+    def _hot_update_sql(self) -> Optional[str]:
+        """Fixed-order UPDATE over HOT_CURRENT_COLUMNS, or None if the table lacks any of them."""
+        if self._hot_sql is None:
+            cols = self._table_columns(TABLE_CURRENT)
+            ok = all(c in cols for c in HOT_CURRENT_COLUMNS) and "updated_ts" in cols
+            self._hot_sql = (f"UPDATE {TABLE_CURRENT} SET {self._kv_sql(HOT_CURRENT_COLUMNS + ('updated_ts',))} "
+                             f"WHERE event_id=?") if ok else ""
+        return self._hot_sql or None
+
+    def _fetch_current_many(self, pending: Dict[str, Dict[str, Any]]) -> Dict[str, sqlite3.Row]:
+        """Stored values for the staged rows: just the hot columns when that covers every staged field."""
+        wanted = set().union(*pending.values())
+        if self._hot_update_sql() is not None and wanted <= set(HOT_CURRENT_COLUMNS):
+            select = ", ".join(("event_id",) + HOT_CURRENT_COLUMNS)
+        else:
+            select = "*"
+        event_ids = list(pending)
+        out: Dict[str, sqlite3.Row] = {}
+        for i in range(0, len(event_ids), 500):
+            chunk = event_ids[i:i + 500]
+            cur = self.conn.execute(
+                f"SELECT {select} FROM {TABLE_CURRENT} WHERE event_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for r in cur.fetchall():
+                out[str(r["event_id"])] = r
+        return out
+
+    @staticmethod
+    def _same_value(stored, new) -> bool:
+        """Equality as SQLite would store it (e.g. time_elapsed 55 vs TEXT '55')."""
+        if stored == new:
+            return True
+        if stored is None or new is None:
+            return False
+        if isinstance(stored, float) or isinstance(new, float):
+            try:
+                return float(stored) == float(new)
+            except (TypeError, ValueError):
+                return False
+        return str(stored) == str(new)
+
     # ---------- helpers ----------
     @staticmethod
     def _now_utc() -> str:
-        return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        return clock.now().strftime("%Y-%m-%dT%H:%M:%SZ")
 
     @staticmethod
     def _kv_sql(fragment_for: Iterable[str]) -> str:
@@ -92,9 +240,8 @@ class DBHelper:
         fields.setdefault("created_ts", self._now_utc())
         fields["updated_ts"] = self._now_utc()
 
-        # Read table columns to filter incoming dict
-        cols = self._table_columns("current_matches")
-        clean = {k: v for k, v in fields.items() if k in cols}
+        # Filter incoming dict to table columns (cached)
+        clean = self._clean_fields("current_matches", fields)
 
         keys = list(clean.keys())
         placeholders = ", ".join(["?"] * len(keys))
@@ -108,19 +255,79 @@ class DBHelper:
         """
         self.conn.execute(sql, [clean[k] for k in keys])
 
+    def bulk_upsert_current(self, rows: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+        """
+        Upsert many current_matches rows (MatchFinder catalogue) with executemany.
+        Rows are compared with what is stored first: new event_ids are inserted, rows with a
+        changed field are upserted, identical rows are not touched (updated_ts keeps its value).
+        created_ts is set on insert only. Runs inside the caller's transaction (tx() / DB writer).
+        Returns (inserted, updated, unchanged).
+        """
+        inserted, updated, unchanged = self.bulk_upsert_current_ids(rows)
+        return len(inserted), len(updated), unchanged
+
+    def bulk_upsert_current_ids(self, rows: List[Dict[str, Any]]) -> Tuple[List[str], List[str], int]:
+        """bulk_upsert_current(), returning (inserted_event_ids, updated_event_ids, unchanged_count)."""
+        if not rows:
+            return [], [], 0
+        keys = sorted(self._clean_fields(TABLE_CURRENT, dict.fromkeys(set().union(*rows))))
+        if "event_id" not in keys:
+            raise ValueError("bulk_upsert_current requires 'event_id'")
+        data = [k for k in keys if k not in ("event_id", "created_ts", "updated_ts")]
+
+        # Stored values for just these columns
+        incoming = {str(r["event_id"]): r for r in rows}
+        ids = list(incoming)
+        stored: Dict[str, sqlite3.Row] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            cur = self.conn.execute(
+                f"SELECT event_id, {', '.join(data) or 'event_id'} FROM {TABLE_CURRENT} "
+                f"WHERE event_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for r in cur.fetchall():
+                stored[str(r["event_id"])] = r
+
+        now = self._now_utc()
+        cols = ["event_id"] + data + ["created_ts", "updated_ts"]
+        params, unchanged, inserted, updated = [], 0, [], []
+        for ev_id, r in incoming.items():
+            old = stored.get(ev_id)
+            if old is not None and all(self._same_value(old[k], r.get(k)) for k in data):
+                unchanged += 1
+                continue
+            (inserted if old is None else updated).append(ev_id)
+            params.append([ev_id] + [r.get(k) for k in data] + [r.get("created_ts") or now, now])
+
+        if params:
+            sql = (
+                f"INSERT INTO {TABLE_CURRENT} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+                f"ON CONFLICT(event_id) DO UPDATE SET "
+                + ", ".join(f"{k}=excluded.{k}" for k in data + ["updated_ts"])
+            )
+            self.conn.executemany(sql, params)
+        return inserted, updated, unchanged
+
     def update_current(self, event_id: str, **fields) -> None:
         if not fields:
             return
-        cols = self._table_columns("current_matches")
-        clean = {k: v for k, v in fields.items() if k in cols}
+        if self._coalesce_depth:
+            self.stage_current(event_id, **fields)
+            return
+        clean = self._clean_fields("current_matches", fields)
         clean["updated_ts"] = self._now_utc()
-        keys = list(clean.keys())
+        keys = sorted(clean)  # same field set -> same SQL text -> cached statement
         sql = f"UPDATE current_matches SET {self._kv_sql(keys)} WHERE event_id=?"
         self.conn.execute(sql, [clean[k] for k in keys] + [event_id])
 
     def fetch_current(self, event_id: str) -> Optional[sqlite3.Row]:
         cur = self.conn.execute("SELECT * FROM current_matches WHERE event_id=?", (event_id,))
-        return cur.fetchone()
+        row = cur.fetchone()
+        staged = self._staged.get(str(event_id))
+        if row is not None and staged:
+            # Inside coalesce(): reads see the staged values
+            row = {**dict(row), **staged}
+        return row
 
     def list_current(self, where_sql: str = "", params: Iterable[Any] = ()) -> list[sqlite3.Row]:
         sql = "SELECT * FROM current_matches"
@@ -128,6 +335,12 @@ class DBHelper:
             sql += " WHERE " + where_sql
         return list(self.conn.execute(sql, params).fetchall())
 
+    def count_current(self, where_sql: str = "", params: Iterable[Any] = ()) -> int:
+        sql = "SELECT COUNT(*) FROM current_matches"
+        if where_sql:
+            sql += " WHERE " + where_sql
+        return self.conn.execute(sql, params).fetchone()[0]
+
     # ---------- STREAM HISTORY ----------
     def log_stream(self, fields: Dict[str, Any]) -> None:
         """
@@ -139,8 +352,7 @@ class DBHelper:
         fields = dict(fields)
         fields.setdefault("timestamp", self._now_utc())
 
-        cols = self._table_columns("match_stream_history")
-        clean = {k: v for k, v in fields.items() if k in cols}
+        clean = self._clean_fields("match_stream_history", fields)
         keys = list(clean.keys())
         placeholders = ", ".join(["?"] * len(keys))
         sql = f"INSERT INTO match_stream_history ({', '.join(keys)}) VALUES ({placeholders})"
@@ -153,6 +365,7 @@ class DBHelper:
         Enforces that ft_score is not NULL when archiving (per your rule).
         """
         with self.tx():
+            self.flush_staged(event_id)
             row = self.fetch_current(event_id)
             if not row:
                 raise ValueError(f"event_id {event_id} not found in current_matches")
@@ -183,6 +396,7 @@ class DBHelper:
 
     def delete_from_current(self, event_id: str):
         # Remove from current_matches (DELETE policy)
+        self._staged.pop(str(event_id), None)
         self.conn.execute("DELETE FROM current_matches WHERE event_id=?", (event_id,))
 
     # ---------- QUERY: ARCHIVE ----------
@@ -197,9 +411,60 @@ class DBHelper:
         ).fetchall())
 
     # ---------- internals ----------
-    def _table_columns(self, table: str) -> set[str]:
-        cur = self.conn.execute(f"PRAGMA table_info({table})")
-        return {r[1] for r in cur.fetchall()}
+    def _table_columns(self, table: str) -> frozenset:
+        """Column names for `table`; PRAGMA table_info runs once per connection until the schema changes."""
+        self._check_schema_version()
+        cols = self._schema_cache.get(table)
+        if cols is None:
+            cur = self.conn.execute(f"PRAGMA table_info({table})")
+            cols = frozenset(r[1] for r in cur.fetchall())
+            self._schema_cache[table] = cols
+        return cols
+
+    def _clean_fields(self, table: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drop keys that are not columns of `table`. A key never seen before forces one schema
+        re-read (picks up columns added by another process); known-unknown keys cost a set lookup.
+        The re-read keeps the unknown set, minus keys that have since become columns.
+        """
+        cols = self._table_columns(table)
+        unknown = [k for k in fields if k not in cols]
+        if unknown:
+            seen = self._unknown_cols.setdefault(table, set())
+            if any(k not in seen for k in unknown):
+                self._schema_cache.pop(table, None)
+                if table == TABLE_CURRENT:
+                    self._hot_sql = None
+                cols = self._table_columns(table)
+                seen -= cols
+                seen.update(k for k in unknown if k not in cols)
+        return {k: v for k, v in fields.items() if k in cols}
+
+    def _check_schema_version(self) -> None:
+        """
+        Drop the column caches if PRAGMA schema_version moved since the last check, so a migration
+        script run against a live bot is picked up within DB_SCHEMA_CHECK_SEC, with no restart.
+        """
+        now = time.monotonic()
+        if now - self._schema_checked < DB_SCHEMA_CHECK_SEC:
+            return
+        self._schema_checked = now
+        version = self.conn.execute("PRAGMA schema_version").fetchone()[0]
+        if self._schema_version is not None and version != self._schema_version:
+            self.invalidate_schema()
+        self._schema_version = version
+
+    def invalidate_schema(self, table: Optional[str] = None) -> None:
+        """Forget cached columns for `table` (or all tables) on this connection."""
+        if table is None:
+            self._schema_cache.clear()
+            self._unknown_cols.clear()
+            self._hot_sql = None
+        else:
+            self._schema_cache.pop(table, None)
+            self._unknown_cols.pop(table, None)
+            if table == TABLE_CURRENT:
+                self._hot_sql = None
     
         # --- context manager support ---
     def __enter__(self):
@@ -222,7 +487,7 @@ class DBHelper:
             pass
 
     def _now_iso(self) -> str:
-        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S%z")
+        return clock.now().strftime("%Y-%m-%d %H:%M:%S%z")
 
     def get_last_stream_prices(self, event_id: str) -> Tuple[Optional[float], Optional[float], Optional[float]]:
         cur = self.conn.execute(
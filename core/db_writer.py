@@ -0,0 +1,213 @@
+"""
+db_writer.py — single-writer database actor.
+
+One thread owns the only write connection to the SQLite file. Everything else
+(AutoTrader, MatchFinder, strategies) submits write commands to its queue and
+reads through its own read-only WAL connection (DBHelper(read_only=True)).
+
+- A command is `fn(db, *args, **kwargs)`, run on the writer thread with a
+  DBHelper bound to the write connection.
+- Commands queued together are applied in one transaction (up to
+  DB_WRITER_MAX_BATCH). Each runs inside its own SAVEPOINT, so a failing
+  command is rolled back alone and its caller gets the exception.
+- Results (and exceptions) are delivered after COMMIT: when call() returns,
+  the write is visible to every reader.
+
+With a single writer in the process, AutoTrader and the MatchFinder scheduler
+no longer fight over the write lock; nothing waits on busy_timeout behind the
+other's transaction.
+"""
+
+from __future__ import annotations
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from core.settings import DB_PATH, DB_WRITER_MAX_BATCH, DB_WRITER_CALL_TIMEOUT_SEC
+from core.db_helper import DBHelper
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _BatchDBHelper(DBHelper):
+    """
+    DBHelper on the writer connection. The writer loop owns the transaction,
+    so tx() does not commit — it only marks a block that must succeed or fail as a whole
+    (the command's SAVEPOINT takes care of the rollback).
+    """
+
+    @contextmanager
+    def tx(self):
+        yield
+
+
+class DBWriter:
+    def __init__(self, db_path=DB_PATH, max_batch: int = DB_WRITER_MAX_BATCH):
+        self.db_path = db_path
+        self.max_batch = max(1, int(max_batch))
+        self._q: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._db: Optional[_BatchDBHelper] = None
+        self._ready = threading.Event()
+        self._boot_error: Optional[BaseException] = None
+        self.batches = 0
+        self.commands = 0
+
+    # ---------- lifecycle ----------
+    def start(self) -> "DBWriter":
+        if self.is_alive():
+            return self
+        self._ready.clear()
+        self._boot_error = None
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._boot_error is not None:
+            raise self._boot_error
+        logger.info("DB writer started on %s", self.db_path)
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Apply everything already queued, then close the write connection."""
+        if not self.is_alive():
+            return
+        self._q.put(_STOP)
+        self._thread.join(timeout)
+        logger.info("DB writer stopped (batches=%d commands=%d)", self.batches, self.commands)
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- API ----------
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue fn(db, *args, **kwargs) for the writer; the Future resolves after its batch commits."""
+        fut: Future = Future()
+        if threading.current_thread() is self._thread:
+            # A command that writes again: run it in the current batch instead of deadlocking
+            try:
+                fut.set_result(fn(self._db, *args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+            return fut
+        if not self.is_alive():
+            raise RuntimeError("DB writer is not running")
+        self._q.put((fn, args, kwargs, fut))
+        return fut
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """submit() and wait for the commit; re-raises the command's exception."""
+        return self.submit(fn, *args, **kwargs).result(timeout=DB_WRITER_CALL_TIMEOUT_SEC)
+
+    # ---------- internals ----------
+    def _run(self) -> None:
+        try:
+            self._db = _BatchDBHelper(self.db_path)
+            self._db.conn.isolation_level = None  # explicit BEGIN/COMMIT below
+        except BaseException as e:
+            self._boot_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        stop = False
+        while not stop:
+            item = self._q.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._apply(batch)
+
+        try:
+            self._db.close()
+        except Exception:
+            pass
+
+    def _apply(self, batch: List[Tuple[Callable, tuple, dict, Future]]) -> None:
+        conn = self._db.conn
+        done: List[Tuple[Future, Any, bool]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, kwargs, fut in batch:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT cmd")
+                try:
+                    result = fn(self._db, *args, **kwargs)
+                except BaseException as e:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK TO cmd")
+                        conn.execute("RELEASE cmd")
+                    done.append((fut, e, False))
+                else:
+                    if conn.in_transaction:
+                        conn.execute("RELEASE cmd")
+                    done.append((fut, result, True))
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")  # the command committed on its own
+            conn.execute("COMMIT")
+        except BaseException as e:
+            logger.error("DB writer batch failed (%d commands): %s", len(batch), e)
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except Exception:
+                    pass
+            for _, _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        self.batches += 1
+        self.commands += len(done)
+        for fut, value, ok in done:
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
+
+
+# ---------- process-wide instance ----------
+_writer: DBWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def _same_file(a, b) -> bool:
+    return a == b or Path(a).resolve() == Path(b).resolve()
+
+
+def get_db_writer(db_path=DB_PATH) -> DBWriter:
+    """
+    Return the process-wide writer, starting it on first use.
+    Raises ValueError if the running writer owns a different file (one writer, one DB per process).
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = DBWriter(db_path).start()
+        elif not _same_file(_writer.db_path, db_path):
+            raise ValueError(f"DB writer already running on {_writer.db_path}, not {db_path}")
+        return _writer
+
+
+def shutdown_db_writer() -> None:
+    """Drain the queue and close the write connection (call once on process exit)."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
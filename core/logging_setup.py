@@ -1,80 +1,80 @@
 import logging
+import threading
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 from pathlib import Path
-from core.settings import (LOG_DIR, LOG_AUTOTRADER_FILE, LOG_STRATEGY_FILE, LOG_ROTATION_WHEN, LOG_ROTATION_BACKUPS)
+from core.settings import (LOG_DIR, LOG_AUTOTRADER_FILE, LOG_STRATEGY_FILE, LOG_MATCHFINDER_FILE,
+                           LOG_LEVEL, LOG_ROTATION_WHEN, LOG_ROTATION_BACKUPS)
 
-def setup_bot_logging(log_dir: str, level=logging.INFO):
-    Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
+# Loggers are configured on first use (not at import time), once per process
+_configured = set()
+_lock = threading.Lock()
 
-    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s | %(message)s")
 
-    root = logging.getLogger("AutoTrader")
-    root.setLevel(level)
+def _setup_logger(name: str, log_file, debug_file, fmt: logging.Formatter, level,
+                  file_level=logging.INFO) -> logging.Logger:
+    root = logging.getLogger(name)
+    with _lock:
+        if name in _configured:
+            return root
+        Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
+        root.setLevel(level)
+
+        # Console
+        ch = logging.StreamHandler()
+        ch.setFormatter(fmt)
+        ch.setLevel(level)
+        root.addHandler(ch)
 
-    # Console
-    ch = logging.StreamHandler()
-    ch.setFormatter(fmt)
-    ch.setLevel(level)
-    root.addHandler(ch)
-    
-    # Rotating file
-    fh = TimedRotatingFileHandler(
-        filename=str(Path(LOG_AUTOTRADER_FILE)),
-        when=LOG_ROTATION_WHEN,
-        backupCount=LOG_ROTATION_BACKUPS,
-        encoding="utf-8"
-    )
-    fh.setFormatter(fmt)
-    fh.setLevel(logging.INFO)
-    root.addHandler(fh)
+        # Rotating file
+        fh = TimedRotatingFileHandler(
+            filename=str(Path(log_file)),
+            when=LOG_ROTATION_WHEN,
+            backupCount=LOG_ROTATION_BACKUPS,
+            encoding="utf-8"
+        )
+        fh.setFormatter(fmt)
+        fh.setLevel(file_level)
+        root.addHandler(fh)
 
-    # Optional: debug file
-    dh = RotatingFileHandler(
-        filename=str(Path(log_dir) / "bot.debug.log"),
-        maxBytes=10_000_000,
-        backupCount=5,
-        encoding="utf-8"
-    )
-    dh.setFormatter(fmt)
-    dh.setLevel(logging.DEBUG)
-    root.addHandler(dh)
+        # Optional: debug file
+        if debug_file is not None:
+            Path(debug_file).parent.mkdir(parents=True, exist_ok=True)
+            dh = RotatingFileHandler(
+                filename=str(Path(debug_file)),
+                maxBytes=10_000_000,
+                backupCount=5,
+                encoding="utf-8"
+            )
+            dh.setFormatter(fmt)
+            dh.setLevel(logging.DEBUG)
+            root.addHandler(dh)
 
+        _configured.add(name)
     return root
 
-def setup_LTD60_logging(log_dir: str, level=logging.INFO):
-    Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
 
+def setup_bot_logging(log_dir: str, level=logging.INFO):
+    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s | %(message)s")
+    return _setup_logger("AutoTrader", LOG_AUTOTRADER_FILE, Path(log_dir) / "bot.debug.log", fmt, level)
+
+
+def setup_LTD60_logging(log_dir: str, level=logging.INFO):
     fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s | %(message)s")
+    return _setup_logger("LTD60", LOG_STRATEGY_FILE, Path(log_dir) / "LTD60.debug.log", fmt, level)
 
-    root = logging.getLogger("LTD60")
-    root.setLevel(level)
 
-    # Console
-    ch = logging.StreamHandler()
-    ch.setFormatter(fmt)
-    ch.setLevel(level)
-    root.addHandler(ch)
-    
-    # Rotating file
-    fh = TimedRotatingFileHandler(
-        filename=str(Path(LOG_STRATEGY_FILE)),
-        when=LOG_ROTATION_WHEN,
-        backupCount=LOG_ROTATION_BACKUPS,
-        encoding="utf-8"
-    )
-    fh.setFormatter(fmt)
-    fh.setLevel(logging.INFO)
-    root.addHandler(fh)
+def setup_matchfinder_logging(level=None):
+    # Console + daily rotating file, no debug file
+    level = getattr(logging, LOG_LEVEL, logging.INFO) if level is None else level
+    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    return _setup_logger("matchfinder", LOG_MATCHFINDER_FILE, None, fmt, level, file_level=level)
 
-    # Optional: debug file
-    dh = RotatingFileHandler(
-        filename=str(Path(log_dir) / "LTD60.debug.log"),
-        maxBytes=10_000_000,
-        backupCount=5,
-        encoding="utf-8"
-    )
-    dh.setFormatter(fmt)
-    dh.setLevel(logging.DEBUG)
-    root.addHandler(dh)
 
-    return root
+def setup_null_logging(names=("AutoTrader", "LTD60", "matchfinder")):
+    # Benchmarks/tests: mark the loggers configured with no handlers, so nothing reaches logs/
+    with _lock:
+        for name in names:
+            root = logging.getLogger(name)
+            root.addHandler(logging.NullHandler())
+            root.propagate = False
+            _configured.add(name)
@@ -0,0 +1,60 @@
+"""
+match_events.py — in-process event bus between MatchFinder and AutoTrader.
+
+MatchFinder publishes what it learned about the catalogue (events added or
+changed in current_matches, events delisted, kick-off times moved); AutoTrader
+subscribes and updates its in-memory state straight away, without re-reading
+the table. When MatchFinder runs in a child process, the scheduler publishes
+these in the trading process once the results are written.
+
+Handlers run synchronously on the publisher's thread, so they must be quick and
+thread-safe. A failing handler is logged and does not stop the others.
+"""
+
+from __future__ import annotations
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Topics
+KICKOFF_CHANGED = "kickoff_changed"   # event_id, old_kickoff, new_kickoff (ISO8601 UTC)
+EVENTS_ADDED = "events_added"         # rows: current_matches rows just inserted (dicts)
+EVENTS_CHANGED = "events_changed"     # rows: current_matches rows whose catalogue fields changed (dicts)
+EVENTS_REMOVED = "events_removed"     # event_ids: upcoming events no longer in the catalogue
+
+# current_matches columns MatchFinder owns (match_finder.EventRecord fields + the insert defaults).
+# Everything else — strategy, order, score and price columns — is written by AutoTrader only.
+FINDER_FIELDS = frozenset((
+    "event_id", "comp", "comp_id", "country_code", "event_name", "kickoff", "h_team", "a_team",
+    "market_id_MATCH_ODDS", "market_id_OU45", "market_id_CS", "paper", "bot_v",
+))
+
+_handlers: Dict[str, List[Callable[..., Any]]] = {}
+_lock = threading.Lock()
+
+
+def subscribe(topic: str, handler: Callable[..., Any]) -> Callable[[], None]:
+    """Register handler(**payload) for topic. Returns a function that unsubscribes it."""
+    with _lock:
+        _handlers.setdefault(topic, []).append(handler)
+
+    def unsubscribe() -> None:
+        with _lock:
+            if handler in _handlers.get(topic, []):
+                _handlers[topic].remove(handler)
+
+    return unsubscribe
+
+
+def publish(topic: str, **payload) -> int:
+    """Call every handler for topic with payload. Returns how many handlers ran."""
+    with _lock:
+        handlers = list(_handlers.get(topic, []))
+    for handler in handlers:
+        try:
+            handler(**payload)
+        except Exception as e:
+            logger.error("Event handler %s failed for %s: %s", getattr(handler, "__name__", handler), topic, e)
+    return len(handlers)
@@ -0,0 +1,219 @@
+"""
+metrics.py — timing spans for the phases of a trading-loop tick.
+
+    from core import metrics
+    with metrics.span("score_fetch"):
+        scores = ...
+    with metrics.span("on_tick", strategy="LTD60"):
+        strat.on_tick(...)
+
+Every span is observed (wall seconds, time.perf_counter — real time even on a
+warped clock) into a histogram per phase and labels with METRICS_BUCKETS.
+The histograms are exposed in Prometheus text format:
+
+- serve() starts GET /metrics on 127.0.0.1:METRICS_HTTP_PORT in a daemon
+  thread (once per process; a busy port is logged, not raised),
+- render() returns the same text.
+
+With METRICS_DB_TABLE on, take_window() hands out count/sum/max per series
+since the previous call and persist_window() writes them to TABLE_METRICS
+(AutoTrader does this every METRICS_DB_FLUSH_SEC through the DB writer).
+
+METRICS_ENABLED = False turns span() into a no-op.
+"""
+
+from __future__ import annotations
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core import clock
+from core.settings import METRICS_ENABLED, METRICS_HTTP_PORT, METRICS_BUCKETS, TABLE_METRICS
+
+logger = logging.getLogger("AutoTrader")
+
+PHASE_METRIC = "footballtrader_phase_seconds"
+
+# The only definition of this table: database/database_rework.py adds it to the bot's schema
+METRICS_SCHEMA = {
+    TABLE_METRICS: f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_METRICS} (
+        ts        TEXT NOT NULL,     -- ISO8601 UTC, end of the window
+        phase     TEXT NOT NULL,
+        labels    TEXT,              -- e.g. strategy=LTD60
+        count     INTEGER NOT NULL,  -- spans in the window
+        sum_sec   REAL NOT NULL,
+        max_sec   REAL NOT NULL
+    );
+    """,
+}
+
+METRICS_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_metrics_phase_ts ON {TABLE_METRICS}(phase, ts);",
+]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "window_count", "window_sum", "window_max")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)  # non-cumulative; render() accumulates
+        self.count = 0
+        self.sum = 0.0
+        self.window_count = 0
+        self.window_sum = 0.0
+        self.window_max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.window_count += 1
+        self.window_sum += value
+        self.window_max = max(self.window_max, value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+class Registry:
+    def __init__(self, buckets: Sequence[float] = METRICS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, phase: str, seconds: float, **labels) -> None:
+        key: Labels = (("phase", phase),) + tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            hist = self._series.get(key)
+            if hist is None:
+                hist = self._series[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = [f"# HELP {PHASE_METRIC} Wall time of one trading-loop phase.",
+                 f"# TYPE {PHASE_METRIC} histogram"]
+        with self._lock:
+            for key in sorted(self._series):
+                hist = self._series[key]
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f"{PHASE_METRIC}_bucket{_label_text(key, ('le', repr(float(bound))))} {cumulative}")
+                lines.append(f"{PHASE_METRIC}_bucket{_label_text(key, ('le', '+Inf'))} {hist.count}")
+                lines.append(f"{PHASE_METRIC}_sum{_label_text(key)} {hist.sum:.6f}")
+                lines.append(f"{PHASE_METRIC}_count{_label_text(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def take_window(self) -> List[Tuple[str, str, str, int, float, float]]:
+        """(ts, phase, labels, count, sum_sec, max_sec) per series observed since the last call."""
+        ts = clock.now().isoformat()
+        rows = []
+        with self._lock:
+            for key, hist in self._series.items():
+                if not hist.window_count:
+                    continue
+                phase = dict(key)["phase"]
+                labels = ",".join(f"{k}={v}" for k, v in key if k != "phase") or None
+                rows.append((ts, phase, labels, hist.window_count, hist.window_sum, hist.window_max))
+                hist.window_count, hist.window_sum, hist.window_max = 0, 0.0, 0.0
+        return rows
+
+
+_registry = Registry()
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+@contextmanager
+def span(phase: str, **labels) -> Iterator[None]:
+    """Time the block as one observation of `phase` (exceptions are timed too)."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _registry.observe(phase, time.perf_counter() - t0, **labels)
+
+
+def observe(phase: str, seconds: float, **labels) -> None:
+    if METRICS_ENABLED:
+        _registry.observe(phase, seconds, **labels)
+
+
+def render() -> str:
+    return _registry.render()
+
+
+def take_window():
+    return _registry.take_window()
+
+
+def persist_window(db, rows) -> None:
+    """Write take_window() rows on db (inside the caller's transaction)."""
+    for ddl in [*METRICS_SCHEMA.values(), *METRICS_INDEXES]:
+        db.conn.execute(ddl)
+    db.conn.executemany(
+        f"INSERT INTO {TABLE_METRICS} (ts, phase, labels, count, sum_sec, max_sec) VALUES (?,?,?,?,?,?)", rows)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):  # scrapes are not worth a log line each
+        return
+
+
+def serve(port: int = METRICS_HTTP_PORT, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Start the /metrics endpoint once per process; None if disabled or the port is taken."""
+    global _server
+    if not METRICS_ENABLED or not port:
+        return None
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as e:
+            logger.warning("METRICS | endpoint not started on %s:%s: %s", host, port, e)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info("METRICS | http://%s:%s/metrics", host, _server.server_address[1])
+        return _server
+
+
+def stop_server() -> None:
+    global _server
+    with _server_lock:
+        server, _server = _server, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
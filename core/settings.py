@@ -30,18 +30,90 @@ LOG_ROTATION_BACKUPS = 10        # keep last 10 days
 TABLE_ARCHIVE = "archive_v3"
 TABLE_CURRENT = "current_matches"
 TABLE_STREAM  = "match_stream_history"
+TABLE_CATALOGUE = "catalogue_cache"        # MatchFinder's persistent market catalogue
+TABLE_CATALOGUE_META = "catalogue_meta"
+TABLE_METRICS = "tick_metrics"             # optional per-phase timing windows (core/metrics.py)
+
+# ================= DB WRITER ================
+# One writer thread owns the only write connection; everything else reads via read-only WAL connections
+DB_SINGLE_WRITER = True
+DB_WRITER_MAX_BATCH = 256        # write commands committed together in one transaction
+DB_WRITER_CALL_TIMEOUT_SEC = 60  # how long a caller waits for its write to commit
+DB_SCHEMA_CHECK_SEC = 5          # how often a connection checks PRAGMA schema_version (migrations by other processes)
+
+# ================= BETFAIR SESSION ==========
+BETFAIR_KEEP_ALIVE_MIN = 15    # keep-alive interval for the shared session (Betfair sessions expire after hours idle)
 
 # ================= MATCHFINDER / SCHEDULER ==
 BETFAIR_HOURS_LOOKAHEAD = 12   # Fetch markets up to X hours from now
 SCHEDULE_MATCHFINDER_MIN = 30  # How often to run MatchFinder
+MATCHFINDER_PROCESS = True     # run MatchFinder in a child process; results are written here by the DB writer
+MATCHFINDER_RESTART_SEC = 30   # wait before restarting a MatchFinder process that died
 # We’ll fetch all three; if a specific market is missing in a run it stays NULL and will be updated on a later run
 MARKETS_REQUIRED = ["MATCH_ODDS", "OVER_UNDER_45", "CORRECT_SCORE"]
 # Optional: pagination cap for catalogue results
 BETFAIR_CATALOGUE_MAX_RESULTS = 1000
+# The lookahead window is fetched in time slices on a small pool; a slice that hits the cap is split again
+CATALOGUE_SLICE_HOURS = 3        # initial slice length
+CATALOGUE_MIN_SLICE_MIN = 10     # below this, split by market type instead of by time
+CATALOGUE_FETCH_WORKERS = 4      # concurrent list_market_catalogue calls
+CATALOGUE_SLICE_RETRIES = 2      # re-sends of a slice that failed (timeout, rate limit) before the run fails
+# Persistent catalogue cache: each run fetches only the newly opened end of the window (plus full rows for
+# market ids an id-only sweep finds new in the covered part) and revalidates
+# kick-off times of known events; a full fetch still runs on a cold cache and every CATALOGUE_FULL_REFRESH_HOURS
+CATALOGUE_CACHE = True
+CATALOGUE_FULL_REFRESH_HOURS = 6
+CATALOGUE_REVALIDATE_CHUNK = 200 # market ids per call when asking by id (revalidation, discovered markets)
 
 # ================= AUTOTRADER ===============
 SP_CAPTURE_WINDOW_SEC = 90   # take snapshot inside last 90s pre-KO
 SP_FALLBACK_INPLAY = True    # if missed pre-KO, capture once at first in-play
+SCORES_BATCH_SIZE = 50       # event ids per in_play_service.get_scores call
+SCORES_PREKO_MINUTES = 15    # fetch scores for events kicking off within X minutes (and all in-play)
+TICK_CONCURRENCY = 8         # events processed in parallel per tick (1 = serial loop)
+TICK_DEADLINE_SEC = 8.0      # events not started by then wait for the next tick
+
+# ================= ORDER SYNC ===============
+# Live mode: all open bets are synced once per tick (autotrader/order_sync.py)
+ORDER_SYNC_BET_IDS_PER_CALL = 250   # bet ids per list_current_orders call
+ORDER_SYNC_PAGE_SIZE = 1000         # record_count per page (moreAvailable -> next page)
+
+# ================= ORDER PLACEMENT ==========
+# Live mode: place/cancel instructions queued during a tick go out after the strategies (autotrader/order_engine.py)
+ORDER_PLACE_WORKERS = 8                 # concurrent place_orders / cancel_orders calls (one per market)
+ORDER_PLACE_MAX_INSTRUCTIONS = 200      # instructions per place_orders call (Betfair limit)
+ORDER_CANCEL_MAX_INSTRUCTIONS = 60      # instructions per cancel_orders call (Betfair limit)
+
+# ================= MATCH STATE STORE ========
+# In-memory current_matches with write-behind to SQLite
+STATE_FLUSH_SEC = 0                      # 0 = flush dirty fields at the end of every tick
+STATE_RESYNC_SEC = 600                   # safety-net re-read of the table (MatchFinder changes arrive as notifications)
+STATE_CRITICAL_FIELDS = ("e_betid",)     # written through immediately (live bet ids must survive a crash)
+
+# ================= POLL SCHEDULER ===========
+# Per-match refresh rates for the REST loop (seconds unless noted)
+POLL_FAR_PREKO_SEC = 180             # more than POLL_NEAR_PREKO_MIN before KO
+POLL_NEAR_PREKO_MIN = 30             # minutes
+POLL_PREKO_SEC = 30                  # within POLL_NEAR_PREKO_MIN, outside the KO windows
+POLL_HOT_SEC = 1.5                   # KO entry / SP capture window, 55'-65' second-entry window
+POLL_KO_GRACE_MIN = 3                # keep the hot rate this many minutes past KO until in-play status arrives
+POLL_HOT_INPLAY_MINUTES = (55, 65)   # time_elapsed range polled at POLL_HOT_SEC
+POLL_INPLAY_SEC = 10                 # normal in-play
+POLL_MIN_SLEEP_SEC = 0.5
+POLL_MAX_SLEEP_SEC = 10
+POLL_HOUSEKEEPING_SEC = 60           # stale cleanup + archive check for unpolled (finished) rows
+
+# ================= MARKET BOOKS =============
+# One shared list_market_book pass per tick; chunked to stay under Betfair's request weight limit
+MARKET_BOOK_PRICE_DATA = ["EX_BEST_OFFERS"]
+MARKET_BOOK_WEIGHT_LIMIT = 200
+MARKET_BOOK_PRICE_WEIGHTS = {
+    "EX_BEST_OFFERS": 5,
+    "EX_ALL_OFFERS": 17,
+    "EX_TRADED": 17,
+    "SP_AVAILABLE": 3,
+    "SP_TRADED": 7,
+}
 
 
 # ================= STRATEGIES ===============
@@ -60,11 +132,43 @@ LTD60_KO_WINDOW_MINUTES = 12
 
 LTD60_SECOND_ENTRY_TIME = 60  # Time in play to trigger second entry
 
+# ================= PAPER FILLS ==============
+# Paper orders fill from each tick's ladder and traded volume (autotrader/paper_fill.py)
+PAPER_FILL_MODEL = True          # False = old rule: filled once the draw lay price reaches the order price
+PAPER_FILL_VOLUME_SHARE = 0.5    # share of a runner's traded volume assumed to hit resting orders on our side
+
 # ================= STREAMING =================
 # How often to poll prices/scores for history logging
 STREAM_POLL_SECONDS = 10  # change here any time
 PRICE_EPSILON = 1e-6      # float “changed” tolerance
 
+# Exchange Stream API mode (alternative to REST polling in AutoTrader)
+STREAMING_MODE = False                 # True = drive ticks from market/order change messages
+STREAM_HOST = "stream-api.betfair.com" # 127.0.0.1 + STREAM_SSL=False for autotrader/fake_stream.py
+STREAM_PORT = 443
+STREAM_SSL = True
+STREAM_MARKET_FIELDS = ["EX_BEST_OFFERS", "EX_MARKET_DEF", "EX_TRADED_VOL"]
+STREAM_LADDER_LEVELS = 3
+STREAM_CONFLATE_MS = 0                 # 0 = every change
+STREAM_HEARTBEAT_MS = 5000
+STREAM_FULL_TICK_SEC = 10              # full tick (scores + all rows) at least this often
+STREAM_RECORD_PATH = None              # e.g. LOG_DIR / "stream.jsonl" to record raw messages for replay
+
+# ================= RECORD / REPLAY ==========
+# Every API response the trading loop sees, appended to one gzip log per UTC day (autotrader/recorder.py);
+# python -m autotrader.replay runs a recorded day back through AutoTrader on a warped clock
+RECORD_API = False
+RECORD_DIR = LOG_DIR / "recordings"
+RECORD_FLUSH_SEC = 5                   # sync-flush the gzip stream at most this often
+
+# ================= METRICS ==================
+# Timing spans per tick phase, as histograms (core/metrics.py)
+METRICS_ENABLED = True
+METRICS_HTTP_PORT = 9108         # Prometheus text on http://127.0.0.1:<port>/metrics (0 = no endpoint)
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds; 10 = tick budget
+METRICS_DB_TABLE = False         # also write count/sum/max per phase to TABLE_METRICS
+METRICS_DB_FLUSH_SEC = 60        # window length for those rows
+
 # ==============SELECTION ID===================
 DRAW_SELECTION_ID = 58805
 
@@ -1,6 +1,13 @@
 # create_db_structure.py
 import os
 import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # run as a script from database/
+
+from core.catalogue_cache import CATALOGUE_SCHEMA, CATALOGUE_INDEXES  # noqa: E402
+from core.metrics import METRICS_SCHEMA, METRICS_INDEXES  # noqa: E402
 
 DB_PATH = r"C:\Users\Sam\FootballTrader v0.3.3\database\autotrader_data.db"
 
@@ -134,6 +141,11 @@ INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_archive_kickoff ON archive_v3(kickoff);",
 ]
 
+# Tables the bot also creates on first use are defined next to the code that owns them
+SCHEMA.update(CATALOGUE_SCHEMA)
+SCHEMA.update(METRICS_SCHEMA)
+INDEXES += CATALOGUE_INDEXES + METRICS_INDEXES
+
 PRAGMAS_BOOT = [
     "PRAGMA foreign_keys = ON;",
     "PRAGMA journal_mode = WAL;",     # better concurrency
@@ -169,7 +181,7 @@ def main():
 
         print("Database initialised:")
         print(" - WAL mode ON, FULL auto-vacuum set")
-        print(" - Tables: archive_v3, current_matches, match_stream_history")
+        print(" - Tables: archive_v3, current_matches, match_stream_history, catalogue_cache, catalogue_meta, tick_metrics")
     finally:
         conn.close()
 
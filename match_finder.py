@@ -1,11 +1,10 @@
+from __future__ import annotations
 import logging
-from logging.handlers import TimedRotatingFileHandler
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import re
 
-
-import pandas as pd
 import sqlite3
 import betfairlightweight
 from betfairlightweight import filters
@@ -13,156 +12,434 @@ from betfairlightweight import filters
 from core.settings import (
     BOT_VERSION, PAPER_MODE,
     DB_PATH, CONFIG_PATH,
-    LOG_DIR, LOG_MATCHFINDER_FILE, LOG_LEVEL, LOG_ROTATION_WHEN, LOG_ROTATION_BACKUPS,
     BETFAIR_HOURS_LOOKAHEAD, MARKETS_REQUIRED, BETFAIR_CATALOGUE_MAX_RESULTS,
-    TABLE_CURRENT
+    CATALOGUE_SLICE_HOURS, CATALOGUE_MIN_SLICE_MIN, CATALOGUE_FETCH_WORKERS, CATALOGUE_CACHE,
+    CATALOGUE_REVALIDATE_CHUNK, CATALOGUE_SLICE_RETRIES,
+    TABLE_CURRENT, DB_SINGLE_WRITER
 )
-from core.betfair_session import BetfairSession
-from core.config_loader import load_betfair_credentials
+from core.betfair_session import get_session_manager
+from core.logging_setup import setup_matchfinder_logging
 
 # ---- Use your existing DB helper (imported from your file) ----
 from core.db_helper import DBHelper  # must be available in PYTHONPATH
+from core.db_writer import get_db_writer
+from core.catalogue_cache import CatalogueCache, persist_changes
+from core import match_events
+
+if TYPE_CHECKING:
+    import pandas as pd  # legacy frame path only; imported lazily there
 
 # =========================================
-# Logging setup (console + daily rotating file)
+# Logging (console + daily rotating file), configured by MatchFinder()
 # =========================================
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
 logger = logging.getLogger("matchfinder")
-logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
-
-# Console handler
-ch = logging.StreamHandler()
-ch.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
-ch.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-
-# Timed rotating file handler (midnight rollover)
-fh = TimedRotatingFileHandler(
-    filename=str(LOG_MATCHFINDER_FILE),
-    when=LOG_ROTATION_WHEN,  # e.g., 'midnight'
-    backupCount=LOG_ROTATION_BACKUPS,
-    encoding="utf-8",
-)
-fh.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
-fh.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
 
-# Avoid duplicate handlers on rerun
-if not logger.handlers:
-    logger.addHandler(ch)
-    logger.addHandler(fh)
+# =========================================
+# Catalogue window slicing
+# =========================================
+def _time_slices(start: datetime, end: datetime, step: timedelta) -> List[Tuple[datetime, datetime]]:
+    out = []
+    frm = start
+    while frm < end:
+        to = min(frm + step, end)
+        out.append((frm, to))
+        frm = to
+    return out
+
+
+def _split_slice(frm: datetime, to: datetime, types: List[str]) -> List[Tuple[datetime, datetime, List[str]]]:
+    """Sub-slices for a slice that hit the result cap: halve the window, then split by market type."""
+    if to - frm > timedelta(minutes=CATALOGUE_MIN_SLICE_MIN):
+        mid = frm + (to - frm) / 2
+        return [(frm, mid, types), (mid, to, types)]
+    if len(types) > 1:
+        return [(frm, to, [t]) for t in types]
+    logger.warning(
+        "Catalogue slice %s..%s (%s) still returns %d markets; results may be truncated.",
+        frm.isoformat(), to.isoformat(), types[0], BETFAIR_CATALOGUE_MAX_RESULTS,
+    )
+    return []
+
+
+# =========================================
+# Catalogue normalisation (single pass, no pandas)
+# =========================================
+# market_name (casefolded) -> current_matches column holding that market's id; order = field priority
+_MARKET_COLUMNS = {
+    "match odds": "market_id_MATCH_ODDS",
+    "over/under 4.5 goals": "market_id_OU45",
+    "correct score": "market_id_CS",
+}
+_MARKET_PRIORITY = {col: i for i, col in enumerate(_MARKET_COLUMNS.values())}
+
+# Everything _catalogue_row reads; a discovery sweep asks for no projection (market ids and names only)
+_CATALOGUE_PROJECTION = ["COMPETITION", "EVENT", "MARKET_START_TIME", "RUNNER_DESCRIPTION"]
+
+
+class EventRecord(NamedTuple):
+    """One current_matches row built from an event's catalogue markets (fields: see match_events.FINDER_FIELDS)."""
+    event_id: str
+    comp: Optional[str]
+    comp_id: Any
+    country_code: Optional[str]
+    event_name: Optional[str]
+    kickoff: Optional[str]          # ISO8601 UTC
+    h_team: Optional[str]
+    a_team: Optional[str]
+    market_id_MATCH_ODDS: Optional[str]
+    market_id_OU45: Optional[str]
+    market_id_CS: Optional[str]
+
+    def payload(self) -> Dict[str, Any]:
+        """Upsert payload: "" -> None, plus the insert defaults."""
+        out = {k: (None if v == "" else v) for k, v in self._asdict().items()}
+        # Defaults on insert (rewritten each run; the bot fills strategy/market fields later)
+        out["paper"] = PAPER_MODE         # 1 = paper, 0 = live
+        out["bot_v"] = BOT_VERSION
+        return out
+
+
+def _kickoff_iso(value) -> Optional[str]:
+    """market_start_time (datetime, naive = UTC, or ISO string) -> ISO8601 UTC; None if unparseable."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.isoformat()
+
+
+def group_catalogue(rows: List[Dict[str, Any]]) -> List[EventRecord]:
+    """
+    Group normalised catalogue rows by event_id in one pass.
+    Per event: the first market of each wanted type supplies its market id; comp / comp_id /
+    country_code / event_name / kickoff come from Match Odds, then O/U 4.5, then Correct Score
+    (first non-missing value wins); teams come from Match Odds only.
+    """
+    events: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for r in rows:
+        col = _MARKET_COLUMNS.get((r.get("market_name") or "").casefold())
+        if col is None or r.get("event_id") is None:
+            continue
+        markets = events.setdefault(str(r["event_id"]), {})
+        markets.setdefault(col, r)  # first market of each type wins
+
+    out = []
+    for event_id, markets in sorted(events.items()):
+        sources = sorted(markets.items(), key=lambda kv: _MARKET_PRIORITY[kv[0]])
+
+        def first(get):
+            for _, src in sources:
+                value = get(src)
+                if value is not None:
+                    return value
+            return None
+
+        mo = markets.get("market_id_MATCH_ODDS")
+        out.append(EventRecord(
+            event_id=event_id,
+            comp=first(lambda s: s.get("competition")),
+            comp_id=first(lambda s: s.get("comp_id")),
+            country_code=first(lambda s: s.get("country_code")),
+            event_name=first(lambda s: s.get("event_name")),
+            kickoff=first(lambda s: _kickoff_iso(s.get("market_start_time"))),
+            h_team=mo.get("h_team_guess") if mo else None,
+            a_team=mo.get("a_team_guess") if mo else None,
+            market_id_MATCH_ODDS=mo.get("market_id") if mo else None,
+            market_id_OU45=markets["market_id_OU45"].get("market_id") if "market_id_OU45" in markets else None,
+            market_id_CS=markets["market_id_CS"].get("market_id") if "market_id_CS" in markets else None,
+        ))
+    return out
+
+
+# =========================================
+# Run results: written by the trading process, then announced on match_events
+# =========================================
+class FinderResult(NamedTuple):
+    """What one MatchFinder run found. Plain data only, so it can cross a process pipe."""
+    payloads: List[Dict[str, Any]]                # current_matches upserts (EventRecord.payload())
+    kickoff_changes: List[Tuple[str, str, str]]   # (event_id, old_kickoff, new_kickoff) ISO8601 UTC
+    removed: List[str]                            # upcoming event_ids that left the catalogue
+    catalogue: Optional[Tuple[list, list, dict]]  # CatalogueCache.take_changes(), None without the cache
+
+
+def apply_finder_result(db: DBHelper, result: FinderResult) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Write one run (catalogue cache + current_matches) in the caller's transaction — a DB writer
+    command. Returns the (added, changed) current_matches rows, read back by event_id.
+    """
+    if result.catalogue is not None:
+        persist_changes(db, *result.catalogue)
+    inserted, updated, unchanged = db.bulk_upsert_current_ids(result.payloads)
+    logger.info("Upsert complete (inserted=%d updated=%d unchanged=%d).", len(inserted), len(updated), unchanged)
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    ids = inserted + updated
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for r in db.list_current(f"event_id IN ({', '.join('?' * len(chunk))})", chunk):
+            fresh[str(r["event_id"])] = dict(r)
+    return [fresh[e] for e in inserted if e in fresh], [fresh[e] for e in updated if e in fresh]
+
+
+def store_finder_result(result: FinderResult, db_path=DB_PATH) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """apply_finder_result() as one command on the DB writer (own connection if the writer is off)."""
+    if DB_SINGLE_WRITER:
+        return get_db_writer(db_path).call(apply_finder_result, result)
+    with DBHelper(db_path) as db:
+        with db.tx():
+            return apply_finder_result(db, result)
+
+
+def publish_finder_result(result: FinderResult, added: List[Dict[str, Any]], changed: List[Dict[str, Any]]) -> None:
+    """Announce a stored run on match_events (AutoTrader updates its in-memory rows from these)."""
+    if added:
+        match_events.publish(match_events.EVENTS_ADDED, rows=added)
+    if changed:
+        match_events.publish(match_events.EVENTS_CHANGED, rows=changed)
+    if result.removed:
+        match_events.publish(match_events.EVENTS_REMOVED, event_ids=list(result.removed))
+    # current_matches already holds the new times
+    for event_id, old, new in result.kickoff_changes:
+        logger.info("Kick-off changed | event=%s | %s -> %s", event_id, old, new)
+        match_events.publish(match_events.KICKOFF_CHANGED, event_id=event_id, old_kickoff=old, new_kickoff=new)
+
 
 # =========================================
 # MatchFinder: fetch & upsert into current_matches
 # =========================================
 class MatchFinder:
     def __init__(self, hours: int = BETFAIR_HOURS_LOOKAHEAD):
+        setup_matchfinder_logging()
         self.hours = hours
 
-    def run(self) -> None:
+    def run(self, api=None) -> None:
+        """Fetch, write through this process's DB writer and announce the changes (in-process mode)."""
+        result = self.collect(api)
+        if result is not None:
+            added, changed = store_finder_result(result)
+            publish_finder_result(result, added, changed)
+        logger.info("MatchFinder run finished.")
+
+    def collect(self, api=None) -> Optional[FinderResult]:
+        """
+        Fetch the catalogue and build this run's writes without touching the database
+        (a MatchFinder child process sends the result to the trading process to store).
+        """
         logger.info("MatchFinder run started")
-        
-        username, password, app_key = load_betfair_credentials(CONFIG_PATH)
-        
-        
-        with BetfairSession(username, password, app_key) as api:
-            
-            rows = self._fetch_catalogue(api)
 
-            if not rows:
-                logger.info("No catalogue rows returned.")
-                return
+        # Shared process-wide session (no per-run login/logout)
+        if api is None:
+            api = get_session_manager(CONFIG_PATH).get_client()
 
-            # Build market-specific frames
-            df_mo = self._build_market_df(rows, target="MATCH_ODDS")
-            df_ou45 = self._build_market_df(rows, target="OVER_UNDER_45",
-                                            exact_market_name="Over/Under 4.5 Goals")
-            df_cs = self._build_market_df(rows, target="CORRECT_SCORE")
+        kickoff_changes, removed, catalogue = [], [], None
+        if CATALOGUE_CACHE:
+            rows, kickoff_changes, removed, cache = self._fetch_incremental(api)
+            catalogue = cache.take_changes()
+        else:
+            rows = self._fetch_catalogue(api)
 
-            # Merge on event_id (preserve union of all events seen)
-            base = self._build_base_df([df_mo, df_ou45, df_cs])
-            # Upsert
-            self._upsert_into_current_matches(base)
+        # One record per event (MATCH_ODDS / OU45 / CS market ids merged)
+        payloads = [r.payload() for r in group_catalogue(rows) if r.comp is not None]
+        if not rows:
+            logger.info("No catalogue rows returned.")
+        else:
+            logger.info(f"Upserting {len(payloads)} rows into {TABLE_CURRENT}...")
+        if not payloads and catalogue is None:
+            return None
+        return FinderResult(
+            payloads=payloads,
+            kickoff_changes=[(ev, old.isoformat(), new.isoformat()) for ev, old, new in kickoff_changes],
+            removed=removed,
+            catalogue=catalogue,
+        )
 
-            logger.info("MatchFinder run finished.")
+    # ---------- Incremental fetch via the persistent catalogue cache ----------
+    def _fetch_incremental(self, api) -> Tuple[List[Dict[str, Any]], List[Tuple[str, datetime, datetime]],
+                                               List[str], CatalogueCache]:
+        """
+        Catalogue rows for the lookahead window, fetching only what the cache does not know yet:
+        a full fetch on a cold/old cache, otherwise kick-off revalidation, an id-only discovery sweep
+        of the covered window (markets listed since it was fetched) + the newly opened window end.
+        Returns (rows, kickoff_changes, removed_event_ids, cache); the cache's changes are not saved yet.
+        """
+        now = datetime.now(timezone.utc)
+        end = now + timedelta(hours=self.hours)
+        cache = CatalogueCache(DB_PATH).load()
+        known = cache.upcoming_events(now)
+        changes = []
+
+        if cache.needs_full_refresh(now):
+            logger.info("Catalogue cache cold or due a full refresh (%d markets cached).", len(cache.markets))
+            cache.replace_all(self._fetch_catalogue(api, now, end), now, end)
+        else:
+            changes = cache.revalidate(api, now)
+            frm = max(now, cache.covered_to)
+            if now < frm:
+                cache.merge(self._discover_markets(api, cache, now, frm))
+            if frm < end:
+                cache.merge(self._fetch_catalogue(api, frm, end))
+            cache.covered_to = end
+
+        cache.prune(now)
+        removed = sorted(known - cache.upcoming_events(now))
+        return cache.rows_between(now, end), changes, removed, cache
 
     # ---------- Fetch whole catalogue window ----------
-    def _fetch_catalogue(self, api) -> List[Dict[str, Any]]:
+    def _fetch_catalogue(self, api, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch [start, end) (default: the whole lookahead window) in CATALOGUE_SLICE_HOURS slices on a thread pool.
+        A slice that returns BETFAIR_CATALOGUE_MAX_RESULTS markets may be truncated, so it is
+        split again (halved in time, or per market type once it is CATALOGUE_MIN_SLICE_MIN long)
+        and re-fetched. Results are merged and deduplicated by market_id.
+        """
+        start = start or datetime.now(timezone.utc)
+        end = end or start + timedelta(hours=self.hours)
+        logger.info(f"Fetching catalogue {start:%H:%M}..{end:%H:%M} UTC | markets={MARKETS_REQUIRED}")
+        markets, calls = self._fetch_markets(api, start, end, _CATALOGUE_PROJECTION)
+        rows = [r for r in (self._catalogue_row(mc) for mc in markets.values()) if r is not None]
+        logger.info(f"Catalogue rows fetched: {len(rows)} ({calls} catalogue calls)")
+        return rows
+
+    def _discover_markets(self, api, cache: CatalogueCache, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        Rows for markets listed in the already-covered [start, end) after it was fetched (late fixtures,
+        OU4.5/CS opened later): one id-only sweep of the window, full rows only for ids the cache lacks.
+        """
+        markets, calls = self._fetch_markets(api, start, end, projection=None)
+        unknown = [m for m in markets if m is not None and m not in cache.markets]
+        rows = self._fetch_by_ids(api, unknown)
+        logger.info("Catalogue discovery | listed=%d new=%d rows=%d (%d id-only calls)",
+                    len(markets), len(unknown), len(rows), calls)
+        return rows
+
+    def _fetch_markets(self, api, start: datetime, end: datetime,
+                       projection: Optional[List[str]]) -> Tuple[Dict[str, Any], int]:
+        """
+        Sliced, split-on-cap list_market_catalogue over [start, end): (market_id -> catalogue, calls).
+        A slice that fails is sent again up to CATALOGUE_SLICE_RETRIES times while the others keep
+        going; after that the error is raised (the caller does not advance covered_to).
+        """
+        types = sorted(set(MARKETS_REQUIRED))
+        markets: Dict[str, Any] = {}
+        calls = 0
+        with ThreadPoolExecutor(max_workers=CATALOGUE_FETCH_WORKERS, thread_name_prefix="catalogue") as pool:
+            pending = {
+                pool.submit(self._fetch_slice, api, frm, to, types, projection): (frm, to, types, 0)
+                for frm, to in _time_slices(start, end, timedelta(hours=CATALOGUE_SLICE_HOURS))
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    frm, to, slice_types, retries = pending.pop(fut)
+                    calls += 1
+                    try:
+                        cats = fut.result()
+                    except Exception as e:
+                        if retries >= CATALOGUE_SLICE_RETRIES:
+                            raise
+                        logger.warning("Catalogue slice %s..%s failed (%s); retrying.", frm.isoformat(), to.isoformat(), e)
+                        pending[pool.submit(self._fetch_slice, api, frm, to, slice_types, projection)] = (
+                            frm, to, slice_types, retries + 1)
+                        continue
+                    for mc in cats:
+                        markets.setdefault(getattr(mc, "market_id", None), mc)
+                    if len(cats) < BETFAIR_CATALOGUE_MAX_RESULTS:
+                        continue
+                    for sub in _split_slice(frm, to, slice_types):
+                        pending[pool.submit(self._fetch_slice, api, *sub, projection)] = (*sub, 0)
+        return markets, calls
+
+    def _fetch_slice(self, api, frm: datetime, to: datetime, types: List[str],
+                     projection: Optional[List[str]] = _CATALOGUE_PROJECTION) -> list:
         market_filter = filters.market_filter(
             event_type_ids=[1],  # 1 = Soccer
-            market_type_codes=list(set(MARKETS_REQUIRED)),
+            market_type_codes=types,
             in_play_only=False,
             market_start_time={
-                "from": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "to": (datetime.now(timezone.utc) + timedelta(hours=self.hours)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "from": frm.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "to": to.strftime("%Y-%m-%dT%H:%M:%SZ"),
             },
         )
-
-        logger.info(f"Fetching catalogue for next {self.hours}h | markets={MARKETS_REQUIRED}")
-        cats = api.betting.list_market_catalogue(
+        return api.betting.list_market_catalogue(
             filter=market_filter,
-            market_projection=["COMPETITION", "EVENT", "MARKET_START_TIME", "RUNNER_DESCRIPTION"],
+            market_projection=projection,
             max_results=BETFAIR_CATALOGUE_MAX_RESULTS,
             lightweight=False,
         )
-        # print(cats)
-        # Normalize to list of dicts for robust downstream handling
+
+    def _fetch_by_ids(self, api, market_ids: List[str]) -> List[Dict[str, Any]]:
+        """Full catalogue rows for known market ids, CATALOGUE_REVALIDATE_CHUNK ids per call."""
         rows = []
-        for mc in cats:
-            # 'mc' is MarketCatalogue (obj); turn into dict shape we need
-            try:
-                comp_name = getattr(mc.competition, "name", None)
-                # comp_name = self._clean_league_name(raw_comp)
-                comp_id = getattr(getattr(mc, "competition", None), "id", None)
-                country_code = getattr(getattr(mc, "event", None), "country_code", None)
-                event_name = getattr(mc.event, "name", None)
-                event_id = getattr(mc.event, "id", None)
-                market_id = getattr(mc, "market_id", None)
-                market_name = getattr(mc, "market_name", None)
-                market_type = getattr(mc, "market_name", None)  # we still rely on name + type below
-                mtype_code = getattr(mc, "market_type", None) if hasattr(mc, "market_type") else None
-                mst = getattr(mc, "market_start_time", None)
-
-                # Runners (for teams from MATCH_ODDS)
-                home_team = None
-                away_team = None
-                try:
-                    runners = getattr(mc, "runners", []) or []
-                    if len(runners) >= 2:
-                        home_team = getattr(runners[0], "runner_name", None)
-                        away_team = getattr(runners[1], "runner_name", None)
-                except Exception:
-                    pass
-
-                rows.append({
-                    "competition": comp_name,
-                    "comp_id": comp_id,
-                    "country_code": country_code,
-                    "event_name": event_name,
-                    "event_id": event_id,
-                    "market_id": market_id,
-                    "market_name": market_name,
-                    "market_type_code": mtype_code,   # may be None in lightweight; we’ll check name too
-                    "market_start_time": mst,
-                    "h_team_guess": home_team,
-                    "a_team_guess": away_team,
-                })
-            except Exception as e:
-                logger.debug(f"Skipping malformed catalogue row: {e}")
-                continue
-
-        logger.info(f"Catalogue rows fetched: {len(rows)}")
-        
+        for i in range(0, len(market_ids), CATALOGUE_REVALIDATE_CHUNK):
+            chunk = market_ids[i:i + CATALOGUE_REVALIDATE_CHUNK]
+            cats = api.betting.list_market_catalogue(
+                filter=filters.market_filter(market_ids=chunk),
+                market_projection=_CATALOGUE_PROJECTION,
+                max_results=len(chunk),
+                lightweight=False,
+            )
+            rows += [r for r in (self._catalogue_row(mc) for mc in cats) if r is not None]
         return rows
 
-    # ---------- Build a DataFrame for a specific market ----------
+    def _catalogue_row(self, mc) -> Optional[Dict[str, Any]]:
+        """Normalize a MarketCatalogue into the dict shape used downstream (None if malformed)."""
+        try:
+            comp_name = getattr(mc.competition, "name", None)
+            # comp_name = self._clean_league_name(raw_comp)
+            comp_id = getattr(getattr(mc, "competition", None), "id", None)
+            country_code = getattr(getattr(mc, "event", None), "country_code", None)
+            event_name = getattr(mc.event, "name", None)
+            event_id = getattr(mc.event, "id", None)
+            market_id = getattr(mc, "market_id", None)
+            market_name = getattr(mc, "market_name", None)
+            mtype_code = getattr(mc, "market_type", None) if hasattr(mc, "market_type") else None
+            mst = getattr(mc, "market_start_time", None)
+
+            # Runners (for teams from MATCH_ODDS)
+            home_team = None
+            away_team = None
+            try:
+                runners = getattr(mc, "runners", []) or []
+                if len(runners) >= 2:
+                    home_team = getattr(runners[0], "runner_name", None)
+                    away_team = getattr(runners[1], "runner_name", None)
+            except Exception:
+                pass
+
+            return {
+                "competition": comp_name,
+                "comp_id": comp_id,
+                "country_code": country_code,
+                "event_name": event_name,
+                "event_id": event_id,
+                "market_id": market_id,
+                "market_name": market_name,
+                "market_type_code": mtype_code,   # may be None in lightweight; we’ll check name too
+                "market_start_time": mst,
+                "h_team_guess": home_team,
+                "a_team_guess": away_team,
+            }
+        except Exception as e:
+            logger.debug(f"Skipping malformed catalogue row: {e}")
+            return None
+
+    # ---------- Legacy pandas path (kept for the parity check in benchmarks/) ----------
     def _build_market_df(self, rows: List[Dict[str, Any]], target: str,
                          exact_market_name: Optional[str] = None) -> pd.DataFrame:
         """
+        Superseded by group_catalogue(); benchmarks/check_catalogue_parity.py compares the two.
         target in {"MATCH_ODDS","OVER_UNDER_45","CORRECT_SCORE"}
         If exact_market_name is given, additionally require market_name to match e.g. 'Over/Under 4.5 Goals'.
         Returns columns: event_id, league, event_name, kickoff, (h_team, a_team only if MATCH_ODDS),
                          market_id_<TARGET>
         """
+        import pandas as pd
+
         df = pd.DataFrame(rows)
         
         if df.empty:
@@ -215,6 +492,8 @@ class MatchFinder:
           - market_id_* columns are present; missing values are None,
           - h_team/a_team present if MATCH_ODDS available.
         """
+        import pandas as pd
+
         # Choose a priority order so that base has h_team/a_team if possible
         # Priority: MATCH_ODDS -> OU45 -> CS (for league/event_name/kickoff)
         by_name = {f.columns[-1]: f for f in frames if not f.empty}
@@ -262,44 +541,23 @@ class MatchFinder:
 
         return out
 
-    # ---------- Upsert into current_matches ----------
-    def _upsert_into_current_matches(self, df: pd.DataFrame) -> None:
-        if df.empty:
-            logger.info("No rows to upsert into current_matches.")
-            return
-        df = df[df["comp"].notna()].copy()
-
-        logger.info(f"Upserting {len(df)} rows into {TABLE_CURRENT}...")
-        with DBHelper(DB_PATH) as db:
-            # (Optional) ensure table exists / columns known — assuming you already created
-            for _, row in df.iterrows():
-                payload = {
-                    "event_id": str(row["event_id"]),
-                    "comp": (row.get("comp") or None),
-                    "comp_id":  (row.get("comp_id") or None),
-                    "country_code": (row.get("country_code") or None), 
-                    "event_name": (row.get("event_name") or None),
-                    "kickoff": (row.get("kickoff").isoformat() if pd.notna(row.get("kickoff")) else None),
-                    "h_team": (row.get("h_team") or None),
-                    "a_team": (row.get("a_team") or None),
-                    "market_id_MATCH_ODDS": (row.get("market_id_MATCH_ODDS") or None),
-                    "market_id_OU45": (row.get("market_id_OU45") or None),
-                    "market_id_CS": (row.get("market_id_CS") or None),
-
-                    # Defaults on insert (won’t overwrite existing values thanks to ON CONFLICT update rule)
-                    "paper": PAPER_MODE,         # 1 = paper, 0 = live
-                    "bot_v": BOT_VERSION,
-
-                    # Placeholders the bot fills later
-                    # "strategy": None,
-                    # "market": None,
-                    # "market_state": None,
-                }
-                
-                db.upsert_current(payload)
-
-        logger.info("Upsert complete.")
-    
+    @staticmethod
+    def _frame_payloads(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Legacy: upsert payloads from the merged base frame (same shape as EventRecord.payload())."""
+        import pandas as pd
+
+        df = df[df["comp"].notna()]
+        out = df.reindex(columns=list(EventRecord._fields))
+        out["event_id"] = out["event_id"].astype(str)
+        out["kickoff"] = out["kickoff"].map(lambda k: k.isoformat() if pd.notna(k) else None)
+        # NaN / NaT / "" -> None (same as the old per-row `value or None`)
+        out = out.astype(object).where(out.notna() & (out != ""), None)
+        payloads = out.to_dict("records")
+        for p in payloads:
+            p["paper"] = PAPER_MODE
+            p["bot_v"] = BOT_VERSION
+        return payloads
+
     def _clean_league_name(self, name: str) -> str:
         """
         Normalises Betfair competition names into 'Country, League' format.
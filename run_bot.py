@@ -6,15 +6,24 @@ Responsibilities:
   • Start MatchFinder scheduler in background
   • Run AutoTrader in main thread
   • Handle graceful shutdown (Ctrl+C)
+
+Usage:
+  python run_bot.py                      # trade
+  python run_bot.py --profile-startup    # report import time per module and exit
 """
 
 import os
+import argparse
 import logging
+import subprocess
+import sys
 import time
 import threading
 from pathlib import Path
 
 from core.config_loader import load_betfair_credentials
+from core.betfair_session import shutdown_session_manager
+from core.db_writer import shutdown_db_writer
 from core.settings import BOT_VERSION, SCHEDULE_MATCHFINDER_MIN
 from autotrader.scheduler import start_scheduler, stop_scheduler
 from autotrader.autotrader import AutoTrader
@@ -45,6 +54,59 @@ def safe_start_scheduler():
         logger.warning("Scheduler already running, skipping duplicate start.")
 
 
+# -----------------------------------------------------------------------------
+# Startup profiling
+# -----------------------------------------------------------------------------
+# Should never load on the live start-up path (backtests / legacy frame code only)
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")
+
+
+def profile_startup(top: int = 25) -> int:
+    """
+    Import this module in a fresh interpreter under `-X importtime` and report
+    the slowest imports (cumulative and self time). Nothing is started.
+    Returns non-zero if one of HEAVY_MODULES was loaded.
+    """
+    base_dir = Path(__file__).resolve().parent
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import run_bot"],
+        cwd=str(base_dir), capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    rows = []  # (self_us, cumulative_us, module)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(self_us), int(cum_us), name.strip()))
+        except ValueError:
+            continue
+    if proc.returncode != 0:
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import run_bot failed")
+        return proc.returncode
+
+    total_us = sum(r[0] for r in rows)
+    print(f"Startup imports: {len(rows)} modules, {total_us / 1000:.1f} ms import time "
+          f"({wall_ms:.0f} ms interpreter wall)")
+
+    print(f"\nTop {top} by cumulative time:")
+    for self_us, cum_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"  {cum_us / 1000:9.1f} ms  {name}")
+    print(f"\nTop {top} by self time:")
+    for self_us, cum_us, name in sorted(rows, key=lambda r: r[0], reverse=True)[:top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+
+    heavy = sorted({name for _, _, name in rows if name.split(".")[0] in HEAVY_MODULES})
+    if heavy:
+        print(f"\nHeavy modules on the start-up path: {', '.join(heavy)}")
+        return 1
+    print(f"\nNone of {', '.join(HEAVY_MODULES)} loaded at start-up.")
+    return 0
+
+
 # -----------------------------------------------------------------------------
 # Main entrypoint
 # -----------------------------------------------------------------------------
@@ -77,11 +139,26 @@ def main():
     except Exception as e:
         logger.exception("AutoTrader crashed: %s", e)
     finally:
+        # Flush pending match state and close the trader's DB connection
+        try:
+            trader.close()
+        except Exception:
+            pass
         # Stop scheduler cleanly (optional, but tidy)
         try:
             stop_scheduler()
         except Exception:
             pass
+        # Commit anything still queued on the DB writer thread
+        try:
+            shutdown_db_writer()
+        except Exception:
+            pass
+        # Single logout for the shared Betfair session
+        try:
+            shutdown_session_manager()
+        except Exception:
+            pass
         logger.info("FootballTrader shutting down.")
 
 
@@ -89,4 +166,10 @@ def main():
 # Entrypoint guard
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FootballTrader bot")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import time per module (python -X importtime) and exit")
+    args = parser.parse_args()
+    if args.profile_startup:
+        sys.exit(profile_startup())
     main()
@@ -0,0 +1,32 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "database"))
+
+from core.logging_setup import setup_null_logging  # noqa: E402
+from database_rework import SCHEMA, INDEXES  # noqa: E402
+
+setup_null_logging()  # keep the bot loggers out of the tracked logs/
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """WAL database with the bot's schema (database/database_rework.py) and matches "1" and "2"."""
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode = WAL;")
+    for ddl in SCHEMA.values():
+        conn.execute(ddl)
+    for idx in INDEXES:
+        conn.execute(idx)
+    conn.executemany(
+        "INSERT INTO current_matches (comp, event_name, event_id, kickoff, market_id_MATCH_ODDS) VALUES (?,?,?,?,?)",
+        [("League", f"Home {i} v Away {i}", str(i), "2030-01-01T15:00:00+00:00", f"1.{i}") for i in (1, 2)],
+    )
+    conn.commit()
+    conn.close()
+    return str(path)
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("betfairlightweight")  # the strategies build their instructions with it
+
+from autotrader.autotrader import AutoTrader  # noqa: E402
+from autotrader.fake_exchange import FakeAPIClient, FakeExchange  # noqa: E402
+from core import match_events  # noqa: E402
+from core.db_writer import shutdown_db_writer  # noqa: E402
+
+
+@pytest.fixture
+def trader(db_path):
+    t = AutoTrader(api=FakeAPIClient(FakeExchange()), db_path=db_path, record=False)
+    yield t
+    t.close()
+    shutdown_db_writer()
+
+
+def _handlers():
+    return match_events.publish(match_events.EVENTS_REMOVED, event_ids=[])
+
+
+def test_close_unsubscribes_the_match_event_handlers(trader):
+    before = _handlers()
+    assert before >= 1
+    trader.close()
+    assert _handlers() == before - 1
+    trader.close()  # idempotent
+    assert _handlers() == before - 1
+
+
+def test_close_shuts_down_the_tick_engine_pool(trader):
+    pool = trader._engine._pool
+    trader.close()
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+
+
+def test_close_stops_the_stream(trader):
+    class Stream:
+        stopped = 0
+
+        def stop(self):
+            self.stopped += 1
+
+    trader._stream = stream = Stream()
+    trader.close()
+    assert stream.stopped == 1 and trader._stream is None
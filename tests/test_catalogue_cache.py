@@ -0,0 +1,156 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("betfairlightweight")  # catalogue_cache and match_finder build filters with it
+
+import match_finder  # noqa: E402
+from autotrader.fake_exchange import FakeAPIClient, FakeExchange  # noqa: E402
+from core.catalogue_cache import CatalogueCache, persist_changes  # noqa: E402
+from core.db_helper import DBHelper  # noqa: E402
+from core.settings import CATALOGUE_SLICE_RETRIES  # noqa: E402
+
+NOW = datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc)
+MARKET_TYPES = ("MATCH_ODDS", "OVER_UNDER_45")
+
+
+def _row(market_id, event_id, start, name="Match Odds"):
+    return {"market_id": market_id, "event_id": event_id, "market_name": name, "market_start_time": start}
+
+
+@pytest.fixture
+def exchange():
+    ex = FakeExchange(now=NOW)
+    for i in (1, 2):
+        ex.add_match(str(i), f"Home {i}", f"Away {i}", kickoff=NOW + timedelta(hours=i), market_types=MARKET_TYPES)
+    return ex
+
+
+def _rows(api):
+    mf = match_finder.MatchFinder()
+    return [mf._catalogue_row(mc) for mc in api.betting.list_market_catalogue()]
+
+
+def test_take_changes_returns_each_change_once_and_round_trips(db_path):
+    cache = CatalogueCache(db_path)
+    cache.merge([_row("1.1", "1", NOW + timedelta(hours=1)), _row("1.2", "2", NOW + timedelta(hours=2))])
+    cache.covered_to = cache.last_full = NOW
+
+    upserts, deletes, meta = cache.take_changes()
+    assert sorted(u[0] for u in upserts) == ["1.1", "1.2"] and deletes == []
+    assert meta == {"covered_to": NOW.isoformat(), "last_full": NOW.isoformat()}
+    assert cache.take_changes()[:2] == ([], [])  # nothing changed since
+
+    cache.merge([_row("1.1", "1", NOW + timedelta(hours=1))])  # same row again: not a change
+    assert cache.take_changes()[0] == []
+
+    with DBHelper(db_path) as db, db.tx():
+        persist_changes(db, upserts, deletes, meta)
+    loaded = CatalogueCache(db_path).load()
+    assert loaded.markets == cache.markets
+    assert (loaded.covered_to, loaded.last_full) == (NOW, NOW)
+
+
+def test_replace_all_deletes_only_the_markets_that_went():
+    cache = CatalogueCache()
+    cache.merge([_row("1.1", "1", NOW + timedelta(hours=1)), _row("1.2", "2", NOW + timedelta(hours=2))])
+    cache.take_changes()
+
+    cache.replace_all([_row("1.2", "2", NOW + timedelta(hours=2)), _row("1.3", "3", NOW + timedelta(hours=3))],
+                      NOW, NOW + timedelta(hours=12))
+    upserts, deletes, _ = cache.take_changes()
+    assert deletes == ["1.1"]
+    assert sorted(u[0] for u in upserts) == ["1.2", "1.3"]  # a full refresh rewrites every listed row
+    assert (cache.last_full, cache.covered_to) == (NOW, NOW + timedelta(hours=12))
+    assert not cache.needs_full_refresh(NOW + timedelta(hours=1))
+
+
+def test_prune_drops_started_markets_and_their_pending_upserts():
+    cache = CatalogueCache()
+    cache.merge([_row("1.1", "1", NOW - timedelta(minutes=1)), _row("1.2", "2", NOW + timedelta(hours=1)),
+                 _row("1.3", "3", None)])
+    cache.prune(NOW)
+    assert list(cache.markets) == ["1.2"]
+    upserts, deletes, _ = cache.take_changes()
+    assert [u[0] for u in upserts] == ["1.2"]
+    assert sorted(deletes) == ["1.1", "1.3"]
+    assert cache.upcoming_events(NOW) == {"2"}
+
+
+def test_revalidate_moves_kickoffs_and_drops_vanished_events(exchange):
+    api = FakeAPIClient(exchange)
+    cache = CatalogueCache()
+    cache.merge(_rows(api))
+    cache.take_changes()
+
+    moved = NOW + timedelta(hours=1, minutes=30)
+    exchange.events["1"].kickoff = moved.replace(tzinfo=None)
+    for m in exchange.events["2"].markets.values():
+        m.status = "CLOSED"
+
+    changes = cache.revalidate(api, NOW)
+    assert changes == [("1", NOW + timedelta(hours=1), moved)]
+    assert exchange.calls["list_market_catalogue"] == 2  # the initial listing + one probe chunk
+    assert {r["event_id"] for r in cache.markets.values()} == {"1"}
+    assert all(r["market_start_time"] == moved for r in cache.markets.values())  # every market of the event
+    upserts, deletes, _ = cache.take_changes()
+    assert len(upserts) == len(MARKET_TYPES) and len(deletes) == len(MARKET_TYPES)
+
+
+def test_a_warm_run_discovers_markets_listed_inside_the_covered_window(db_path, monkeypatch):
+    monkeypatch.setattr(match_finder, "DB_PATH", db_path)
+    now = datetime.now(timezone.utc)  # _fetch_incremental plans on the wall clock
+    exchange = FakeExchange()
+    for i in (1, 2):
+        exchange.add_match(str(i), f"Home {i}", f"Away {i}", kickoff=now + timedelta(hours=i), market_types=MARKET_TYPES)
+    api = FakeAPIClient(exchange)
+    cache = CatalogueCache(db_path)
+    cache.replace_all(_rows(api), now, now + timedelta(hours=12))
+    with DBHelper(db_path) as db, db.tx():
+        persist_changes(db, *cache.take_changes())
+
+    # A fixture listed after the cache covered its kick-off time
+    late = exchange.add_match("3", "Home 3", "Away 3", kickoff=now + timedelta(hours=3), market_types=MARKET_TYPES)
+    exchange.calls.clear()
+
+    rows, _, removed, cache = match_finder.MatchFinder()._fetch_incremental(api)
+    assert {m.market_id for m in late.markets.values()} <= {r["market_id"] for r in rows}
+    assert removed == []
+    upserts, _, _ = cache.take_changes()
+    assert sorted(u[0] for u in upserts) == sorted(m.market_id for m in late.markets.values())
+    # revalidation probe + id-only sweep of the covered 12 h (3 h slices) + one by-id fetch for the new
+    # markets + the few seconds of window opened since the cache was written
+    assert exchange.calls["list_market_catalogue"] == 1 + 4 + 1 + 1
+
+
+class _FlakyBetting:
+    """list_market_catalogue that times out `fails` times for the slice starting at `start`."""
+
+    def __init__(self, api, start: datetime, fails: int):
+        self._api, self.fails = api, fails
+        self._from = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._lock = threading.Lock()
+
+    def list_market_catalogue(self, filter=None, **kwargs):
+        with self._lock:
+            fail = (filter or {}).get("marketStartTime", {}).get("from") == self._from and self.fails > 0
+            self.fails -= fail
+        if fail:
+            raise TimeoutError("read timed out")
+        return self._api.betting.list_market_catalogue(filter=filter, **kwargs)
+
+
+def test_a_failed_slice_is_retried_without_losing_the_others(exchange):
+    flaky = _FlakyBetting(FakeAPIClient(exchange), NOW, fails=CATALOGUE_SLICE_RETRIES)
+    rows = match_finder.MatchFinder()._fetch_catalogue(SimpleNamespace(betting=flaky), NOW, NOW + timedelta(hours=12))
+    assert len(rows) == len(exchange.markets)
+    assert exchange.calls["list_market_catalogue"] == 4  # 12 h in 3 h slices, the failures never reached it
+
+
+def test_a_slice_that_keeps_failing_fails_the_run(exchange):
+    flaky = _FlakyBetting(FakeAPIClient(exchange), NOW, fails=CATALOGUE_SLICE_RETRIES + 1)
+    with pytest.raises(TimeoutError):
+        match_finder.MatchFinder()._fetch_catalogue(SimpleNamespace(betting=flaky), NOW, NOW + timedelta(hours=12))
+    assert flaky.fails == 0
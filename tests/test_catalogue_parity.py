@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("betfairlightweight")  # match_finder imports it at module level
+
+from match_finder import MatchFinder, group_catalogue  # noqa: E402
+
+FIXTURE = Path(__file__).resolve().parent.parent / "benchmarks" / "data" / "catalogue_sample.json"
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rows = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    for r in rows:
+        # betfairlightweight hands market_start_time over as a naive UTC datetime
+        if r.get("market_start_time"):
+            r["market_start_time"] = datetime.fromisoformat(r["market_start_time"])
+    return rows
+
+
+def _legacy_payloads(rows):
+    mf = MatchFinder()
+    frames = [
+        mf._build_market_df(rows, target="MATCH_ODDS"),
+        mf._build_market_df(rows, target="OVER_UNDER_45", exact_market_name="Over/Under 4.5 Goals"),
+        mf._build_market_df(rows, target="CORRECT_SCORE"),
+    ]
+    return MatchFinder._frame_payloads(mf._build_base_df(frames))
+
+
+def test_group_catalogue_matches_the_legacy_pandas_frames(rows):
+    pytest.importorskip("pandas")
+    legacy = {p["event_id"]: p for p in _legacy_payloads(rows)}
+    grouped = {r.event_id: r.payload() for r in group_catalogue(rows) if r.comp is not None}
+    assert legacy
+    assert grouped == legacy
+
+
+def test_group_catalogue_one_record_per_event_with_market_ids(rows):
+    records = group_catalogue(rows)
+    assert len({r.event_id for r in records}) == len(records)
+    assert [r.event_id for r in records] == sorted(r.event_id for r in records)
+    by_event = {}
+    for r in rows:
+        by_event.setdefault(str(r["event_id"]), {}).setdefault(r["market_name"].casefold(), r["market_id"])
+    for rec in records:
+        markets = by_event[rec.event_id]
+        assert rec.market_id_MATCH_ODDS == markets.get("match odds")
+        assert rec.market_id_OU45 == markets.get("over/under 4.5 goals")
+        assert rec.market_id_CS == markets.get("correct score")
+        assert rec.kickoff is None or rec.kickoff.endswith("+00:00")
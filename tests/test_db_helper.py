@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+
+import core.db_helper as db_helper
+from core.db_helper import DBHelper
+
+
+@pytest.fixture
+def helper(db_path):
+    db = DBHelper(db_path)
+    yield db
+    db.close()
+
+
+def _count_table_info(db):
+    seen = []
+    db.conn.set_trace_callback(lambda sql: seen.append(sql) if sql.startswith("PRAGMA table_info") else None)
+    return seen
+
+
+def test_columns_are_read_once_per_connection(helper):
+    reads = _count_table_info(helper)
+    for i in range(20):
+        helper.update_current("1", h_score=i)
+    assert len(reads) <= 1
+    assert helper.fetch_current("1")["h_score"] == 19
+
+
+def test_alternating_unknown_keys_reread_the_schema_once_each(helper):
+    helper._table_columns("current_matches")
+    reads = _count_table_info(helper)
+    for i in range(10):
+        helper.update_current("1", **{"foo" if i % 2 else "bar": i})
+    assert len(reads) == 2
+    assert helper._unknown_cols["current_matches"] == {"foo", "bar"}
+
+
+def test_new_unknown_key_picks_up_a_column_added_elsewhere(helper, db_path):
+    helper.update_current("1", foo=1)
+    helper.conn.commit()
+    other = sqlite3.connect(db_path)
+    other.execute("ALTER TABLE current_matches ADD COLUMN baz INTEGER")
+    other.commit()
+    other.close()
+
+    helper.update_current("1", baz=7)
+    helper.conn.commit()
+    assert helper.fetch_current("1")["baz"] == 7
+    assert helper._unknown_cols["current_matches"] == {"foo"}
+
+
+def test_schema_change_in_another_process_drops_the_cache(helper, db_path, monkeypatch):
+    monkeypatch.setattr(db_helper, "DB_SCHEMA_CHECK_SEC", 0)
+    helper.update_current("1", foo=1)  # known-unknown from here
+    helper.conn.commit()
+    other = sqlite3.connect(db_path)
+    other.execute("ALTER TABLE current_matches ADD COLUMN foo INTEGER")
+    other.commit()
+    other.close()
+
+    helper.update_current("1", foo=5)
+    helper.conn.commit()
+    assert helper.fetch_current("1")["foo"] == 5
+
+
+
+def _trace_updates(db):
+    updates = []
+    db.conn.set_trace_callback(lambda sql: updates.append(sql) if sql.lstrip().startswith("UPDATE") else None)
+    return updates
+
+
+def test_coalesce_writes_one_update_per_changed_row(helper):
+    updates = _trace_updates(helper)
+    with helper.coalesce():
+        helper.update_current("1", h_score=1)
+        helper.update_current("1", a_score=0, market_state="OPEN")
+        helper.update_current("1", h_score=2)
+        helper.update_current("2", comp="League")  # same as stored: not written
+    assert len(updates) == 1
+    row = helper.fetch_current("1")
+    assert (row["h_score"], row["a_score"], row["market_state"]) == (2, 0, "OPEN")
+
+
+def test_coalesce_skips_rows_that_end_unchanged(helper):
+    with helper.coalesce():
+        helper.update_current("1", time_elapsed=55, d_back_price=3.5)
+    updated_ts = helper.fetch_current("1")["updated_ts"]
+
+    updates = _trace_updates(helper)
+    with helper.coalesce():
+        helper.update_current("1", time_elapsed="55", d_back_price=3.5)  # TEXT '55' as stored
+    assert updates == []
+    assert helper.fetch_current("1")["updated_ts"] == updated_ts
+
+
+def test_coalesced_reads_see_staged_values(helper):
+    with helper.coalesce():
+        helper.update_current("1", market_state="SUSPENDED")
+        assert helper.fetch_current("1")["market_state"] == "SUSPENDED"
+
+
+def _catalogue_row(event_id, kickoff="2030-01-01T15:00:00+00:00"):
+    return {"event_id": event_id, "comp": "League", "event_name": f"Home {event_id} v Away {event_id}",
+            "kickoff": kickoff, "market_id_MATCH_ODDS": f"1.{event_id}", "not_a_column": "ignored"}
+
+
+def test_bulk_upsert_inserts_updates_and_skips_unchanged(helper):
+    with helper.tx():
+        assert helper.bulk_upsert_current([_catalogue_row("1"), _catalogue_row("5")]) == (1, 0, 1)
+    created = helper.fetch_current("5")["created_ts"]
+    untouched = helper.fetch_current("1")["updated_ts"]
+
+    with helper.tx():
+        inserted, updated, unchanged = helper.bulk_upsert_current_ids(
+            [_catalogue_row("1"), _catalogue_row("5", kickoff="2030-01-01T17:30:00+00:00")])
+    assert (inserted, updated, unchanged) == ([], ["5"], 1)
+    row = helper.fetch_current("5")
+    assert row["kickoff"] == "2030-01-01T17:30:00+00:00"
+    assert row["created_ts"] == created
+    assert helper.fetch_current("1")["updated_ts"] == untouched
+
+
+def test_bulk_upsert_keeps_columns_it_was_not_given(helper):
+    helper.update_current("1", e_betid="B1", h_score=2)
+    with helper.tx():
+        helper.bulk_upsert_current([_catalogue_row("1", kickoff="2030-01-01T16:00:00+00:00")])
+    row = helper.fetch_current("1")
+    assert (row["e_betid"], row["h_score"], row["kickoff"]) == ("B1", 2, "2030-01-01T16:00:00+00:00")
@@ -0,0 +1,44 @@
+import pytest
+
+from core.db_helper import DBHelper
+from core.db_writer import get_db_writer, shutdown_db_writer
+
+
+@pytest.fixture
+def writer(db_path):
+    yield get_db_writer(db_path)
+    shutdown_db_writer()
+
+
+def test_writes_are_visible_when_call_returns(writer, db_path):
+    writer.call(DBHelper.update_current, "1", h_score=3)
+    reader = DBHelper(db_path, read_only=True)
+    assert reader.fetch_current("1")["h_score"] == 3
+    reader.close()
+
+
+def test_same_file_returns_the_running_writer(writer, db_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert get_db_writer(db_path) is writer
+    assert get_db_writer("test.db") is writer  # same file, relative path
+
+
+def test_other_file_raises(writer, tmp_path):
+    with pytest.raises(ValueError, match="already running"):
+        get_db_writer(str(tmp_path / "other.db"))
+
+
+def test_failing_command_is_rolled_back_alone(writer, db_path):
+    def boom(db):
+        db.update_current("2", h_score=9)
+        raise RuntimeError("boom")
+
+    fut_ok = writer.submit(DBHelper.update_current, "1", a_score=1)
+    fut_bad = writer.submit(boom)
+    assert fut_ok.result(timeout=5) is None
+    with pytest.raises(RuntimeError):
+        fut_bad.result(timeout=5)
+    reader = DBHelper(db_path, read_only=True)
+    assert reader.fetch_current("1")["a_score"] == 1
+    assert reader.fetch_current("2")["h_score"] is None
+    reader.close()
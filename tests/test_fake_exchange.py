@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+
+from autotrader.fake_exchange import FakeAPIClient, FakeExchange
+
+
+@pytest.fixture
+def exchange():
+    ex = FakeExchange()
+    ex.add_match("101", "Home", "Away", kickoff=ex.now + timedelta(minutes=5))
+    return ex
+
+
+@pytest.fixture
+def market_id(exchange):
+    return exchange.events["101"].markets["MATCH_ODDS"].market_id
+
+
+def _lay(api, market_id, sel, price, size, persistence="PERSIST"):
+    resp = api.betting.place_orders(market_id=market_id, instructions=[{
+        "orderType": "LIMIT", "selectionId": sel, "side": "LAY",
+        "limitOrder": {"size": size, "price": price, "persistenceType": persistence}}])
+    return resp.place_instruction_reports[0]
+
+
+def test_incoming_order_takes_the_best_price_first(exchange, market_id):
+    sel = exchange.selection(market_id, "draw")
+    worse = exchange.submit(market_id, sel, "BACK", 3.6, 10.0)
+    best = exchange.submit(market_id, sel, "BACK", 3.5, 10.0)
+
+    taker = exchange.submit(market_id, sel, "LAY", 3.6, 15.0)
+    assert (best.size_matched, worse.size_matched) == (10.0, 5.0)
+    assert taker.average_price_matched == round((3.5 * 10 + 3.6 * 5) / 15, 2)  # at the resting prices
+
+
+def test_equal_prices_fill_in_arrival_order(exchange, market_id):
+    sel = exchange.selection(market_id, "draw")
+    first = exchange.submit(market_id, sel, "BACK", 3.5, 10.0)
+    second = exchange.submit(market_id, sel, "BACK", 3.5, 10.0)
+    assert exchange.queue_ahead(second.bet_id) is None  # other participants' bets are not tracked
+    assert exchange.markets[market_id].book(sel).queue_ahead(second) == 10.0
+
+    exchange.submit(market_id, sel, "LAY", 3.5, 12.0)
+    assert (first.size_matched, second.size_matched) == (10.0, 2.0)
+
+
+def test_unmatched_part_rests_at_the_limit_price(exchange, market_id):
+    api = FakeAPIClient(exchange)
+    sel = exchange.selection(market_id, "draw")
+    exchange.submit(market_id, sel, "BACK", 3.5, 4.0)
+
+    report = _lay(api, market_id, sel, 3.5, 10.0)
+    assert (report.status, report.size_matched) == ("SUCCESS", 4.0)
+    order = exchange.orders[report.bet_id]
+    assert (order.size_remaining, order.status) == (6.0, "EXECUTABLE")
+    book = api.betting.list_market_book(market_ids=[market_id])[0]
+    draw = next(r for r in book.runners if r.selection_id == sel)
+    assert [(p.price, p.size) for p in draw.ex.available_to_back] == [(3.5, 6.0)]
+
+    # A later backer at that price matches the resting remainder
+    exchange.submit(market_id, sel, "BACK", 3.5, 6.0)
+    assert (order.size_matched, order.status) == (10.0, "EXECUTION_COMPLETE")
+
+
+def test_lapse_orders_lapse_at_in_play_and_persist_orders_stay(exchange, market_id):
+    api = FakeAPIClient(exchange)
+    sel = exchange.selection(market_id, "draw")
+    lapse = exchange.orders[_lay(api, market_id, sel, 3.0, 10.0, "LAPSE").bet_id]
+    persist = exchange.orders[_lay(api, market_id, sel, 3.0, 10.0, "PERSIST").bet_id]
+
+    exchange.advance(6 * 60)  # past kick-off
+    assert exchange.markets[market_id].inplay
+    assert (lapse.size_lapsed, lapse.size_remaining) == (10.0, 0.0)
+    assert (persist.size_lapsed, persist.size_remaining) == (0.0, 10.0)
+    open_ids = [o.bet_id for o in api.betting.list_current_orders(market_ids=[market_id]).orders]
+    assert open_ids == [persist.bet_id]  # a lapsed bet with nothing matched is no longer current
+
+
+def test_list_current_orders_pages(exchange, market_id):
+    api = FakeAPIClient(exchange)
+    sel = exchange.selection(market_id, "draw")
+    bet_ids = [_lay(api, market_id, sel, 3.0, 2.0).bet_id for _ in range(5)]
+
+    seen, start = [], 0
+    while True:
+        resp = api.betting.list_current_orders(bet_ids=bet_ids, from_record=start, record_count=2)
+        seen += [o.bet_id for o in resp.orders]
+        if not resp.more_available:
+            break
+        start += len(resp.orders)
+    assert seen == bet_ids
+    assert len(api.betting.list_current_orders(bet_ids=bet_ids[:3]).orders) == 3
+
+
+def test_call_counts_are_exact_under_concurrent_callers(exchange, market_id):
+    api = FakeAPIClient(exchange)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: api.betting.list_current_orders(market_ids=[market_id]), range(400)))
+    assert exchange.calls["list_current_orders"] == 400
@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from autotrader.match_state import MatchStateStore
+from core.db_helper import DBHelper
+
+
+@pytest.fixture
+def store(db_path):
+    db = DBHelper(db_path)
+    yield MatchStateStore().attach(db)
+    db.close()
+
+
+def _stored(db_path, event_id, col):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT {col} FROM current_matches WHERE event_id=?", (event_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_writes_stay_in_memory_until_flush(store, db_path):
+    store.update_current("1", h_score=1, market_state="OPEN")
+    assert store.fetch_current("1")["h_score"] == 1
+    assert _stored(db_path, "1", "h_score") is None
+
+    assert store.flush() == 1
+    assert _stored(db_path, "1", "h_score") == 1
+    assert store.flush() == 0
+
+
+def test_unchanged_values_are_not_dirty(store):
+    store.update_current("1", comp="League")
+    assert store.flush() == 0
+
+
+def test_critical_fields_are_written_through(store, db_path):
+    store.update_current("1", e_betid="B1", e_status="EXECUTABLE")
+    assert _stored(db_path, "1", "e_betid") == "B1"
+
+
+def test_first_attach_rebuilds_from_the_table(store, db_path):
+    store.update_current("1", d_back_price=3.4)
+    store.flush()
+    fresh = MatchStateStore()
+    assert not fresh.loaded
+    fresh.attach(DBHelper(db_path))
+    assert fresh.loaded and len(fresh) == 2
+    assert fresh.fetch_current("1")["d_back_price"] == 3.4
+
+
+def test_resync_keeps_dirty_fields_and_picks_up_other_writers(store, db_path):
+    store.update_current("1", market_state="SUSPENDED")
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE current_matches SET market_state='OPEN', comp='Renamed' WHERE event_id='1'")
+    conn.execute("INSERT INTO current_matches (comp, event_name, event_id, kickoff) "
+                 "VALUES ('League', 'C v D', '3', '2030-01-01T17:00:00+00:00')")
+    conn.commit()
+    conn.close()
+
+    store.sync_from_db()
+    row = store.fetch_current("1")
+    assert (row["market_state"], row["comp"]) == ("SUSPENDED", "Renamed")
+    assert store.fetch_current("3") is not None
+
+
+def test_merge_rows_takes_only_finder_fields_of_known_rows(store):
+    stale = store.fetch_current("1")
+    store.update_current("1", e_ordered=1, e_betid="B1", e_status="EXECUTABLE")
+    stale.update(comp="New Comp", kickoff="2030-01-02T15:00:00+00:00")
+    new = dict(stale, event_id="9", e_betid="X")
+
+    assert store.merge_rows([stale, new]) == 1
+    row = store.fetch_current("1")
+    assert (row["e_ordered"], row["e_betid"], row["e_status"]) == (1, "B1", "EXECUTABLE")
+    assert (row["comp"], row["kickoff"]) == ("New Comp", "2030-01-02T15:00:00+00:00")
+    assert store.fetch_current("9")["e_betid"] == "X"
+
+
+def test_count_current_under_the_engine_lock(store):
+    from autotrader.async_engine import SerializedDB
+
+    db = SerializedDB(store)
+    store.update_current("1", strategy="LTD60")
+    assert db.count_current() == 2
+    assert db.count_current("strategy IS NOT NULL") == 1  # filters flush, then ask the table
+    with pytest.raises(AttributeError):
+        db.conn
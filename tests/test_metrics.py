@@ -0,0 +1,51 @@
+import sqlite3
+
+from core import metrics
+from core.db_helper import DBHelper
+from core.settings import TABLE_METRICS
+
+
+def test_render_accumulates_buckets_and_escapes_labels():
+    reg = metrics.Registry(buckets=(1.0, 0.1))
+    reg.observe("tick", 0.05)
+    reg.observe("tick", 0.5)
+    reg.observe("tick", 3.0)
+    reg.observe("on_tick", 0.2, strategy='L"T\\D\n60')
+
+    name = metrics.PHASE_METRIC
+    assert reg.render() == "\n".join([
+        f"# HELP {name} Wall time of one trading-loop phase.",
+        f"# TYPE {name} histogram",
+        f'{name}_bucket{{phase="on_tick",strategy="L\\"T\\\\D\\n60",le="0.1"}} 0',
+        f'{name}_bucket{{phase="on_tick",strategy="L\\"T\\\\D\\n60",le="1.0"}} 1',
+        f'{name}_bucket{{phase="on_tick",strategy="L\\"T\\\\D\\n60",le="+Inf"}} 1',
+        f'{name}_sum{{phase="on_tick",strategy="L\\"T\\\\D\\n60"}} 0.200000',
+        f'{name}_count{{phase="on_tick",strategy="L\\"T\\\\D\\n60"}} 1',
+        f'{name}_bucket{{phase="tick",le="0.1"}} 1',
+        f'{name}_bucket{{phase="tick",le="1.0"}} 2',  # cumulative
+        f'{name}_bucket{{phase="tick",le="+Inf"}} 3',
+        f'{name}_sum{{phase="tick"}} 3.550000',
+        f'{name}_count{{phase="tick"}} 3',
+    ]) + "\n"
+
+
+def test_take_window_resets_the_window_but_not_the_histogram(db_path):
+    reg = metrics.Registry(buckets=(1.0,))
+    reg.observe("tick", 0.25)
+    reg.observe("tick", 0.75)
+    reg.observe("on_tick", 0.5, strategy="LTD60")
+
+    rows = sorted(reg.take_window(), key=lambda r: r[1])
+    assert [r[1:] for r in rows] == [("on_tick", "strategy=LTD60", 1, 0.5, 0.5), ("tick", None, 2, 1.0, 0.75)]
+    assert reg.take_window() == []  # nothing observed since
+
+    reg.observe("tick", 0.1)
+    assert [r[1:] for r in reg.take_window()] == [("tick", None, 1, 0.1, 0.1)]
+    assert f'{metrics.PHASE_METRIC}_count{{phase="tick"}} 3' in reg.render()  # totals keep counting
+
+    with DBHelper(db_path) as db, db.tx():
+        metrics.persist_window(db, rows)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute(f"SELECT phase, count FROM {TABLE_METRICS} ORDER BY phase").fetchall() == [
+        ("on_tick", 1), ("tick", 2)]
+    conn.close()
@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("betfairlightweight")  # ltd60 builds its instructions with betfairlightweight.filters
+
+import autotrader.order_sync as order_sync  # noqa: E402
+import autotrader.strategies.ltd60 as ltd60  # noqa: E402
+from autotrader.fake_exchange import FakeAPIClient, FakeExchange  # noqa: E402
+from autotrader.match_state import MatchStateStore  # noqa: E402
+from autotrader.order_engine import OrderCancelQueue, OrderPlacementQueue  # noqa: E402
+from core.db_helper import DBHelper  # noqa: E402
+from core.settings import DRAW_SELECTION_ID, LTD60_MAX_ODDS_ACCEPT, STAKE_LTD_LIVE  # noqa: E402
+
+EVENTS = ("101", "102")
+
+
+@pytest.fixture
+def live(monkeypatch):
+    monkeypatch.setattr(order_sync, "PAPER_MODE", 0)
+    monkeypatch.setattr(ltd60, "PAPER_MODE", 0)
+
+
+@pytest.fixture
+def exchange():
+    """Two matches in the second half; no liquidity, so a capped entry lay rests unmatched."""
+    ex = FakeExchange()
+    for ev_id in EVENTS:
+        ex.add_match(ev_id, f"Home {ev_id}", f"Away {ev_id}", kickoff=ex.now - timedelta(minutes=80))
+    return ex
+
+
+@pytest.fixture
+def store(db_path, exchange):
+    """current_matches rows for EVENTS with an unmatched capped entry 1 resting on the exchange at 61'."""
+    api = FakeAPIClient(exchange)
+    conn = sqlite3.connect(db_path)
+    for ev_id in EVENTS:
+        market_id = exchange.events[ev_id].markets["MATCH_ODDS"].market_id
+        resp = api.betting.place_orders(market_id=market_id, instructions=[{
+            "orderType": "LIMIT", "selectionId": DRAW_SELECTION_ID, "side": "LAY",
+            "limitOrder": {"size": STAKE_LTD_LIVE, "price": LTD60_MAX_ODDS_ACCEPT, "persistenceType": "PERSIST"}}])
+        conn.execute(
+            "INSERT INTO current_matches (comp, event_name, event_id, kickoff, market_id_MATCH_ODDS, strategy,"
+            " time_elapsed, h_score, a_score, e_ordered, e_side, e_price, e_stake, e_matched, e_remaining, e_betid,"
+            " e_status) VALUES ('League', 'H v A', ?, '2030-01-01T15:00:00+00:00', ?, 'LTD60', 61, 0, 0, 1, 'LAY',"
+            " ?, ?, 0.0, ?, ?, 'EXECUTABLE')",
+            (ev_id, market_id, LTD60_MAX_ODDS_ACCEPT, STAKE_LTD_LIVE, STAKE_LTD_LIVE,
+             resp.place_instruction_reports[0].bet_id),
+        )
+    conn.commit()
+    conn.close()
+    db = DBHelper(db_path)
+    yield MatchStateStore().attach(db)
+    db.close()
+
+
+def test_entry_is_cancelled_once_across_ticks(live, exchange, store):
+    api = FakeAPIClient(exchange)
+    strat = ltd60.LTD60()
+    strat.canceller = OrderCancelQueue()
+    try:
+        for _ in range(4):  # tick: order sync, strategies, cancel flush
+            strat.orders = order_sync.sync_orders(store, api, store.list_current())
+            for ev in store.list_current():
+                strat.on_tick(store, dict(ev), api=api)
+            strat.canceller.flush(api)
+            exchange.advance(10)
+    finally:
+        strat.canceller.shutdown()
+
+    # One call per market in the first flush, never re-sent on later ticks
+    assert exchange.calls["cancel_orders"] == strat.canceller.calls == len(EVENTS)
+    for ev_id in EVENTS:
+        row = store.fetch_current(ev_id)
+        assert row["e_status"] == "CANCELLED_UNMATCHED BY 60MIN"
+        assert exchange.orders[row["e_betid"]].size_cancelled == STAKE_LTD_LIVE
+
+
+def test_missing_or_failed_cancel_is_not_retried(live, exchange, store):
+    api = FakeAPIClient(exchange)
+    strat = ltd60.LTD60()
+    strat.canceller = OrderCancelQueue()
+    store.update_current(EVENTS[0], e_status="MISSING")
+    store.update_current(EVENTS[1], e_status="CANCEL_ERR_UNMATCHED BY 60MIN:BET_TAKEN_OR_LAPSED")
+    for ev in store.list_current():
+        strat._maybe_cancel_entry1(store, dict(ev), api, ev["market_id_MATCH_ODDS"], 61, 0, 0)
+    assert strat.canceller.pending() == 0
+
+
+class _ShortBetting:
+    """place_orders: 1.2 gets one report too few, 1.3 times out; every call waits for all batches."""
+
+    def __init__(self, parties: int):
+        self.barrier = threading.Barrier(parties, timeout=5)  # breaks (and fails the batch) if sends are serial
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def place_orders(self, market_id, instructions):
+        with self._lock:
+            self.calls.append((market_id, list(instructions)))
+        self.barrier.wait()
+        if market_id == "1.3":
+            raise TimeoutError("read timed out")
+        shown = instructions[:-1] if market_id == "1.2" else instructions
+        return SimpleNamespace(place_instruction_reports=[SimpleNamespace(instruction=i) for i in shown],
+                               error_code="ERROR_IN_ORDER")
+
+
+def test_placement_batches_per_market_in_parallel_and_maps_reports_by_position():
+    betting = _ShortBetting(parties=4)
+    placer = OrderPlacementQueue(workers=4, max_instructions=2)
+    seen = []
+    submitted = [("1.1", "a1"), ("1.2", "b1"), ("1.1", "a2"), ("1.1", "a3"), ("1.2", "b2"), ("1.1", "a4"),
+                 ("1.3", "c1")]
+    for market_id, instruction in submitted:
+        placer.submit(market_id, instruction, lambda rep, err, i=instruction: seen.append((i, rep, err)))
+    try:
+        assert placer.flush(SimpleNamespace(betting=betting)) == len(submitted)
+    finally:
+        placer.shutdown()
+
+    # 1.1 split at max_instructions, one call each for 1.2 and 1.3, all four in flight together
+    assert sorted(betting.calls) == [("1.1", ["a1", "a2"]), ("1.1", ["a3", "a4"]), ("1.2", ["b1", "b2"]),
+                                     ("1.3", ["c1"])]
+    assert placer.calls == 4 and placer.pending() == 0
+
+    assert [i for i, _, _ in seen] == [i for _, i in submitted]  # callbacks in submission order
+    by_instruction = {i: (rep, err) for i, rep, err in seen}
+    for i in ("a1", "a2", "a3", "a4", "b1"):
+        rep, err = by_instruction[i]
+        assert err is None and rep.instruction == i
+    rep, err = by_instruction["b2"]
+    assert rep is None and str(err) == "no instruction report (ERROR_IN_ORDER)"
+    rep, err = by_instruction["c1"]
+    assert rep is None and isinstance(err, TimeoutError)
@@ -0,0 +1,114 @@
+import sqlite3
+from types import SimpleNamespace as NS
+
+import pytest
+
+import autotrader.order_sync as order_sync
+from autotrader.match_state import MatchStateStore
+from autotrader.streaming import OrderStreamCache
+from core.db_helper import DBHelper
+
+N_BETS = 7
+
+
+class FakeBetting:
+    """list_current_orders over a fixed order book; bet B3 is unknown to the exchange."""
+
+    def __init__(self):
+        self.calls = []
+
+    def list_current_orders(self, bet_ids, from_record=0, record_count=1000):
+        self.calls.append((sorted(bet_ids), from_record))
+        found = [b for b in sorted(bet_ids) if b != "B3"]
+        page = found[from_record:from_record + record_count]
+        return NS(orders=[NS(bet_id=b, market_id="1.1", selection_id=58805, side="LAY",
+                             price_size=NS(price=3.0, size=10.0), size_matched=4.0, size_remaining=6.0,
+                             status="EXECUTABLE") for b in page],
+                  more_available=from_record + record_count < len(found))
+
+
+@pytest.fixture
+def live(monkeypatch):
+    monkeypatch.setattr(order_sync, "PAPER_MODE", 0)
+    monkeypatch.setattr(order_sync, "ORDER_SYNC_BET_IDS_PER_CALL", 3)
+    monkeypatch.setattr(order_sync, "ORDER_SYNC_PAGE_SIZE", 2)
+
+
+@pytest.fixture
+def store(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM current_matches")
+    conn.executemany(
+        "INSERT INTO current_matches (comp, event_name, event_id, kickoff, e_betid, e_stake, e_matched, e_remaining,"
+        " e_status) VALUES ('League', 'H v A', ?, '2030-01-01T15:00:00+00:00', ?, 10.0, 0.0, 10.0, 'EXECUTABLE')",
+        [(str(i), f"B{i}") for i in range(N_BETS)],
+    )
+    conn.execute("INSERT INTO current_matches (comp, event_name, event_id, kickoff, e_betid, e_stake, e_matched)"
+                 " VALUES ('League', 'H v A', 'done', '2030-01-01T15:00:00+00:00', 'BX', 10.0, 10.0)")
+    conn.commit()
+    conn.close()
+    db = DBHelper(db_path)
+    yield MatchStateStore().attach(db)
+    db.close()
+
+
+def test_open_bets_are_fetched_in_chunks_with_paging(live, store):
+    betting = FakeBetting()
+    index = order_sync.sync_orders(store, NS(betting=betting), store.list_current())
+
+    requested = [b for ids, start in betting.calls if start == 0 for b in ids]
+    assert sorted(requested) == sorted(f"B{i}" for i in range(N_BETS))  # fully matched BX not asked for
+    assert all(len(ids) <= 3 for ids, _ in betting.calls)
+    assert index.calls == len(betting.calls) == 4  # chunks of 3, pages of 2
+    assert len(index) == N_BETS - 1
+
+
+def test_order_state_is_applied_to_every_row(live, store):
+    order_sync.sync_orders(store, NS(betting=FakeBetting()), store.list_current())
+    row = store.fetch_current("0")
+    assert (row["e_status"], row["e_matched"], row["e_remaining"]) == ("EXECUTABLE", 4.0, 6.0)
+    assert store.fetch_current("3")["e_status"] == "MISSING"
+
+
+def test_paper_mode_does_not_call_the_api(store):
+    betting = FakeBetting()
+    assert order_sync.sync_orders(store, NS(betting=betting), store.list_current()) is None
+    assert betting.calls == []
+
+
+def test_streamed_orders_skip_rest(live, store):
+    cache = OrderStreamCache()
+    cache.apply({"id": "1.1", "orc": [{"id": 58805, "uo": [
+        {"id": f"B{i}", "side": "L", "p": 3.0, "s": 10.0, "sm": 10.0, "sr": 0.0, "status": "EC"} for i in range(5)]}]})
+    stream = NS(orders_for=lambda bet_ids: {b: cache.get(b) for b in bet_ids if cache.get(b) is not None})
+    betting = FakeBetting()
+
+    index = order_sync.sync_orders(store, NS(betting=betting), store.list_current(), stream=stream)
+    assert index.streamed == 5
+    assert [b for ids, _ in betting.calls for b in ids] == ["B5", "B6"]
+    assert store.fetch_current("0")["e_matched"] == 10.0
+
+
+def test_cancelled_entry_is_not_synced_or_downgraded(live, store):
+    store.update_current("3", e_status="CANCELLED_UNMATCHED BY 60MIN", e_remaining=0.0)
+    store.update_current("4", e_status="CANCEL_ERR_UNMATCHED BY 60MIN:BET_TAKEN_OR_LAPSED")
+    betting = FakeBetting()
+
+    order_sync.sync_orders(store, NS(betting=betting), store.list_current())
+    assert not {"B3", "B4"} & {b for ids, _ in betting.calls for b in ids}
+    assert store.fetch_current("3")["e_status"] == "CANCELLED_UNMATCHED BY 60MIN"
+
+    # A row the index does not cover (direct fallback) keeps its terminal state too
+    row = dict(store.fetch_current("3"))
+    order_sync.apply_order_state(store, row, None)
+    assert store.fetch_current("3")["e_status"] == "CANCELLED_UNMATCHED BY 60MIN"
+
+
+def test_missing_bet_is_synced_once(live, store):
+    betting = FakeBetting()
+    order_sync.sync_orders(store, NS(betting=betting), store.list_current())
+    assert store.fetch_current("3")["e_status"] == "MISSING"
+
+    betting.calls.clear()
+    order_sync.sync_orders(store, NS(betting=betting), store.list_current())
+    assert "B3" not in {b for ids, _ in betting.calls for b in ids}
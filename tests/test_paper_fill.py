@@ -0,0 +1,75 @@
+from autotrader.market_snapshot import MarketPrices, RunnerPrices
+from autotrader.paper_fill import PaperFillModel
+
+DRAW = 58805
+
+
+def _book(lay, back=((3.8, 50.0),), traded=0.0):
+    return MarketPrices("1.1", "OPEN", True, (RunnerPrices(DRAW, tuple(back), tuple(lay), traded),))
+
+
+def test_place_takes_crossing_liquidity():
+    model = PaperFillModel(volume_share=0.5)
+    order = model.place("e1", "entry", DRAW, "LAY", 4.0, 100.0, _book(lay=((3.9, 30.0), (4.2, 500.0))))
+    assert order.matched == 30.0
+
+
+def test_same_crossing_liquidity_fills_only_once():
+    model = PaperFillModel(volume_share=0.5)
+    book = _book(lay=((3.9, 30.0), (4.2, 500.0)))
+    order = model.place("e1", "entry", DRAW, "LAY", 4.0, 100.0, book)
+    for _ in range(5):
+        assert model.update("e1", book) == []
+    assert order.matched == 30.0
+
+
+def test_a_later_crossing_fills_once():
+    model = PaperFillModel(volume_share=0.5)
+    order = model.place("e1", "entry", DRAW, "LAY", 4.0, 100.0, _book(lay=((4.2, 500.0),)))
+    assert order.matched == 0.0
+
+    moved = _book(lay=((3.95, 40.0), (4.2, 500.0)))
+    assert model.update("e1", moved) == [(order, 40.0)]
+    assert model.update("e1", moved) == []
+    # The crossing goes away and comes back: nothing new was traded, so nothing new fills
+    assert model.update("e1", _book(lay=((4.2, 500.0),))) == []
+    assert model.update("e1", moved) == []
+    assert order.matched == 40.0
+
+
+def test_crossing_size_growing_at_the_same_price_is_not_a_fill():
+    model = PaperFillModel(volume_share=0.5)
+    order = model.place("e1", "entry", DRAW, "LAY", 4.0, 100.0, _book(lay=((3.95, 40.0), (4.2, 500.0))))
+    assert order.matched == 40.0
+
+    for size in (55.0, 80.0, 200.0):
+        assert model.update("e1", _book(lay=((3.95, size), (4.2, 500.0)))) == []
+    assert order.matched == 40.0
+
+    # Only traded volume fills the crossed order from here on
+    assert model.update("e1", _book(lay=((3.95, 200.0),), traded=30.0)) == [(order, 15.0)]
+
+
+def test_traded_volume_works_through_the_queue_first():
+    model = PaperFillModel(volume_share=1.0)
+    book = _book(lay=((4.2, 500.0),), back=((4.0, 30.0),), traded=1000.0)
+    order = model.place("e1", "entry", DRAW, "LAY", 4.0, 100.0, book)
+    assert order.queue_ahead == 30.0
+
+    # 20 of the 50 traded left the order's level: that part of the queue is gone
+    assert model.update("e1", _book(lay=((4.2, 500.0),), back=((4.0, 10.0),), traded=1050.0)) == []
+    assert order.queue_ahead == 10.0
+
+    # The level traded out: the rest of the queue goes first, then the order fills
+    fills = model.update("e1", _book(lay=((4.2, 500.0),), back=((3.95, 80.0),), traded=1100.0))
+    assert fills == [(order, 40.0)]
+    assert order.queue_ahead == 0.0
+
+
+def test_volume_that_leaves_the_level_untouched_does_not_fill():
+    model = PaperFillModel(volume_share=1.0)
+    order = model.place("e1", "entry", DRAW, "LAY", 4.0, 100.0,
+                        _book(lay=((4.2, 500.0),), back=((4.0, 30.0),), traded=1000.0))
+    for traded in (1100.0, 1500.0, 3000.0):
+        assert model.update("e1", _book(lay=((4.2, 500.0),), back=((4.0, 30.0),), traded=traded)) == []
+    assert order.matched == 0.0
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from autotrader.poll_scheduler import MatchPollScheduler
+from core.settings import (
+    LTD60_KO_WINDOW_MINUTES,
+    POLL_FAR_PREKO_SEC,
+    POLL_HOT_SEC,
+    POLL_INPLAY_SEC,
+    POLL_KO_GRACE_MIN,
+    POLL_MAX_SLEEP_SEC,
+    POLL_MIN_SLEEP_SEC,
+    POLL_NEAR_PREKO_MIN,
+    POLL_PREKO_SEC,
+)
+
+NOW = datetime(2030, 1, 1, 15, 0, tzinfo=timezone.utc)
+NOW_TS = NOW.timestamp()
+
+
+def _row(event_id="1", minutes_to_ko=60.0, status=None, te=None):
+    return {"event_id": event_id, "kickoff": (NOW + timedelta(minutes=minutes_to_ko)).isoformat(),
+            "inplay_status": status, "time_elapsed": te}
+
+
+@pytest.mark.parametrize("row, interval", [
+    (_row(minutes_to_ko=POLL_NEAR_PREKO_MIN + 60), POLL_FAR_PREKO_SEC),
+    (_row(minutes_to_ko=POLL_NEAR_PREKO_MIN - 1), POLL_PREKO_SEC),
+    (_row(minutes_to_ko=LTD60_KO_WINDOW_MINUTES), POLL_HOT_SEC),            # KO entry window opens
+    (_row(minutes_to_ko=0.5), POLL_HOT_SEC),                                # SP capture window
+    (_row(minutes_to_ko=-POLL_KO_GRACE_MIN), POLL_HOT_SEC),                 # grace until in-play arrives
+    (_row(minutes_to_ko=-POLL_KO_GRACE_MIN - 1), POLL_INPLAY_SEC),
+    (_row(minutes_to_ko=-20, status="In Play", te=20), POLL_INPLAY_SEC),
+    (_row(minutes_to_ko=-60, status="In Play", te=55), POLL_HOT_SEC),       # second-entry window
+    (_row(minutes_to_ko=-70, status="In Play", te=65), POLL_HOT_SEC),
+    (_row(minutes_to_ko=-71, status="In Play", te=66), POLL_INPLAY_SEC),
+    (_row(minutes_to_ko=-5, status="In Play", te=""), POLL_INPLAY_SEC),
+    (_row(minutes_to_ko=-120, status="Finished", te=90), None),
+])
+def test_interval_for_bands(row, interval):
+    assert MatchPollScheduler().interval_for(row, NOW) == interval
+
+
+def test_due_reschedules_and_pulls_forward_when_a_faster_band_starts():
+    sched = MatchPollScheduler()
+    far = _row(minutes_to_ko=POLL_NEAR_PREKO_MIN + 0.5)  # polled every POLL_FAR_PREKO_SEC for 30 more seconds
+    assert sched.due([far], now_ts=NOW_TS) == [far]
+    assert sched.due([far], now_ts=NOW_TS + 1) == []
+
+    # A minute later it is inside POLL_NEAR_PREKO_MIN: the next poll moves up from +POLL_FAR_PREKO_SEC
+    t = NOW_TS + 60
+    assert sched.due([far], now_ts=t) == []
+    assert sched.due([far], now_ts=t + POLL_PREKO_SEC - 1) == []
+    assert sched.due([far], now_ts=t + POLL_PREKO_SEC) == [far]  # not NOW_TS + POLL_FAR_PREKO_SEC
+    t += POLL_PREKO_SEC
+
+    # Rows that are gone or finished are forgotten
+    done = dict(far, inplay_status="Finished")
+    assert sched.due([done], now_ts=t + 2 * POLL_HOT_SEC) == []
+    assert sched.sleep_seconds(now_ts=t) == POLL_MAX_SLEEP_SEC
+
+
+def test_reschedule_now_makes_skipped_rows_due_again():
+    sched = MatchPollScheduler()
+    rows = [_row("1", minutes_to_ko=-20, status="In Play", te=20), _row("2", minutes_to_ko=-20, status="In Play", te=20)]
+    assert sched.due(rows, now_ts=NOW_TS) == rows
+    sched.reschedule_now(["2"], now_ts=NOW_TS + 1)
+    assert sched.due(rows, now_ts=NOW_TS + 1) == [rows[1]]
+
+
+def test_sleep_seconds_is_clamped():
+    sched = MatchPollScheduler()
+    assert sched.sleep_seconds(now_ts=NOW_TS) == POLL_MAX_SLEEP_SEC  # nothing scheduled
+    sched.due([_row(minutes_to_ko=POLL_NEAR_PREKO_MIN + 60)], now_ts=NOW_TS)  # next poll in POLL_FAR_PREKO_SEC
+    assert sched.sleep_seconds(now_ts=NOW_TS) == POLL_MAX_SLEEP_SEC
+    sched.reschedule_now(["1"], now_ts=NOW_TS)
+    assert sched.sleep_seconds(now_ts=NOW_TS + 5) == POLL_MIN_SLEEP_SEC  # overdue
+    sched.reschedule_now(["1"], now_ts=NOW_TS + 3)
+    assert sched.sleep_seconds(now_ts=NOW_TS) == 3
@@ -0,0 +1,131 @@
+import socket
+import time
+from pathlib import Path
+
+import pytest
+
+from autotrader.fake_stream import FakeStreamServer, load_recording
+from autotrader.streaming import ExchangeStream, MarketStreamCache
+from core.settings import DRAW_SELECTION_ID, STREAM_HEARTBEAT_MS
+
+RECORDING = Path(__file__).resolve().parent.parent / "benchmarks" / "data" / "stream_sample.jsonl"
+BET_ID = "245000000001"
+
+
+def _wait_for(cond, timeout: float = 5.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return cond()
+
+
+@pytest.fixture
+def messages():
+    return load_recording(RECORDING)
+
+
+@pytest.fixture
+def server(messages):
+    with FakeStreamServer(messages) as srv:
+        yield srv
+
+
+@pytest.fixture
+def stream(server):
+    s = ExchangeStream("app-key", "token", host=server.host, port=server.port, use_ssl=False).start()
+    yield s
+    s.stop()
+
+
+def test_market_cache_applies_the_image_then_the_deltas(messages):
+    cache = MarketStreamCache()
+    for msg in messages:
+        for mc in msg.get("mc") or []:
+            cache.apply(mc)
+
+    market = cache.prices("1.2000")
+    assert [r.selection_id for r in market.runners] == [1, 2, DRAW_SELECTION_ID]  # sortPriority order
+    draw = market.runners[2]
+    assert (draw.best_back, draw.best_lay, draw.total_matched) == (3.4, 3.45, 3750.0)
+    assert market.runners[0].best_back == 2.0  # untouched by the deltas
+
+    other = cache.prices("1.2001")
+    assert other.inplay is True
+    assert (other.runners[2].best_back, other.runners[2].total_matched) == (3.3, 3300.0)
+
+    # A new image replaces the market's state instead of merging into it
+    cache.apply({"id": "1.2000", "img": True, "rc": [{"id": DRAW_SELECTION_ID, "batb": [[0, 5.0, 10.0]]}]})
+    assert [r.best_back for r in cache.prices("1.2000").runners] == [5.0]
+
+
+def test_order_cache_is_ready_after_the_subscription_image(server, stream):
+    stream.subscribe_markets(["1.2000"])
+    assert _wait_for(lambda: stream.orders.ready)
+    assert server.authenticated == 1
+
+    orders = stream.orders_for([BET_ID, "999"])
+    assert list(orders) == [BET_ID]
+    order = orders[BET_ID]
+    assert (order.side, order.status, order.size_matched, order.size_remaining) == ("LAY", "EXECUTABLE", 1.5, 2.5)
+    assert order is not stream.orders.get(BET_ID)  # callers get copies
+
+
+def test_orders_for_is_none_while_stale_or_down(stream):
+    assert _wait_for(lambda: stream.orders.ready)
+    assert stream.orders_for([BET_ID]) is not None
+
+    stream.last_message_ts = time.time() - 3 * STREAM_HEARTBEAT_MS / 1000 - 1
+    assert stream.orders_for([BET_ID]) is None  # silent for three heartbeats
+
+    stream.last_message_ts = time.time()
+    stream.stop()
+    assert _wait_for(lambda: not stream.is_alive())
+    assert stream.orders_for([BET_ID]) is None
+
+
+def test_a_silent_connection_is_dead_and_serves_no_prices(server, stream):
+    stream.subscribe_markets(["1.2000"])
+    assert _wait_for(lambda: len(stream.snapshot()) == 1)
+
+    # Socket still open, reader still blocked in recv, but nothing for three heartbeats
+    stream.last_message_ts = time.time() - 3 * STREAM_HEARTBEAT_MS / 1000 - 1
+    assert stream._reader.is_alive()
+    assert not stream.is_alive()
+    assert len(stream.snapshot()) == 0  # the loop falls back to REST books and reconnects
+
+
+def test_stop_wakes_the_reader_and_closes_the_socket(stream):
+    assert _wait_for(lambda: stream.orders.ready)
+    stream.stop()
+    stream._reader.join(timeout=5)
+    assert not stream._reader.is_alive()
+    assert stream._sock.fileno() == -1
+
+
+def test_the_reader_closes_the_socket_when_the_server_hangs_up():
+    with socket.create_server(("127.0.0.1", 0)) as srv:
+        s = ExchangeStream("app-key", "token", host="127.0.0.1", port=srv.getsockname()[1], use_ssl=False).start()
+        conn, _ = srv.accept()
+        conn.close()
+    s._reader.join(timeout=5)
+    assert not s.is_alive()
+    assert s._sock.fileno() == -1  # no socket left behind for the replacement connection
+
+
+def test_resubscribing_a_changed_market_set_drops_the_old_markets(server, stream):
+    stream.subscribe_markets(["1.2000"])
+    assert _wait_for(lambda: stream.markets.prices("1.2000") is not None
+                     and stream.markets.prices("1.2000").runners[2].best_back == 3.4)
+    assert stream.markets.market_ids() == ["1.2000"]
+
+    stream.subscribe_markets(["1.2001"])
+    assert "1.2000" not in stream.markets.market_ids()
+    assert _wait_for(lambda: stream.markets.prices("1.2001") is not None)
+    assert stream.markets.market_ids() == ["1.2001"]
+    assert server.subscriptions[-1]["marketFilter"]["marketIds"] == ["1.2001"]
+
+    stream.subscribe_markets(["1.2001"])  # same set: no new subscription
+    assert server.subscriptions[-1]["marketFilter"]["marketIds"] == ["1.2001"]
+    assert sum(s["op"] == "marketSubscription" for s in server.subscriptions) == 2